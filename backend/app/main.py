@@ -1,6 +1,14 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+import time
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from .routers import stock_analysis, market_data
+from .services import history_store, jobs, lazy, metrics, process_pool, screener, ticker_index, warmup
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Stock Analysis API")
 
@@ -13,10 +21,143 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _route_label(scope) -> str:
+    # 경로 파라미터(종목 코드)가 라벨 값을 늘리지 않도록 {ticker} 형태로 바꿈
+    if scope.get("route") is None:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        path = path.replace(f"/{value}", f"/{{{name}}}", 1)
+    return path
+
+class MetricsMiddleware:
+    """요청 지연 시간 기록 및 Server-Timing 헤더 추가 (순수 ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = metrics.start_request_timing()
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                elapsed = time.perf_counter() - started
+                server_timing = metrics.server_timing_header(token, elapsed)
+                if server_timing:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", server_timing.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.HTTP_SECONDS.observe(
+                time.perf_counter() - started, scope["method"], _route_label(scope), str(status["code"])
+            )
+
+# 계측을 끄면 미들웨어 자체를 등록하지 않음
+if metrics.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # 라우터 등록
 app.include_router(stock_analysis.router, prefix="/api/analysis", tags=["analysis"])
 app.include_router(market_data.router, prefix="/api/market", tags=["market"])
 
+# 부팅 시 디스크에서 읽는 상태 중 다른 구성 요소로 확인할 수 없는 것 (성공했을 때만 True)
+_boot_state = {"history_store": False}
+# 부팅 단계별 실패 사유 (/ready 응답에 표시)
+_boot_errors = {}
+# 부팅 후 제공자 라이브러리(pykrx, yfinance)를 백그라운드에서 미리 import할지 여부
+PROVIDER_PRELOAD = os.getenv("PROVIDER_PRELOAD", "1").lower() not in ("0", "false", "no")
+# 부팅 시 미리 열어 둘 최근 히스토리 수
+HISTORY_PRELOAD_COUNT = int(os.getenv("HISTORY_PRELOAD_COUNT", "64"))
+
+async def _load_warm_state():
+    # 업스트림 호출 없이 스냅샷만 읽음. 이벤트 루프는 바로 요청을 받도록 파일 읽기는 스레드에서 수행
+    # 주기적 갱신은 스냅샷을 읽은 뒤 시작해야 이미 있는 인덱스/패널을 다시 만들지 않음
+    # 단계마다 따로 예외를 잡아 한 단계가 실패해도 나머지 단계와 주기적 작업은 시작함
+    tasks = app.state.background_tasks
+    started = time.perf_counter()
+    try:
+        if not await asyncio.to_thread(ticker_index.load_snapshot):
+            logger.info("No ticker index snapshot, building it in the background")
+    except Exception as e:
+        logger.error(f"Failed to load ticker index snapshot: {str(e)}")
+        _boot_errors["ticker_index"] = str(e)
+    tasks.append(asyncio.create_task(ticker_index.refresh_periodically()))
+
+    # 스크리너용 전종목 패널: 저장된 스냅샷을 읽고 매일 마감 후 새 거래일만 추가
+    try:
+        if not await asyncio.to_thread(screener.load_snapshot):
+            logger.info("No market panel snapshot, building it in the background")
+    except Exception as e:
+        logger.error(f"Failed to load market panel snapshot: {str(e)}")
+        _boot_errors["market_panel"] = str(e)
+    tasks.append(asyncio.create_task(screener.refresh_periodically()))
+
+    try:
+        loaded = await asyncio.to_thread(history_store.preload, HISTORY_PRELOAD_COUNT)
+        logger.info(f"Opened {loaded} stored histories")
+        _boot_state["history_store"] = True
+    except Exception as e:
+        logger.error(f"Failed to preload history store: {str(e)}")
+        _boot_errors["history_store"] = str(e)
+    app.state.ready_seconds = time.perf_counter() - started
+    logger.info(f"Warm state loaded in {app.state.ready_seconds:.2f}s")
+
+    # 장 마감 후 관심 종목과 요청 상위 종목의 분석 결과를 미리 계산
+    tasks.append(asyncio.create_task(warmup.run_periodically()))
+    if PROVIDER_PRELOAD:
+        await asyncio.to_thread(lazy.preload)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.background_tasks = []
+    app.state.ready_seconds = None
+    app.state.background_tasks.append(asyncio.create_task(_load_warm_state()))
+    # 분석/백테스트 작업 대기열 처리 (부팅 직후부터 접수)
+    app.state.background_tasks.append(asyncio.create_task(jobs.run_workers()))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in app.state.background_tasks:
+        task.cancel()
+    process_pool.shutdown()
+
+@app.get("/ready", include_in_schema=False)
+async def readiness():
+    # 스냅샷이 없거나 읽지 못한 인덱스/패널은 백그라운드에서 만들어지면 준비 완료
+    components = {
+        "ticker_index": ticker_index.ready(),
+        "market_panel": screener.ready(),
+        "history_store": _boot_state["history_store"],
+    }
+    ready = all(components.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "components": components,
+            "errors": _boot_errors,
+            "ready_seconds": app.state.ready_seconds,
+            "providers_imported": lazy.loaded(),
+        }
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Stock Analysis API"}
\ No newline at end of file
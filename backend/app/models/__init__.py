@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, List, Dict, Optional
 
 class AnalysisRequest(BaseModel):
     ticker: str
@@ -18,6 +18,11 @@ class ChartData(BaseModel):
     volumes: List[int]
     rsi: List[float]
     timeframe: str
+    # 구간 조회(start/end/limit) 시 앞뒤로 더 조회할 봉이 있는지
+    has_more_before: bool = False
+    has_more_after: bool = False
+    # 각 봉의 epoch 초 (압축 응답 인코딩용, 직렬화 대상 아님)
+    _timestamps: Any = PrivateAttr(default=None)
 
 class StockAnalysis(BaseModel):
     ticker: str
@@ -31,12 +36,175 @@ class StockAnalysis(BaseModel):
     timestamp: str
     chart_data: ChartData
 
+class BatchAnalysisRequest(BaseModel):
+    tickers: List[str]
+    timeframe: str = "daily"
+
+class BatchAnalysisItem(BaseModel):
+    ticker: str
+    market: str
+    status: str
+    analysis: Optional[StockAnalysis] = None
+    error: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    timeframe: str
+    results: List[BatchAnalysisItem]
+
+class BacktestRequest(BaseModel):
+    tickers: List[str]
+    timeframe: str = "daily"
+    years: int = 10
+    # 파라미터 탐색: 각 목록의 모든 조합을 평가
+    rsi_low: List[float] = [30]
+    rsi_high: List[float] = [70]
+    sma_fast: List[int] = [50]
+    sma_slow: List[int] = [200]
+    cost_bps: float = 0.0
+    allow_short: bool = False
+    sort_by: str = "total_return"
+    top: Optional[int] = None
+
+class BacktestResult(BaseModel):
+    ticker: str
+    market: str
+    rsi_low: float
+    rsi_high: float
+    sma_fast: int
+    sma_slow: int
+    total_return: float
+    annual_return: float
+    max_drawdown: float
+    hit_rate: Optional[float] = None
+    trades: int
+    exposure: float
+    buy_and_hold_return: float
+
+class BacktestResponse(BaseModel):
+    timeframe: str
+    combinations: int
+    results: List[BacktestResult]
+    errors: Dict[str, str] = {}
+
+class JobItem(BaseModel):
+    ticker: str
+    market: str
+    status: str
+    analysis: Optional[StockAnalysis] = None
+    backtest: Optional[List[BacktestResult]] = None
+    error: Optional[str] = None
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str
+    timeframe: str
+    state: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    total: int
+    completed: int
+    failed: int
+    error: Optional[str] = None
+    # results는 offset번째로 끝난 종목부터
+    offset: int = 0
+    results: List[JobItem] = []
+
+class CorrelationRequest(BaseModel):
+    tickers: List[str]
+    timeframe: str = "daily"
+    # 상관계수/베타 계산 기간(년)
+    years: int = 1
+    # 상대강도 기간(봉 수). 생략하면 timeframe별 기본값
+    lookbacks: Optional[List[int]] = None
+    min_periods: int = 20
+    include_covariance: bool = False
+
+class RelativeStrengthItem(BaseModel):
+    ticker: str
+    market: str
+    benchmark: str
+    # 1이 가장 강함. 기간 수익률이 하나도 없으면 None
+    rank: Optional[int] = None
+    score: Optional[float] = None
+    returns: Dict[str, Optional[float]]
+    relative_returns: Dict[str, Optional[float]]
+    beta: Optional[float] = None
+    volatility: Optional[float] = None
+
+class CorrelationResponse(BaseModel):
+    timeframe: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+    observations: int
+    tickers: List[str]
+    correlation: List[List[Optional[float]]]
+    covariance: Optional[List[List[Optional[float]]]] = None
+    relative_strength: List[RelativeStrengthItem]
+    errors: Dict[str, str] = {}
+
 class MarketStatus(BaseModel):
     market: str
     status: str
     timestamp: str
+    reason: Optional[str] = None
+    holiday: Optional[str] = None
+    is_trading_day: bool = False
+    session_open: Optional[str] = None
+    session_close: Optional[str] = None
+    early_close: bool = False
+    next_open: Optional[str] = None
+    last_close: Optional[str] = None
+
+class WarmupRun(BaseModel):
+    market: str
+    state: str
+    trigger_close: Optional[str] = None
+    started_at: str
+    finished_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    tickers: int
+    jobs: int
+    warmed: int
+    cached: int
+    failed: int
+    errors: Dict[str, str] = {}
+
+class WarmupMarketStatus(BaseModel):
+    market: str
+    next_run: Optional[str] = None
+    popular: List[str] = []
+    last_run: Optional[WarmupRun] = None
+
+class WarmupStatus(BaseModel):
+    enabled: bool
+    watchlist: List[str]
+    top_n: int
+    timeframes: List[str]
+    tracked_tickers: int
+    markets: List[WarmupMarketStatus]
 
 class StockSearchResult(BaseModel):
     ticker: str
     name: str
-    market: str
\ No newline at end of file
+    market: str
+    exchange: Optional[str] = None
+
+class ScreenResult(BaseModel):
+    ticker: str
+    name: Optional[str] = None
+    exchange: str
+    close: float
+    change_percent: Optional[float] = None
+    volume: int
+    rsi: Optional[float] = None
+    macd: Optional[float] = None
+    signal: Optional[float] = None
+    sma_50: Optional[float] = None
+    sma_200: Optional[float] = None
+    recommendation: str
+
+class ScreenerResponse(BaseModel):
+    as_of: str
+    count: int
+    results: List[ScreenResult]
@@ -1,20 +1,57 @@
-from fastapi import APIRouter, HTTPException
-from ..services import market_service
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from ..services import market_service, screener
+from ..models import MarketStatus, ScreenerResponse
 
 router = APIRouter()
 
 @router.get("/search")
-async def search_stocks(query: str, market: str):
+async def search_stocks(query: str, market: str, limit: int = Query(20, ge=1, le=100)):
     try:
-        results = await market_service.search_stocks(query, market)
+        results = await market_service.search_stocks(query, market, limit)
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/market-status")
+@router.get("/market-status", response_model=MarketStatus)
 async def get_market_status(market: str):
     try:
         status = await market_service.get_market_status(market)
         return status
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 패널 구축 중일 때 다시 시도하라고 알려 주는 시간(초)
+SCREENER_RETRY_AFTER_SECONDS = 60
+
+@router.get("/screener", response_model=ScreenerResponse)
+async def screen_stocks(
+    exchange: Optional[str] = Query(None, description="KOSPI 또는 KOSDAQ (미지정 시 전체)"),
+    rsi_below: Optional[float] = None,
+    rsi_above: Optional[float] = None,
+    macd_above_signal: Optional[bool] = None,
+    macd_cross: bool = Query(False, description="마지막 거래일에 MACD가 시그널선을 상향 돌파"),
+    above_sma_50: Optional[bool] = None,
+    above_sma_200: Optional[bool] = None,
+    sma_trend: Optional[str] = Query(None, description="up: SMA50 > SMA200, down: SMA50 < SMA200"),
+    golden_cross: bool = Query(False, description="마지막 거래일에 SMA50이 SMA200을 상향 돌파"),
+    recommendation: Optional[str] = Query(None, description="매수, 매도, 관망"),
+    min_volume: Optional[float] = None,
+    sort_by: str = "rsi",
+    descending: bool = False,
+    limit: int = Query(50, ge=1, le=500)
+):
+    try:
+        return await screener.screen(
+            exchange=exchange, rsi_below=rsi_below, rsi_above=rsi_above,
+            macd_above_signal=macd_above_signal, macd_cross=macd_cross,
+            above_sma_50=above_sma_50, above_sma_200=above_sma_200, sma_trend=sma_trend,
+            golden_cross=golden_cross, recommendation=recommendation, min_volume=min_volume,
+            sort_by=sort_by, descending=descending, limit=limit
+        )
+    except screener.PanelWarming as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(SCREENER_RETRY_AFTER_SECONDS)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from ..services import stock_service
-from ..models import AnalysisRequest
+from fastapi import APIRouter, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..services import (
+    analysis_cache, backtest, chart_codec, correlation, jobs, metrics, providers, stock_service, streaming, warmup
+)
+from ..models import (
+    AnalysisRequest, BatchAnalysisRequest, BatchAnalysisItem, BatchAnalysisResponse,
+    BacktestRequest, BacktestResult, BacktestResponse, CorrelationRequest, CorrelationResponse,
+    JobItem, JobStatus, WarmupStatus
+)
+from datetime import date
+from typing import List, Optional
+import asyncio
 import re
 
 router = APIRouter()
@@ -15,6 +26,12 @@ def detect_market(code: str) -> str:
     # 그 외의 경우 입력값에 숫자가 있으면 한국, 없으면 미국
     return 'KR' if any(c.isdigit() for c in code) else 'US'
 
+# 데이터 제공자를 모두 쓸 수 없을 때(회로 열림 등) 다시 시도하라고 알려 주는 시간(초)
+PROVIDER_RETRY_AFTER_SECONDS = int(providers.BREAKER_RESET_SECONDS)
+
+def _provider_unavailable(e: providers.ProviderUnavailable) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(PROVIDER_RETRY_AFTER_SECONDS)})
+
 VALID_TIMEFRAMES = [
     '1m', '3m', '5m', '10m', '15m', '30m',
     '60m', '120m', '240m',
@@ -22,7 +39,16 @@ VALID_TIMEFRAMES = [
 ]
 
 @router.post("/analyze")
-async def analyze_stock(request: AnalysisRequest, timeframe: str = "daily"):
+async def analyze_stock(request: AnalysisRequest, timeframe: str = "daily",
+                        max_points: Optional[int] = Query(None, ge=3, description="차트 최대 점 개수 (LTTB 다운샘플링)"),
+                        start: Optional[date] = Query(None, description="구간 시작일 (포함)"),
+                        end: Optional[date] = Query(None, description="구간 종료일 (포함)"),
+                        limit: Optional[int] = Query(
+                            None, ge=2, le=stock_service.RANGE_MAX_BARS,
+                            description="최대 봉 개수. start가 있으면 start부터, 없으면 end까지의 마지막 봉들"
+                        ),
+                        if_none_match: Optional[str] = Header(None),
+                        accept: Optional[str] = Header(None)):
     try:
         if timeframe not in VALID_TIMEFRAMES:
             raise HTTPException(
@@ -39,10 +65,42 @@ async def analyze_stock(request: AnalysisRequest, timeframe: str = "daily"):
                 detail="Minute-level data is not available for Korean stocks. Please use daily, weekly, or monthly."
             )
             
-        result = await stock_service.analyze_stock(request.ticker, market, timeframe)
-        return result
+        if start is not None and end is not None and start > end:
+            raise HTTPException(status_code=400, detail="start must be on or before end")
+
+        # 장 운영 시간에 맞춘 TTL로 결과를 캐시하고, 변경이 없으면 304로 응답
+        entry = await analysis_cache.get_or_compute(
+            analysis_cache.analysis_key(request.ticker, market, timeframe, start, end, limit), market, timeframe,
+            lambda: stock_service.analyze_stock(request.ticker, market, timeframe, start, end, limit)
+        )
+        # 장 마감 후 예열 대상(요청 상위 종목) 선정에 사용
+        warmup.record_request(request.ticker, market)
+        # 다운샘플링 여부와 응답 형식(JSON/msgpack)에 따라 ETag를 구분
+        compact = chart_codec.accepts_msgpack(accept)
+        headers = analysis_cache.cache_headers(entry)
+        headers["ETag"] = analysis_cache.variant_etag(
+            entry.etag, f"p{max_points}" if max_points else "", "msgpack" if compact else ""
+        )
+        headers["Vary"] = "Accept"
+        if analysis_cache.etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        with metrics.stage("downsample"):
+            result = chart_codec.downsample_analysis(entry.value, max_points)
+        # 직렬화 비용도 단계별 지표에 잡히도록 응답 본문을 여기서 만듦
+        if compact:
+            with metrics.stage("serialize_msgpack"):
+                return Response(
+                    content=chart_codec.encode_msgpack(result),
+                    media_type=chart_codec.MSGPACK_MEDIA_TYPES[0],
+                    headers=headers
+                )
+        with metrics.stage("serialize_json"):
+            return JSONResponse(content=jsonable_encoder(result), headers=headers)
     except HTTPException:
         raise
+    except providers.ProviderUnavailable as e:
+        raise _provider_unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except NotImplementedError as e:
@@ -50,14 +108,329 @@ async def analyze_stock(request: AnalysisRequest, timeframe: str = "daily"):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+# 배치 분석 요청 한 번에 받을 수 있는 최대 종목 수
+BATCH_MAX_TICKERS = 200
+
+@router.post("/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    try:
+        if request.timeframe not in VALID_TIMEFRAMES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid timeframe. Must be one of: {', '.join(VALID_TIMEFRAMES)}"
+            )
+
+        tickers = list(dict.fromkeys(t.strip() for t in request.tickers if t.strip()))
+        if not tickers:
+            raise HTTPException(status_code=400, detail="At least one ticker is required")
+        if len(tickers) > BATCH_MAX_TICKERS:
+            raise HTTPException(status_code=400, detail=f"Too many tickers. Maximum is {BATCH_MAX_TICKERS}")
+
+        # 종목별 실패는 배치 전체를 실패시키지 않고 결과에 개별로 기록
+        results = {}
+        requested = []
+        for ticker in tickers:
+            market = detect_market(ticker)
+            if market == 'KR' and request.timeframe.endswith('m'):
+                results[ticker] = BatchAnalysisItem(
+                    ticker=ticker, market=market, status="error",
+                    error="Minute-level data is not available for Korean stocks. Please use daily, weekly, or monthly."
+                )
+            else:
+                requested.append((ticker, market))
+
+        for item in await stock_service.analyze_batch(requested, request.timeframe):
+            results[item.ticker] = item
+        return BatchAnalysisResponse(timeframe=request.timeframe, results=[results[t] for t in tickers])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+# 백테스트 요청 제한: 종목 수, 파라미터 조합 수, 조회 기간(년)
+BACKTEST_MAX_TICKERS = 50
+BACKTEST_MAX_COMBINATIONS = 2000
+BACKTEST_MAX_YEARS = 30
+BACKTEST_SORT_FIELDS = ("total_return", "annual_return", "max_drawdown", "hit_rate")
+
+def _backtest_plan(request: BacktestRequest, max_tickers: int):
+    """요청 검증 후 (종목 목록, 파라미터 격자). 잘못된 요청은 HTTPException(400)"""
+    if request.timeframe not in backtest.PERIODS_PER_YEAR:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid timeframe. Must be one of: {', '.join(backtest.PERIODS_PER_YEAR)}"
+        )
+    if request.sort_by not in BACKTEST_SORT_FIELDS:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid sort_by. Must be one of: {', '.join(BACKTEST_SORT_FIELDS)}"
+        )
+    if not 1 <= request.years <= BACKTEST_MAX_YEARS:
+        raise HTTPException(status_code=400, detail=f"years must be between 1 and {BACKTEST_MAX_YEARS}")
+    if any(w < 2 for w in request.sma_fast + request.sma_slow):
+        raise HTTPException(status_code=400, detail="SMA windows must be at least 2")
+
+    tickers = list(dict.fromkeys(t.strip() for t in request.tickers if t.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    if len(tickers) > max_tickers:
+        raise HTTPException(status_code=400, detail=f"Too many tickers. Maximum is {max_tickers}")
+
+    grid = backtest.parameter_grid(request.rsi_low, request.rsi_high, request.sma_fast, request.sma_slow)
+    if not grid:
+        raise HTTPException(status_code=400, detail="No valid parameter combinations (need rsi_low < rsi_high and sma_fast < sma_slow)")
+    if len(grid) > BACKTEST_MAX_COMBINATIONS:
+        raise HTTPException(
+            status_code=400, detail=f"Too many parameter combinations. Maximum is {BACKTEST_MAX_COMBINATIONS}"
+        )
+    return [(ticker, detect_market(ticker)) for ticker in tickers], grid
+
+def _backtest_rows(request: BacktestRequest, ticker: str, market: str, outcome) -> List[BacktestResult]:
+    rows = [
+        BacktestResult(ticker=ticker, market=market, **params._asdict(), **performance._asdict())
+        for params, performance in outcome
+    ]
+    # 낙폭은 0에 가까울수록, 나머지는 클수록 좋은 결과
+    rows.sort(key=lambda r: (getattr(r, request.sort_by) is None, -(getattr(r, request.sort_by) or 0)))
+    return rows[:request.top] if request.top else rows
+
+@router.post("/backtest", response_model=BacktestResponse)
+async def run_backtest(request: BacktestRequest):
+    try:
+        requested, grid = _backtest_plan(request, BACKTEST_MAX_TICKERS)
+        outcomes = await stock_service.backtest_stocks(
+            requested, request.timeframe, request.years, grid, request.cost_bps, request.allow_short
+        )
+
+        results = []
+        errors = {}
+        for ticker, market in requested:
+            outcome = outcomes[(ticker, market)]
+            if isinstance(outcome, Exception):
+                errors[ticker] = str(outcome)
+                continue
+            results.extend(_backtest_rows(request, ticker, market, outcome))
+        return BacktestResponse(timeframe=request.timeframe, combinations=len(grid), results=results, errors=errors)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+# 상관/상대강도 요청 제한: 종목 수, 조회 기간(년), 상대강도 기간 수
+CORRELATION_MAX_TICKERS = 500
+CORRELATION_MAX_YEARS = 10
+CORRELATION_MAX_LOOKBACKS = 8
+
+@router.post("/correlation", response_model=CorrelationResponse)
+async def correlate(request: CorrelationRequest, if_none_match: Optional[str] = Header(None)):
+    try:
+        if request.timeframe not in correlation.DEFAULT_LOOKBACKS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid timeframe. Must be one of: {', '.join(correlation.DEFAULT_LOOKBACKS)}"
+            )
+        if not 1 <= request.years <= CORRELATION_MAX_YEARS:
+            raise HTTPException(status_code=400, detail=f"years must be between 1 and {CORRELATION_MAX_YEARS}")
+        if request.min_periods < 2:
+            raise HTTPException(status_code=400, detail="min_periods must be at least 2")
+        lookbacks = list(dict.fromkeys(request.lookbacks or correlation.DEFAULT_LOOKBACKS[request.timeframe]))
+        if len(lookbacks) > CORRELATION_MAX_LOOKBACKS:
+            raise HTTPException(status_code=400, detail=f"Too many lookbacks. Maximum is {CORRELATION_MAX_LOOKBACKS}")
+        if any(not 1 <= lookback <= stock_service.RANGE_MAX_BARS for lookback in lookbacks):
+            raise HTTPException(
+                status_code=400, detail=f"lookbacks must be between 1 and {stock_service.RANGE_MAX_BARS} bars"
+            )
+
+        tickers = list(dict.fromkeys(t.strip() for t in request.tickers if t.strip()))
+        if not tickers:
+            raise HTTPException(status_code=400, detail="At least one ticker is required")
+        if len(tickers) > CORRELATION_MAX_TICKERS:
+            raise HTTPException(status_code=400, detail=f"Too many tickers. Maximum is {CORRELATION_MAX_TICKERS}")
+
+        requested = [(ticker, detect_market(ticker)) for ticker in tickers]
+        markets = sorted({market for _, market in requested})
+        # 여러 시장에 걸친 결과는 가장 먼저 새 봉이 생기는 시장에 맞춰 만료
+        ttl = min(analysis_cache.ttl_for(market, request.timeframe) for market in markets)
+        key = (
+            "correlation", tuple(t.upper() for t in tickers), request.timeframe, request.years,
+            tuple(lookbacks), request.min_periods, request.include_covariance
+        )
+        entry = await analysis_cache.get_or_compute(
+            key, markets[0], request.timeframe,
+            lambda: stock_service.correlate_stocks(
+                requested, request.timeframe, request.years, lookbacks, request.min_periods,
+                request.include_covariance
+            ),
+            ttl=ttl
+        )
+        headers = analysis_cache.cache_headers(entry)
+        if analysis_cache.etag_matches(if_none_match, entry.etag):
+            return Response(status_code=304, headers=headers)
+        # 수백 종목이면 행렬 원소가 수십만 개이므로 pydantic 직렬화로 바로 JSON을 만듦
+        with metrics.stage("serialize_json"):
+            return Response(content=entry.value.model_dump_json(), media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+# 작업 하나에 넣을 수 있는 최대 종목 수 (동기 /batch, /backtest보다 큼)
+JOB_MAX_TICKERS = 2000
+# 대기열이 가득 찼을 때 다시 시도하라고 알려 주는 시간(초)
+JOB_RETRY_AFTER_SECONDS = 30
+
+def _submit_job(kind: str, timeframe: str, requested, run_item) -> Response:
+    try:
+        job = jobs.submit(kind, timeframe, requested, run_item)
+    except jobs.JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+    return JSONResponse(status_code=202, content=jsonable_encoder(jobs.status(job)))
+
+def _get_job(job_id: str) -> jobs.Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.post("/jobs/analyze", response_model=JobStatus, status_code=202)
+async def submit_analysis_job(request: BatchAnalysisRequest):
+    """종목별 분석을 백그라운드 작업으로 실행. 결과는 /jobs/{id} 조회나 /jobs/{id}/stream으로 받음"""
+    if request.timeframe not in VALID_TIMEFRAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid timeframe. Must be one of: {', '.join(VALID_TIMEFRAMES)}"
+        )
+    tickers = list(dict.fromkeys(t.strip() for t in request.tickers if t.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    if len(tickers) > JOB_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"Too many tickers. Maximum is {JOB_MAX_TICKERS}")
+    timeframe = request.timeframe
+
+    async def run_item(ticker: str, market: str) -> JobItem:
+        if market == 'KR' and timeframe.endswith('m'):
+            raise ValueError("Minute-level data is not available for Korean stocks. Please use daily, weekly, or monthly.")
+        # /analyze와 같은 캐시를 사용하고, 지표 계산은 프로세스 풀에서 실행
+        entry = await analysis_cache.get_or_compute(
+            analysis_cache.analysis_key(ticker, market, timeframe), market, timeframe,
+            lambda: stock_service.analyze_stock(ticker, market, timeframe, offload=True)
+        )
+        return JobItem(ticker=ticker, market=market, status="ok", analysis=entry.value)
+
+    return _submit_job("analyze", timeframe, [(ticker, detect_market(ticker)) for ticker in tickers], run_item)
+
+@router.post("/jobs/backtest", response_model=JobStatus, status_code=202)
+async def submit_backtest_job(request: BacktestRequest):
+    requested, grid = _backtest_plan(request, JOB_MAX_TICKERS)
+
+    async def run_item(ticker: str, market: str) -> JobItem:
+        outcome = (await stock_service.backtest_stocks(
+            [(ticker, market)], request.timeframe, request.years, grid, request.cost_bps, request.allow_short
+        ))[(ticker, market)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return JobItem(ticker=ticker, market=market, status="ok", backtest=_backtest_rows(request, ticker, market, outcome))
+
+    return _submit_job("backtest", request.timeframe, requested, run_item)
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, offset: int = Query(0, ge=0, description="이 순번부터의 결과만 반환 (이어서 조회)")):
+    return jobs.status(_get_job(job_id), offset)
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str, offset: int = Query(0, ge=0), accept: Optional[str] = Header(None)):
+    """종목이 끝날 때마다 결과를 한 줄씩 전송 (기본 NDJSON, Accept: text/event-stream이면 SSE)"""
+    job = _get_job(job_id)
+    sse = "text/event-stream" in (accept or "")
+
+    async def body():
+        async for event, payload in jobs.events(job, offset):
+            if sse:
+                yield f"event: {event}\ndata: {payload}\n\n"
+            else:
+                yield f'{{"event":"{event}","data":{payload}}}\n'
+
+    return StreamingResponse(
+        body(), media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    job = _get_job(job_id)
+    await jobs.cancel(job)
+    return jobs.status(job, results=False)
+
+@router.get("/warmup/status", response_model=WarmupStatus)
+async def get_warmup_status():
+    try:
+        return warmup.status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/indicators/{ticker}")
-async def get_technical_indicators(ticker: str, timeframe: str = "daily"):
+async def get_technical_indicators(ticker: str, response: Response, timeframe: str = "daily",
+                                   if_none_match: Optional[str] = Header(None)):
     try:
         if timeframe not in ["daily", "weekly", "hourly"]:
             raise HTTPException(status_code=400, detail="Invalid timeframe. Must be one of: daily, weekly, hourly")
             
         detected_market = detect_market(ticker)
-        indicators = await stock_service.get_technical_indicators(ticker, detected_market, timeframe)
-        return indicators
+        if timeframe == "hourly":
+            # 시간봉은 미국 주식 60분봉으로 계산
+            if detected_market == 'KR':
+                raise HTTPException(
+                    status_code=400,
+                    detail="Hourly data is not available for Korean stocks. Please use daily or weekly."
+                )
+            timeframe = "60m"
+        entry = await analysis_cache.get_or_compute(
+            ("indicators", ticker.upper(), detected_market, timeframe), detected_market, timeframe,
+            lambda: stock_service.get_technical_indicators(ticker, detected_market, timeframe)
+        )
+        headers = analysis_cache.cache_headers(entry)
+        if analysis_cache.etag_matches(if_none_match, entry.etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return entry.value
+    except HTTPException:
+        raise
+    except providers.ProviderUnavailable as e:
+        raise _provider_unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 실시간 스트림은 미국 주식 분봉만 지원
+STREAM_TIMEFRAMES = [tf for tf in VALID_TIMEFRAMES if tf.endswith('m')]
+
+@router.websocket("/stream/{ticker}")
+async def stream_indicators(websocket: WebSocket, ticker: str, timeframe: str = "1m"):
+    if timeframe not in STREAM_TIMEFRAMES or detect_market(ticker) != 'US':
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    queue = streaming.hub.subscribe(ticker, timeframe)
+    # 클라이언트 연결 종료를 바로 감지하기 위해 수신 대기를 함께 걸어둠
+    receiver = asyncio.ensure_future(websocket.receive_text())
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                receiver.result()
+                # 클라이언트 메시지는 무시하고 다시 대기
+                receiver = asyncio.ensure_future(websocket.receive_text())
+                continue
+            await websocket.send_json(getter.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        streaming.hub.unsubscribe(ticker, timeframe, queue)
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from . import metrics, trading_calendar, upstream
+
+# 캐시 최대 항목 수
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "512"))
+# 장중 캐시 유지 시간(초): 일/주/월봉, 분봉
+SESSION_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_SESSION_TTL", "60"))
+INTRADAY_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_INTRADAY_TTL", "15"))
+# 장 마감 직후에는 종가 확정 전일 수 있으므로 이 시간(초) 동안은 장중과 같은 TTL 적용
+CLOSE_SETTLE_SECONDS = 30 * 60
+
+class CacheEntry(NamedTuple):
+    value: Any
+    etag: str
+    expires_at: float
+
+class TTLCache:
+    """만료 시간이 있는 LRU 캐시"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """적중 통계와 LRU 순서를 바꾸지 않고 유효한 항목만 조회"""
+        entry = self.entries.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: float, etag: str) -> CacheEntry:
+        entry = CacheEntry(value, etag, time.time() + ttl)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+_cache = TTLCache(ANALYSIS_CACHE_SIZE)
+metrics.register_cache("analysis", lambda: (_cache.hits, _cache.misses))
+
+def analysis_key(ticker: str, market: str, timeframe: str, start: Optional[date] = None,
+                 end: Optional[date] = None, limit: Optional[int] = None) -> Tuple:
+    """/analyze 결과의 캐시 키 (예열 작업도 같은 키를 사용). 구간 조회는 구간별로 따로 캐시"""
+    key = ("analyze", ticker.upper(), market, timeframe)
+    if start is None and end is None and limit is None:
+        return key
+    return key + (start, end, limit)
+
+def peek(key: Hashable) -> Optional[CacheEntry]:
+    return _cache.peek(key)
+
+def ttl_for(market: str, timeframe: str, now: Optional[datetime] = None) -> float:
+    """장중에는 짧은 TTL, 장 마감 후에는 다음 개장 시각까지 유지"""
+    market = market.upper()
+    now = now or trading_calendar.now_in(market)
+    session_ttl = INTRADAY_TTL_SECONDS if timeframe.endswith('m') else SESSION_TTL_SECONDS
+    if trading_calendar.is_open(market, now):
+        return session_ttl
+    if (now - trading_calendar.last_close(market, now)).total_seconds() < CLOSE_SETTLE_SECONDS:
+        return session_ttl
+    return max((trading_calendar.next_open(market, now) - now).total_seconds(), session_ttl)
+
+def compute_etag(value: Any) -> str:
+    # pydantic 모델은 직렬화가 빠른 model_dump를 사용 (상관 행렬처럼 원소가 많은 결과)
+    payload = value.model_dump(mode="json") if isinstance(value, BaseModel) else jsonable_encoder(value)
+    # 계산 시각은 내용이 같으면 달라도 같은 결과로 취급 (weak ETag)
+    if isinstance(payload, dict):
+        payload.pop("timestamp", None)
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+def variant_etag(etag: str, *parts: str) -> str:
+    """같은 결과를 다른 형태로 내보낼 때 쓰는 ETag"""
+    suffix = "-".join(p for p in parts if p)
+    if not suffix:
+        return etag
+    return f'{etag[:-1]}-{suffix}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def cache_headers(entry: CacheEntry) -> Dict[str, str]:
+    max_age = max(int(entry.expires_at - time.time()), 0)
+    return {"ETag": entry.etag, "Cache-Control": f"private, max-age={max_age}"}
+
+async def get_or_compute(key: Hashable, market: str, timeframe: str,
+                         compute: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> CacheEntry:
+    """ttl을 주면 시장 기준 TTL 대신 사용 (여러 시장에 걸친 결과)"""
+    entry = _cache.get(key)
+    if entry is not None:
+        return entry
+
+    async def _compute() -> CacheEntry:
+        value = await compute()
+        return _cache.set(key, value, ttl if ttl is not None else ttl_for(market, timeframe), compute_etag(value))
+
+    return await upstream.coalesce(("analysis_cache", key), _compute)
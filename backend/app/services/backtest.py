@@ -0,0 +1,130 @@
+import itertools
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .indicators import compute_indicators, rolling_mean
+from .signals import HOLD, SELL, recommendation_votes
+
+# 연율화에 사용하는 timeframe별 연간 봉 수
+PERIODS_PER_YEAR = {"daily": 252, "weekly": 52, "monthly": 12}
+
+class BacktestParams(NamedTuple):
+    rsi_low: float = 30
+    rsi_high: float = 70
+    sma_fast: int = 50
+    sma_slow: int = 200
+
+class BacktestMetrics(NamedTuple):
+    total_return: float
+    annual_return: float
+    max_drawdown: float
+    hit_rate: Optional[float]
+    trades: int
+    exposure: float
+    buy_and_hold_return: float
+
+def parameter_grid(rsi_low: Sequence[float], rsi_high: Sequence[float],
+                   sma_fast: Sequence[int], sma_slow: Sequence[int]) -> List[BacktestParams]:
+    """유효한(하한 < 상한, 단기 < 장기) 조합만 남긴 파라미터 격자"""
+    return [
+        BacktestParams(float(low), float(high), int(fast), int(slow))
+        for low, high, fast, slow in itertools.product(rsi_low, rsi_high, sma_fast, sma_slow)
+        if low < high and fast < slow
+    ]
+
+def positions(votes: np.ndarray, allow_short: bool = False) -> np.ndarray:
+    """매수 신호 이후 보유(1), 매도 신호 이후 청산(0, allow_short면 -1), 관망은 직전 포지션 유지
+
+    votes의 0번 축이 시간이며, 첫 신호 이전은 미보유
+    """
+    target = np.where(votes == SELL, -1.0 if allow_short else 0.0, 1.0)
+    rows = np.arange(len(votes)).reshape((-1,) + (1,) * (votes.ndim - 1))
+    last_signal = np.maximum.accumulate(np.where(votes != HOLD, rows, -1), axis=0)
+    held = np.take_along_axis(target, np.maximum(last_signal, 0), axis=0)
+    return np.where(last_signal >= 0, held, 0.0)
+
+def simulate(close: np.ndarray, position: np.ndarray, periods_per_year: int,
+             cost_bps: float = 0.0) -> List[BacktestMetrics]:
+    """종가 (T,)와 포지션 (T, K)로 K개 전략의 성과를 한 번에 계산
+
+    t 봉 종가에 정한 포지션은 t+1 봉 수익률에 적용하며, 포지션 변경 시 cost_bps만큼 비용 차감
+    """
+    length, combos = position.shape
+    returns = np.zeros(length)
+    returns[1:] = close[1:] / close[:-1] - 1
+
+    held = np.zeros_like(position)
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(held, axis=0, prepend=0.0))
+    strategy = held * returns[:, None] - turnover * (cost_bps / 1e4)
+
+    log_equity = np.cumsum(np.log1p(np.maximum(strategy, -0.999999)), axis=0)
+    equity = np.exp(log_equity)
+    drawdown = equity / np.maximum.accumulate(np.maximum(equity, 1.0), axis=0) - 1
+    total_return = equity[-1] - 1
+    annual_return = equity[-1] ** (periods_per_year / max(length - 1, 1)) - 1
+
+    # 거래: 같은 방향 포지션이 유지되는 구간. 열 우선으로 찾으면 시작/종료가 순서대로 짝지어짐
+    active = held != 0
+    next_held = np.vstack([held[1:], np.zeros((1, combos))])
+    prev_held = np.vstack([np.zeros((1, combos)), held[:-1]])
+    start_cols, start_rows = np.nonzero((active & (held != prev_held)).T)
+    _, end_rows = np.nonzero((active & (held != next_held)).T)
+    before_start = np.where(start_rows > 0, log_equity[np.maximum(start_rows - 1, 0), start_cols], 0.0)
+    trade_log_returns = log_equity[end_rows, start_cols] - before_start
+    trades = np.bincount(start_cols, minlength=combos)
+    wins = np.bincount(start_cols, weights=trade_log_returns > 0, minlength=combos)
+
+    buy_and_hold = float(close[-1] / close[0] - 1)
+    exposure = active.mean(axis=0)
+    max_drawdown = drawdown.min(axis=0)
+    return [
+        BacktestMetrics(
+            total_return=float(total_return[k]),
+            annual_return=float(annual_return[k]),
+            max_drawdown=float(max_drawdown[k]),
+            hit_rate=float(wins[k] / trades[k]) if trades[k] else None,
+            trades=int(trades[k]),
+            exposure=float(exposure[k]),
+            buy_and_hold_return=buy_and_hold,
+        )
+        for k in range(combos)
+    ]
+
+def backtest_grid(close: np.ndarray, grid: Sequence[BacktestParams], periods_per_year: int = 252,
+                  cost_bps: float = 0.0, allow_short: bool = False) -> List[BacktestMetrics]:
+    """_get_recommendation 투표 규칙을 전체 구간에 적용해 파라미터 조합별 성과를 계산
+
+    MACD/RSI는 한 번, SMA는 창 크기별로 한 번 계산하고 RSI 임계값 조합은 열로 펼쳐 동시에 평가
+    """
+    close = np.asarray(close, dtype=np.float64)
+    close = close[np.isfinite(close)]
+    if len(close) < 2:
+        raise ValueError("Not enough price history for backtest")
+
+    series = compute_indicators(close)
+    sma_cache: Dict[int, np.ndarray] = {}
+
+    def sma(window: int) -> np.ndarray:
+        if window not in sma_cache:
+            sma_cache[window] = rolling_mean(close, window)
+        return sma_cache[window]
+
+    groups: Dict[tuple, List[int]] = {}
+    for i, params in enumerate(grid):
+        groups.setdefault((params.sma_fast, params.sma_slow), []).append(i)
+
+    results: List[Optional[BacktestMetrics]] = [None] * len(grid)
+    for (fast, slow), members in groups.items():
+        rsi_low = np.array([grid[i].rsi_low for i in members])
+        rsi_high = np.array([grid[i].rsi_high for i in members])
+        votes = recommendation_votes(
+            series.rsi[:, None], series.macd[:, None], series.histogram[:, None],
+            sma(fast)[:, None], sma(slow)[:, None],
+            rsi_low=rsi_low[None, :], rsi_high=rsi_high[None, :]
+        )
+        metrics = simulate(close, positions(votes, allow_short), periods_per_year, cost_bps)
+        for i, result in zip(members, metrics):
+            results[i] = result
+    return results
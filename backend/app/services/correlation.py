@@ -0,0 +1,108 @@
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+# 시장별 베타/상대강도 기준 지수 (yfinance 심볼)
+BENCHMARKS = {"KR": "^KS11", "US": "^GSPC"}
+# timeframe별 기본 상대강도 기간(봉 수): 약 1, 3, 6, 12개월
+DEFAULT_LOOKBACKS = {
+    "daily": [21, 63, 126, 252],
+    "weekly": [4, 13, 26, 52],
+    "monthly": [1, 3, 6, 12],
+}
+
+class PairwiseStats(NamedTuple):
+    observations: np.ndarray
+    covariance: np.ndarray
+    correlation: np.ndarray
+    beta: np.ndarray
+
+class RelativeStrength(NamedTuple):
+    returns: np.ndarray
+    relative: np.ndarray
+    score: np.ndarray
+    rank: np.ndarray
+
+def simple_returns(close: np.ndarray) -> np.ndarray:
+    """종가 (T, N) -> 수익률 (T-1, N). 양 끝 중 하나라도 NaN이면 NaN"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return close[1:] / close[:-1] - 1
+
+def pairwise_stats(returns: np.ndarray, min_periods: int = 20) -> PairwiseStats:
+    """수익률 (T, N)의 쌍별 공분산/상관계수/베타
+
+    상장 시점이 달라 결측이 있는 열도 버리지 않도록 두 종목 모두 값이 있는 날만 사용(pairwise complete)
+    결측을 0으로 채운 행렬과 관측 마스크의 행렬곱(BLAS)으로 쌍별 합계를 한 번에 구함
+    beta[i, j]는 j에 대한 i의 베타. 공통 관측 수가 min_periods 미만이면 NaN
+    """
+    valid = ~np.isnan(returns)
+    mask = valid.astype(np.float64)
+    x = np.where(valid, returns, 0.0)
+
+    n = mask.T @ mask
+    # sx[i, j]: j도 값이 있는 날의 i 합계, sxx[i, j]: 같은 날의 i 제곱합
+    sx = x.T @ mask
+    sxx = (x * x).T @ mask
+    sxy = x.T @ x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        co_moment = n * sxy - sx * sx.T
+        var_i = n * sxx - sx * sx
+        var_j = var_i.T
+        covariance = co_moment / (n * (n - 1))
+        correlation = co_moment / np.sqrt(var_i * var_j)
+        beta = co_moment / var_j
+
+    insufficient = n < max(min_periods, 2)
+    for values in (covariance, correlation, beta):
+        values[insufficient] = np.nan
+    # 반올림 오차로 [-1, 1]을 살짝 벗어나는 값 정리
+    np.clip(correlation, -1.0, 1.0, out=correlation)
+    return PairwiseStats(n.astype(np.int64), covariance, correlation, beta)
+
+def trailing_returns(close: np.ndarray, lookbacks: Sequence[int]) -> np.ndarray:
+    """마지막 봉 기준 기간별 수익률 (len(lookbacks), N). 기간보다 이력이 짧으면 NaN"""
+    result = np.full((len(lookbacks), close.shape[1]), np.nan)
+    last = close[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k, lookback in enumerate(lookbacks):
+            if 0 < lookback < len(close):
+                result[k] = last / close[-1 - lookback] - 1
+    return result
+
+def relative_strength(close: np.ndarray, benchmark_close: np.ndarray,
+                      lookbacks: Sequence[int]) -> RelativeStrength:
+    """종목별 기준 지수 대비 초과 수익률과 순위
+
+    benchmark_close는 close와 같은 모양으로 각 열에 해당 종목의 기준 지수 종가를 담음
+    점수는 기간별 상대 수익률의 평균이며, 순위는 1이 가장 강함 (점수가 없으면 0)
+    """
+    returns = trailing_returns(close, lookbacks)
+    benchmark = trailing_returns(benchmark_close, lookbacks)
+    relative = (1 + returns) / (1 + benchmark) - 1
+
+    valid = ~np.isnan(relative)
+    counts = valid.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(valid, relative, 0.0).sum(axis=0) / counts
+    score[counts == 0] = np.nan
+
+    rank = np.zeros(len(score), dtype=np.int64)
+    scored = np.flatnonzero(~np.isnan(score))
+    rank[scored[np.argsort(-score[scored], kind="stable")]] = np.arange(1, len(scored) + 1)
+    return RelativeStrength(returns, relative, score, rank)
+
+def annualized_volatility(returns: np.ndarray, periods_per_year: int) -> np.ndarray:
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=0)
+    x = np.where(valid, returns, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = x.sum(axis=0) / counts
+        variance = (np.where(valid, returns - mean, 0.0) ** 2).sum(axis=0) / (counts - 1)
+    variance[counts < 2] = np.nan
+    return np.sqrt(variance * periods_per_year)
+
+def to_rows(values: np.ndarray, decimals: int = 6) -> List:
+    """NaN/inf를 None으로 바꾼 (중첩) 리스트 (JSON 응답용)"""
+    rounded = np.round(values, decimals)
+    return np.where(np.isfinite(rounded), rounded, None).tolist()
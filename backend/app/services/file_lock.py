@@ -0,0 +1,50 @@
+import asyncio
+import contextlib
+import os
+import logging
+import time
+from typing import AsyncIterator
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: 프로세스 간 잠금 없이 동작 (워커 하나로 실행하는 개발 환경)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 잠금 대기 중 재시도 간격(초)
+LOCK_POLL_SECONDS = 0.05
+
+@contextlib.asynccontextmanager
+async def locked(path: str, timeout: float = 30.0) -> AsyncIterator[bool]:
+    """여러 워커 프로세스 사이의 배타 잠금 (flock)
+
+    이벤트 루프를 막지 않도록 논블로킹으로 재시도하며, timeout 안에 얻지 못하면 잠금 없이 진행(False)
+    timeout=0이면 한 번만 시도. 잡은 프로세스가 죽으면 커널이 잠금을 풀어 줌
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    acquired = False
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+        if not acquired and timeout > 0:
+            logger.warning(f"Timed out after {timeout}s waiting for {path}, continuing without lock")
+        yield acquired
+    finally:
+        if acquired:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -0,0 +1,225 @@
+import json
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from . import file_lock
+
+logger = logging.getLogger(__name__)
+
+# 종목별 OHLCV 히스토리를 저장하는 디렉터리
+HISTORY_DIR = os.getenv(
+    "STOCK_HISTORY_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "history")
+)
+
+_BARS_FILE = "bars.npy"
+_META_FILE = "meta.json"
+_LOCK_FILE = ".lock"
+# 프로세스마다 열어 둔 memory-map 수. meta.json이 바뀌지 않았으면 다시 읽지 않고 재사용
+HANDLE_CACHE_SIZE = int(os.getenv("HISTORY_HANDLE_CACHE_SIZE", "256"))
+# 다른 워커가 같은 종목을 받는 동안 기다리는 최대 시간(초)
+FETCH_LOCK_TIMEOUT_SECONDS = float(os.getenv("HISTORY_FETCH_LOCK_TIMEOUT", "30"))
+
+class StoredHistory(NamedTuple):
+    frame: pd.DataFrame
+    coverage_start: datetime
+    updated_at: float
+
+# 키 디렉터리 -> ((meta inode, mtime), 읽은 히스토리). 부팅 시 선로딩 스레드와 함께 쓰므로 잠금 사용
+_handles: "OrderedDict[str, Tuple[Tuple[int, int], StoredHistory]]" = OrderedDict()
+_handles_lock = threading.Lock()
+
+def _key_dir(market: str, ticker: str, interval: str) -> str:
+    return os.path.join(HISTORY_DIR, market.upper(), interval, ticker.upper())
+
+def epoch_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.values.astype("datetime64[s]").astype(np.int64).astype(np.float64)
+
+def _from_epoch_seconds(seconds: np.ndarray, tz: Optional[str]) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(seconds.astype(np.int64).astype("datetime64[s]").astype("datetime64[ns]"))
+    if tz:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return index
+
+def _atomic_write(path: str, write) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def load(market: str, ticker: str, interval: str) -> Optional[StoredHistory]:
+    """저장된 히스토리를 memory-map으로 읽음. 없거나 손상된 경우 None
+
+    실수형 열은 파일 페이지를 그대로 가리키므로 여러 워커가 같은 종목을 읽어도 메모리는 한 벌만 사용됨
+    반환된 frame은 읽기 전용 (수정하려면 복사)
+    """
+    key_dir = _key_dir(market, ticker, interval)
+    meta_path = os.path.join(key_dir, _META_FILE)
+    try:
+        stat = os.stat(meta_path)
+    except FileNotFoundError:
+        with _handles_lock:
+            _handles.pop(key_dir, None)
+        return None
+
+    # 다른 워커가 저장하면 meta.json이 새 파일로 교체되므로 inode/mtime으로 변경을 감지
+    version = (stat.st_ino, stat.st_mtime_ns)
+    with _handles_lock:
+        cached = _handles.get(key_dir)
+        if cached is not None and cached[0] == version:
+            _handles.move_to_end(key_dir)
+            return cached[1]
+
+    stored = _read(market, ticker, interval, key_dir, meta_path)
+    if stored is not None:
+        with _handles_lock:
+            _handles[key_dir] = (version, stored)
+            _handles.move_to_end(key_dir)
+            while len(_handles) > HANDLE_CACHE_SIZE:
+                _handles.popitem(last=False)
+    return stored
+
+def preload(limit: int = HANDLE_CACHE_SIZE) -> int:
+    """최근에 저장된 종목부터 limit개를 미리 열어 둠 (부팅 직후 요청이 파일을 다시 읽지 않도록)"""
+    entries = []
+    for market in _list_dir(HISTORY_DIR):
+        for interval in _list_dir(os.path.join(HISTORY_DIR, market)):
+            for ticker in _list_dir(os.path.join(HISTORY_DIR, market, interval)):
+                try:
+                    mtime = os.stat(os.path.join(_key_dir(market, ticker, interval), _META_FILE)).st_mtime
+                except OSError:
+                    continue
+                entries.append((mtime, market, ticker, interval))
+    entries.sort(reverse=True)
+    # 캐시 끝(가장 최근 사용)에 최신 항목이 오도록 오래된 것부터 읽음
+    loaded = 0
+    for _, market, ticker, interval in reversed(entries[:min(limit, HANDLE_CACHE_SIZE)]):
+        if load(market, ticker, interval) is not None:
+            loaded += 1
+    return loaded
+
+def _list_dir(path: str):
+    try:
+        return [name for name in os.listdir(path) if not name.startswith(".")]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+def _read(market: str, ticker: str, interval: str, key_dir: str, meta_path: str) -> Optional[StoredHistory]:
+    # meta.json을 읽은 직후 다른 워커가 저장하면서 이전 bars 파일을 지웠을 수 있으므로 한 번 더 시도
+    for attempt in range(2):
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            bars = np.load(os.path.join(key_dir, meta.get("bars", _BARS_FILE)), mmap_mode="r")
+            break
+        except FileNotFoundError:
+            if attempt:
+                return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable history for {market}/{ticker}/{interval}: {str(e)}")
+            return None
+
+    # 열 단위로 저장된 배열은 전치 뷰로 읽음 (각 열이 연속 메모리)
+    if meta.get("layout") == "columns":
+        bars = bars.T
+    columns = meta["columns"]
+    if bars.ndim != 2 or bars.shape[1] != len(columns) + 1:
+        logger.warning(f"History shape mismatch for {market}/{ticker}/{interval}, ignoring")
+        return None
+
+    frame = pd.DataFrame(
+        bars[:, 1:],
+        index=_from_epoch_seconds(bars[:, 0], meta.get("tz")),
+        columns=columns,
+        copy=False
+    )
+    # astype는 전체를 복사하므로 실수형이 아닌 열(거래량 등)만 바꿔 끼움
+    for column, dtype in meta["dtypes"].items():
+        if dtype != "float64":
+            frame[column] = frame[column].astype(dtype)
+    frame.index.name = meta.get("index_name")
+    return StoredHistory(
+        frame=frame,
+        coverage_start=datetime.fromisoformat(meta["coverage_start"]),
+        updated_at=meta["updated_at"]
+    )
+
+def save(market: str, ticker: str, interval: str, frame: pd.DataFrame, coverage_start: datetime) -> None:
+    """새 bars 파일을 쓴 뒤 meta.json 교체로 한 번에 공개. 읽는 쪽은 항상 짝이 맞는 meta/bars를 봄"""
+    key_dir = _key_dir(market, ticker, interval)
+    os.makedirs(key_dir, exist_ok=True)
+
+    numeric = frame.select_dtypes(include=[np.number])
+    bars = np.vstack([
+        epoch_seconds(numeric.index),
+        numeric.to_numpy(dtype=np.float64).T
+    ]) if len(numeric) else np.empty((len(numeric.columns) + 1, 0))
+    bars_file = f"bars.{time.time_ns()}.{os.getpid()}.npy"
+    meta = {
+        "bars": bars_file,
+        "layout": "columns",
+        "columns": [str(c) for c in numeric.columns],
+        "dtypes": {str(c): str(t) for c, t in numeric.dtypes.items()},
+        "tz": str(numeric.index.tz) if numeric.index.tz is not None else None,
+        "index_name": numeric.index.name,
+        "coverage_start": coverage_start.isoformat(),
+        "updated_at": time.time()
+    }
+
+    _atomic_write(os.path.join(key_dir, bars_file), lambda f: np.save(f, np.ascontiguousarray(bars)))
+    _atomic_write(
+        os.path.join(key_dir, _META_FILE),
+        lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    )
+    # 이전 bars 파일 정리. 이미 memory-map으로 연 프로세스는 파일이 지워져도 계속 읽을 수 있음
+    for name in os.listdir(key_dir):
+        if name.startswith("bars.") and name.endswith(".npy") and name != bars_file:
+            try:
+                os.remove(os.path.join(key_dir, name))
+            except OSError:
+                pass
+
+def fetch_lock(market: str, ticker: str, interval: str):
+    """같은 종목을 여러 워커가 동시에 업스트림에서 받지 않도록 하는 프로세스 간 잠금"""
+    return file_lock.locked(
+        os.path.join(_key_dir(market, ticker, interval), _LOCK_FILE), FETCH_LOCK_TIMEOUT_SECONDS
+    )
+
+def merge(stored: Optional[pd.DataFrame], new: pd.DataFrame) -> pd.DataFrame:
+    """새로 받은 봉을 기존 히스토리에 덧붙임. 겹치는 봉은 새 값으로 교체"""
+    if stored is None or stored.empty:
+        return new.sort_index()
+    if new.empty:
+        return stored
+    new = new.sort_index()
+    new = new[[c for c in stored.columns if c in new.columns]]
+    merged = pd.concat([stored[stored.index < new.index[0]], new])
+    return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+def range_positions(index: pd.DatetimeIndex, start: Optional[date] = None,
+                    end: Optional[date] = None) -> Tuple[int, int]:
+    """[start, end] 날짜 구간(양 끝 포함)의 위치 범위를 정렬된 인덱스에서 이진 탐색으로 구함"""
+    def bound(day: date) -> pd.Timestamp:
+        ts = pd.Timestamp(day)
+        return ts.tz_localize(index.tz) if index.tz is not None else ts
+
+    first = int(index.searchsorted(bound(start))) if start is not None else 0
+    last = int(index.searchsorted(bound(end + timedelta(days=1)))) if end is not None else len(index)
+    return first, max(last, first)
+
+def slice_from(frame: pd.DataFrame, start: datetime) -> pd.DataFrame:
+    start_ts = pd.Timestamp(start)
+    if frame.index.tz is not None:
+        start_ts = start_ts.tz_localize(frame.index.tz)
+    # 정렬된 인덱스이므로 위치 슬라이스 (memory-map 뷰를 복사하지 않음)
+    return frame.iloc[frame.index.searchsorted(start_ts):]
@@ -0,0 +1,158 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+# 시계열 축은 항상 axis 0. 1차원(단일 종목) 또는 2차원(날짜 x 종목) 배열 모두 지원
+# 앞쪽 NaN(상장 전 구간 등)은 허용되며, 해당 구간의 지표는 NaN으로 남음
+
+class IndicatorSeries(NamedTuple):
+    sma_20: np.ndarray
+    sma_50: np.ndarray
+    sma_200: np.ndarray
+    rsi: np.ndarray
+    macd: np.ndarray
+    signal: np.ndarray
+    histogram: np.ndarray
+    bb_upper: np.ndarray
+    bb_middle: np.ndarray
+    bb_lower: np.ndarray
+
+def _expand(weights: np.ndarray, ndim: int) -> np.ndarray:
+    return weights.reshape(weights.shape + (1,) * (ndim - 1))
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    # 누적합 차분으로 O(n) 계산. 누적은 항상 float64로 수행
+    csum = np.cumsum(values, axis=0, dtype=np.float64)
+    sums = csum[window - 1:].copy()
+    sums[1:] -= csum[:-window]
+    return sums
+
+def _window_stats(values: np.ndarray, window: int, squares: bool = False):
+    """윈도 내 유효값 개수, 합, (선택) 제곱합. 결과 길이는 n - window + 1"""
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0)
+    counts = _rolling_sum(valid, window)
+    sums = _rolling_sum(filled, window)
+    sum_squares = _rolling_sum(filled * filled, window) if squares else None
+    return counts, sums, sum_squares
+
+def rolling_mean(values: np.ndarray, window: int, dtype=np.float64) -> np.ndarray:
+    values = np.asarray(values, dtype=dtype)
+    out = np.full(values.shape, np.nan, dtype=dtype)
+    if len(values) < window:
+        return out
+    counts, sums, _ = _window_stats(values, window)
+    out[window - 1:] = np.where(counts == window, sums / window, np.nan)
+    return out
+
+def _first_valid(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    first = np.argmax(valid, axis=0)
+    return np.where(valid.any(axis=0), first, len(values))
+
+def ema(values: np.ndarray, span: int, dtype=np.float64) -> np.ndarray:
+    """pandas ewm(span, adjust=False)와 같은 지수이동평균
+
+    y[t] = beta * y[t-1] + alpha * x[t] 점화식을 블록 단위 닫힌 식으로 풀어
+    블록 안에서는 누적합 한 번으로 계산함
+    """
+    values = np.asarray(values, dtype=dtype)
+    n = len(values)
+    out = np.full(values.shape, np.nan, dtype=dtype)
+    if n == 0:
+        return out
+
+    alpha = 2.0 / (span + 1.0)
+    beta = 1.0 - alpha
+    first = _first_valid(values)
+    # 앞쪽 NaN은 첫 유효값으로 채움: 상수 입력의 EMA는 그 값이므로 첫 유효 시점의 값이 그대로 유지됨
+    seed = np.take_along_axis(values, np.minimum(first, n - 1)[None, ...], axis=0)[0] \
+        if values.ndim > 1 else values[min(int(first), n - 1)]
+    leading = _expand(np.arange(n), values.ndim) < first
+    seeded = np.where(leading, seed, values)
+
+    # beta^-block 이 dtype 범위를 넘지 않도록 블록 길이 결정
+    max_exponent = 600.0 if np.dtype(dtype).itemsize >= 8 else 70.0
+    block = max(1, min(256, int(max_exponent / -math.log(beta)))) if beta > 0 else 1
+    steps = np.arange(block, dtype=np.float64)
+    decay = _expand((beta ** (steps + 1)).astype(dtype), values.ndim)
+    growth = _expand((beta ** -steps).astype(dtype), values.ndim)
+    shrink = _expand((beta ** steps).astype(dtype), values.ndim)
+
+    carry = seeded[0]
+    for start in range(0, n, block):
+        chunk = seeded[start:start + block]
+        m = len(chunk)
+        acc = np.cumsum(chunk * growth[:m], axis=0) * shrink[:m] * alpha
+        out[start:start + m] = decay[:m] * carry + acc
+        carry = out[start + m - 1]
+
+    out[leading] = np.nan
+    return out
+
+def rsi(values: np.ndarray, period: int = 14, dtype=np.float64) -> np.ndarray:
+    """단순 이동평균 기반 RSI (기존 분석 결과와 동일한 정의)"""
+    values = np.asarray(values, dtype=dtype)
+    delta = np.full(values.shape, np.nan, dtype=dtype)
+    delta[1:] = values[1:] - values[:-1]
+    # 첫 유효 시점의 변화량은 0으로 취급 (pandas diff + where 와 동일)
+    first = _first_valid(values)
+    at_first = _expand(np.arange(len(values)), values.ndim) == first
+    delta[at_first] = 0
+
+    gains = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0)).astype(dtype)
+    losses = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0)).astype(dtype)
+    avg_gains = rolling_mean(gains, period, dtype)
+    avg_losses = rolling_mean(losses, period, dtype)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gains / avg_losses
+        return (100 - (100 / (1 + rs))).astype(dtype)
+
+def compute_indicators(close: np.ndarray, dtype=np.float64) -> IndicatorSeries:
+    """SMA 20/50/200, RSI(14), MACD(12, 26, 9), 볼린저 밴드(20, 2σ)를 한 번에 계산
+
+    SMA20의 윈도 합/제곱합을 볼린저 밴드 중심선과 표준편차에 그대로 재사용함
+    """
+    close = np.asarray(close, dtype=dtype)
+    n = len(close)
+
+    sma_50 = rolling_mean(close, 50, dtype)
+    sma_200 = rolling_mean(close, 200, dtype)
+
+    # 볼린저 밴드: 종목별 기준값을 빼서 제곱합 계산 시 자릿수 손실을 줄임
+    window = 20
+    middle = np.full(close.shape, np.nan, dtype=dtype)
+    upper = np.full(close.shape, np.nan, dtype=dtype)
+    lower = np.full(close.shape, np.nan, dtype=dtype)
+    if n >= window:
+        first = _first_valid(close)
+        reference = np.take_along_axis(close, np.minimum(first, n - 1)[None, ...], axis=0)[0] \
+            if close.ndim > 1 else close[min(int(first), n - 1)]
+        centered = (close - reference).astype(np.float64)
+        counts, sums, sum_squares = _window_stats(centered, window, squares=True)
+        full = counts == window
+        mean = sums / window
+        variance = np.maximum(sum_squares - sums * mean, 0) / (window - 1)
+        std = np.sqrt(variance)
+        middle[window - 1:] = np.where(full, mean + reference, np.nan)
+        upper[window - 1:] = np.where(full, mean + reference + 2 * std, np.nan)
+        lower[window - 1:] = np.where(full, mean + reference - 2 * std, np.nan)
+
+    fast = ema(close, 12, dtype)
+    slow = ema(close, 26, dtype)
+    macd_line = fast - slow
+    signal_line = ema(macd_line, 9, dtype)
+
+    return IndicatorSeries(
+        sma_20=middle,
+        sma_50=sma_50,
+        sma_200=sma_200,
+        rsi=rsi(close, 14, dtype),
+        macd=macd_line,
+        signal=signal_line,
+        histogram=macd_line - signal_line,
+        bb_upper=upper,
+        bb_middle=middle,
+        bb_lower=lower
+    )
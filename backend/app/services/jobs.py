@@ -0,0 +1,190 @@
+import asyncio
+import os
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..models import JobItem, JobStatus
+from . import metrics, upstream
+
+logger = logging.getLogger(__name__)
+
+# 대기열에 쌓을 수 있는 최대 작업 수 (넘으면 JobQueueFull -> 429)
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "20"))
+# 동시에 실행하는 작업 수와, 작업 하나에서 동시에 처리하는 종목 수
+# 종목 수 기본값은 가장 작은 제공자 한도 이하로 두어 작업 하나가 제공자 슬롯을 모두 차지하지 않게 함
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_ITEM_CONCURRENCY = int(os.getenv("JOB_ITEM_CONCURRENCY", str(min(upstream.PROVIDER_CONCURRENCY.values()))))
+# 끝난 작업 결과를 보관하는 시간(초)과 최대 개수
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+JOB_MAX_STORED = int(os.getenv("JOB_MAX_STORED", "200"))
+# 실시간 요청이 업스트림 한도를 다 쓰고 있을 때 다시 확인하기까지 대기 시간(초)
+JOB_BACKOFF_SECONDS = 0.5
+
+QUEUED, RUNNING, FINISHED, FAILED, CANCELLED = "queued", "running", "finished", "failed", "cancelled"
+DONE_STATES = (FINISHED, FAILED, CANCELLED)
+
+RunItem = Callable[[str, str], Awaitable[JobItem]]
+
+class JobQueueFull(Exception):
+    pass
+
+class Job:
+    """종목 목록을 하나씩 처리하는 백그라운드 작업. 결과는 끝난 순서대로 쌓임"""
+
+    def __init__(self, kind: str, timeframe: str, items: List[Tuple[str, str]], run_item: RunItem):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.timeframe = timeframe
+        self.items = items
+        self.run_item = run_item
+        self.state = QUEUED
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.results: List[JobItem] = []
+        self.failed = 0
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.state in DONE_STATES
+
+    async def _notify(self) -> None:
+        async with self.changed:
+            self.changed.notify_all()
+
+_jobs: "OrderedDict[str, Job]" = OrderedDict()
+_queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+
+def _count_states() -> Dict[str, float]:
+    counts = {state: 0.0 for state in (QUEUED, RUNNING)}
+    for job in _jobs.values():
+        if job.state in counts:
+            counts[job.state] += 1
+    return counts
+
+metrics.register_gauge("stock_jobs", "Number of analysis jobs by state", "state", _count_states)
+
+def submit(kind: str, timeframe: str, items: List[Tuple[str, str]], run_item: RunItem) -> Job:
+    """작업을 대기열에 넣음. 대기열이 가득 차면 JobQueueFull"""
+    _prune()
+    job = Job(kind, timeframe, items, run_item)
+    try:
+        _queue.put_nowait(job)
+    except asyncio.QueueFull:
+        raise JobQueueFull(f"Job queue is full ({JOB_QUEUE_SIZE} jobs waiting). Retry later")
+    _jobs[job.id] = job
+    logger.info(f"Queued {kind} job {job.id} with {len(items)} tickers")
+    return job
+
+def get(job_id: str) -> Optional[Job]:
+    return _jobs.get(job_id)
+
+async def cancel(job: Job) -> None:
+    if job.done:
+        return
+    if job.task is not None:
+        # 실행 중이면 진행 중인 종목 처리까지 취소하고 _run에서 상태를 기록
+        job.task.cancel()
+        await asyncio.wait([job.task])
+    else:
+        # 대기 중이면 작업자가 꺼낼 때 건너뜀
+        job.state = CANCELLED
+        job.finished_at = datetime.now()
+        await job._notify()
+
+def _prune() -> None:
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    finished = [job for job in _jobs.values() if job.done]
+    for job in finished:
+        if job.finished_at.timestamp() < cutoff or len(_jobs) > JOB_MAX_STORED:
+            del _jobs[job.id]
+
+async def _run(job: Job) -> None:
+    slots = asyncio.Semaphore(JOB_ITEM_CONCURRENCY)
+
+    async def run_one(ticker: str, market: str) -> None:
+        async with slots:
+            # 실시간 요청이 업스트림 동시 호출 한도를 다 쓰고 있으면 빌 때까지 양보
+            # (업스트림 호출 자체도 백그라운드 몫으로 제한되고 대기 중인 실시간 요청 뒤로 밀림)
+            while upstream.saturated():
+                await asyncio.sleep(JOB_BACKOFF_SECONDS)
+            try:
+                item = await job.run_item(ticker, market)
+            except Exception as e:
+                item = JobItem(ticker=ticker, market=market, status="error", error=str(e))
+            if item.status != "ok":
+                job.failed += 1
+            job.results.append(item)
+            await job._notify()
+
+    job.state = RUNNING
+    job.started_at = datetime.now()
+    await job._notify()
+    try:
+        with upstream.background():
+            await asyncio.gather(*[run_one(ticker, market) for ticker, market in job.items])
+        job.state = FINISHED
+    except asyncio.CancelledError:
+        job.state = CANCELLED
+    except Exception as e:
+        logger.error(f"Job {job.id} failed: {str(e)}")
+        job.state = FAILED
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.now()
+        await job._notify()
+    logger.info(f"Job {job.id} {job.state}: {len(job.results)}/{len(job.items)} tickers, {job.failed} failed")
+
+async def _worker() -> None:
+    while True:
+        job = await _queue.get()
+        try:
+            if job.done:
+                continue
+            job.task = asyncio.create_task(_run(job))
+            # 작업 취소(job.task.cancel)가 작업자까지 멈추지 않도록 wait로 기다림
+            await asyncio.wait([job.task])
+        finally:
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+            _queue.task_done()
+
+async def run_workers() -> None:
+    await asyncio.gather(*[_worker() for _ in range(JOB_CONCURRENCY)])
+
+def status(job: Job, offset: int = 0, results: bool = True) -> JobStatus:
+    return JobStatus(
+        id=job.id,
+        kind=job.kind,
+        timeframe=job.timeframe,
+        state=job.state,
+        created_at=job.created_at.isoformat(),
+        started_at=job.started_at.isoformat() if job.started_at else None,
+        finished_at=job.finished_at.isoformat() if job.finished_at else None,
+        total=len(job.items),
+        completed=len(job.results),
+        failed=job.failed,
+        error=job.error,
+        offset=offset,
+        results=job.results[offset:] if results else []
+    )
+
+async def events(job: Job, offset: int = 0) -> AsyncIterator[Tuple[str, str]]:
+    """(이벤트 종류, JSON) 순서열. offset번째 결과부터 끝난 순서대로 보내고 작업이 끝나면 상태로 마침"""
+    sent = offset
+    while True:
+        async with job.changed:
+            await job.changed.wait_for(lambda: len(job.results) > sent or job.done)
+        while sent < len(job.results):
+            yield "result", job.results[sent].model_dump_json()
+            sent += 1
+        if job.done:
+            yield "end", status(job, results=False).model_dump_json()
+            return
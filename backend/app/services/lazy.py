@@ -0,0 +1,57 @@
+import importlib
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 생성된 대리 객체 목록. 시작 후 백그라운드 선로딩과 준비 상태 조회에 사용
+_modules: List["LazyModule"] = []
+
+class LazyModule:
+    """첫 속성 접근 때 실제로 import하는 모듈 대리 객체
+
+    pykrx(matplotlib 포함), yfinance처럼 import가 무거운 제공자 라이브러리를 워커 부팅 경로에서 뺌
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+        _modules.append(self)
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            # 업스트림 스레드 여러 개가 동시에 처음 접근해도 한 번만 import
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    logger.info(f"Imported {self._name} in {time.perf_counter() - started:.2f}s")
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name} ({'loaded' if self.loaded else 'not loaded'})>"
+
+def preload() -> None:
+    """등록된 모듈을 모두 import (첫 요청이 import 비용을 내지 않도록 부팅 후 백그라운드에서 호출)"""
+    for module in list(_modules):
+        try:
+            module.load()
+        except Exception as e:
+            logger.error(f"Failed to import {module._name}: {str(e)}")
+
+def loaded() -> Dict[str, bool]:
+    status: Dict[str, bool] = {}
+    for module in _modules:
+        status[module._name] = status.get(module._name, True) and module.loaded
+    return status
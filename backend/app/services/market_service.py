@@ -1,12 +1,16 @@
-from pykrx import stock as kr_stock
-import yfinance as yf
+from datetime import datetime
 from typing import List, Dict
+from . import metrics, ticker_index, trading_calendar, upstream
+from .lazy import LazyModule
 
-async def search_stocks(query: str, market: str) -> List[Dict]:
-    if market.lower() == "kr":
-        return await _search_korean_stocks(query)
-    else:
-        return await _search_us_stocks(query)
+yf = LazyModule("yfinance")
+
+async def search_stocks(query: str, market: str, limit: int = 20) -> List[Dict]:
+    with metrics.stage("search"):
+        if market.lower() == "kr":
+            return await _search_korean_stocks(query, limit)
+        else:
+            return await _search_us_stocks(query)
 
 async def get_market_status(market: str) -> Dict:
     if market.lower() == "kr":
@@ -14,20 +18,10 @@ async def get_market_status(market: str) -> Dict:
     else:
         return await _get_us_market_status()
 
-async def _search_korean_stocks(query: str) -> List[Dict]:
+async def _search_korean_stocks(query: str, limit: int = 20) -> List[Dict]:
     try:
-        # pykrx를 사용하여 한국 주식 검색
-        market_list = kr_stock.get_market_ticker_list()
-        results = []
-        for ticker in market_list:
-            name = kr_stock.get_market_ticker_name(ticker)
-            if query.lower() in name.lower() or query in ticker:
-                results.append({
-                    "ticker": ticker,
-                    "name": name,
-                    "market": "KR"
-                })
-        return results
+        # 메모리에 올려둔 KOSPI/KOSDAQ 종목 인덱스에서 검색
+        return await ticker_index.search(query, limit)
     except Exception as e:
         return []
 
@@ -36,7 +30,7 @@ async def _search_us_stocks(query: str) -> List[Dict]:
         # yfinance를 사용하여 미국 주식 검색
         # 실제 구현에서는 더 나은 검색 API를 사용할 수 있습니다
         ticker = yf.Ticker(query)
-        info = ticker.info
+        info = await upstream.run("yfinance", lambda: ticker.info)
         return [{
             "ticker": info.get("symbol"),
             "name": info.get("longName"),
@@ -47,14 +41,14 @@ async def _search_us_stocks(query: str) -> List[Dict]:
 
 async def _get_korean_market_status() -> Dict:
     try:
-        # 한국 시장 상태 확인 로직 구현
-        return {"status": "open", "market": "KR"}
+        # KRX 휴장일/단축 운영일을 반영한 거래일 달력 기준
+        return trading_calendar.status("KR")
     except Exception as e:
-        return {"status": "unknown", "market": "KR"}
+        return {"status": "unknown", "market": "KR", "timestamp": datetime.now().isoformat()}
 
 async def _get_us_market_status() -> Dict:
     try:
-        # 미국 시장 상태 확인 로직 구현
-        return {"status": "open", "market": "US"}
+        # NYSE 휴장일/조기 폐장일을 반영한 거래일 달력 기준
+        return trading_calendar.status("US")
     except Exception as e:
-        return {"status": "unknown", "market": "US"}
\ No newline at end of file
+        return {"status": "unknown", "market": "US", "timestamp": datetime.now().isoformat()}
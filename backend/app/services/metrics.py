@@ -0,0 +1,194 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# METRICS_ENABLED=0이면 계측 호출이 아무 일도 하지 않음
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+# 단계별 소요 시간을 Server-Timing 응답 헤더로 노출할지 여부
+SERVER_TIMING_ENABLED = METRICS_ENABLED and os.getenv("SERVER_TIMING_ENABLED", "0").lower() in ("1", "true", "yes")
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 요청 단위 (단계 이름, 소요 시간(초)) 기록. Server-Timing이 켜진 요청에서만 설정됨
+_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "server_timings", default=None
+)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # 라벨별 [버킷별 개수..., 합계, 전체 개수]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+STAGE_SECONDS = Histogram(
+    "stock_stage_duration_seconds", "Time spent in each analysis stage", ("stage", "provider")
+)
+UPSTREAM_ERRORS = Counter("stock_upstream_errors_total", "Failed upstream calls", ("provider",))
+UPSTREAM_RETRIES = Counter(
+    "stock_upstream_retries_total", "Upstream calls retried on the next provider after a failure", ("provider",)
+)
+PROVIDER_REQUESTS = Counter(
+    "stock_provider_requests_total", "Data provider requests by outcome (ok, error, timeout, short_circuit, hedged)",
+    ("provider", "outcome")
+)
+HISTORY_STORE_REQUESTS = Counter(
+    "stock_history_store_requests_total", "History store lookups by outcome (hit, shared, partial, miss, stale)",
+    ("market", "outcome")
+)
+HTTP_SECONDS = Histogram(
+    "stock_http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+
+# 캐시 적중/미스 개수를 제공하는 콜백: 이름 -> () -> (hits, misses)
+_cache_sources: Dict[str, Callable[[], Tuple[int, int]]] = {}
+
+def register_cache(name: str, source: Callable[[], Tuple[int, int]]) -> None:
+    _cache_sources[name] = source
+
+# 값을 조회 시점에 읽는 게이지: 이름 -> (설명, 라벨 이름, () -> {라벨 값: 값})
+_gauge_sources: Dict[str, Tuple[str, str, Callable[[], Dict[str, float]]]] = {}
+
+def register_gauge(name: str, help: str, labelname: str, source: Callable[[], Dict[str, float]]) -> None:
+    _gauge_sources[name] = (help, labelname, source)
+
+class _Stage:
+    __slots__ = ("name", "provider", "started")
+
+    def __init__(self, name: str, provider: str):
+        self.name = name
+        self.provider = provider
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        STAGE_SECONDS.observe(elapsed, self.name, self.provider)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+        return False
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP_STAGE = _NoopStage()
+
+def stage(name: str, provider: str = ""):
+    """with metrics.stage("indicators"): ... 형태로 단계 소요 시간을 기록"""
+    if not METRICS_ENABLED:
+        return _NOOP_STAGE
+    return _Stage(name, provider)
+
+def start_request_timing() -> Optional[contextvars.Token]:
+    if not SERVER_TIMING_ENABLED:
+        return None
+    return _timings.set([])
+
+def server_timing_header(token: Optional[contextvars.Token], total: float) -> Optional[str]:
+    """같은 단계가 여러 번 실행되면 합산해서 Server-Timing 헤더 값으로 만듦"""
+    if token is None:
+        return None
+    timings = _timings.get() or []
+    _timings.reset(token)
+    totals: Dict[str, float] = {}
+    for name, elapsed in timings:
+        totals[name] = totals.get(name, 0.0) + elapsed
+    entries = [f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in totals.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+def render() -> str:
+    """Prometheus 텍스트 노출 형식"""
+    lines: List[str] = []
+    for metric in (STAGE_SECONDS, UPSTREAM_ERRORS, UPSTREAM_RETRIES, PROVIDER_REQUESTS,
+                   HISTORY_STORE_REQUESTS, HTTP_SECONDS):
+        lines.extend(metric.render())
+
+    for name, (help, labelname, source) in sorted(_gauge_sources.items()):
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} gauge")
+        for label, value in sorted(source().items()):
+            lines.append(f'{name}{{{labelname}="{label}"}} {value}')
+
+    lines.append("# HELP stock_cache_requests_total Cache lookups by result")
+    lines.append("# TYPE stock_cache_requests_total counter")
+    ratios = []
+    for name, source in sorted(_cache_sources.items()):
+        hits, misses = source()
+        lines.append(f'stock_cache_requests_total{{cache="{name}",result="hit"}} {hits}')
+        lines.append(f'stock_cache_requests_total{{cache="{name}",result="miss"}} {misses}')
+        if hits + misses:
+            ratios.append(f'stock_cache_hit_ratio{{cache="{name}"}} {hits / (hits + misses)}')
+    lines.append("# HELP stock_cache_hit_ratio Cache hit ratio since process start")
+    lines.append("# TYPE stock_cache_hit_ratio gauge")
+    lines.extend(ratios)
+    return "\n".join(lines) + "\n"
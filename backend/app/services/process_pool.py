@@ -0,0 +1,37 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# CPU 연산(백테스트 파라미터 탐색 등)을 실행하는 프로세스 풀 크기
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", str(os.cpu_count() or 2)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 업스트림 스레드 풀이 떠 있는 프로세스를 fork하지 않도록 spawn으로 생성
+        _executor = ProcessPoolExecutor(
+            max_workers=PROCESS_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started process pool with {PROCESS_POOL_WORKERS} workers")
+    return _executor
+
+async def run(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """모듈 최상위 함수를 프로세스 풀에서 실행 (인자와 결과는 pickle 가능해야 함)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,301 @@
+import asyncio
+import os
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from . import metrics, ticker_index, upstream
+from .lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# 제공자 라이브러리는 첫 호출 때 import (부팅 시간 단축)
+yf = LazyModule("yfinance")
+stock = LazyModule("pykrx.stock")
+
+# 시장별 데이터 제공자 우선순위 (앞이 기본, 뒤는 장애/지연 시 대체)
+PROVIDER_ORDER: Dict[str, List[str]] = {
+    "KR": os.getenv("KR_PROVIDERS", "pykrx,yfinance").split(","),
+    "US": os.getenv("US_PROVIDERS", "yfinance").split(","),
+}
+# 기본 제공자 응답이 이 시간(ms) 안에 오지 않으면 다음 제공자에도 같은 요청을 보냄 (0이면 사용 안 함)
+HEDGE_AFTER_SECONDS = float(os.getenv("PROVIDER_HEDGE_AFTER_MS", "0")) / 1000
+# 연속 실패가 이 횟수에 도달하면 일정 시간 동안 해당 제공자를 호출하지 않음
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("PROVIDER_RESET_SECONDS", "30"))
+# 로컬 파일 제공자 경로: {LOCAL_DATA_DIR}/{시장}/{종목}_{간격}.csv
+LOCAL_DATA_DIR = os.getenv(
+    "LOCAL_DATA_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "local")
+)
+
+# 시장별 컬럼 규칙 (pykrx: 한글 컬럼, 날짜 인덱스 / yfinance: 영문 컬럼, 거래소 시간대 인덱스)
+KR_COLUMNS = {"Open": "시가", "High": "고가", "Low": "저가", "Close": "종가", "Volume": "거래량"}
+
+class ProviderUnavailable(Exception):
+    pass
+
+class CircuitBreaker:
+    """연속 실패 시 열림(open) -> 대기 후 한 번만 시험 호출(half-open) -> 성공하면 닫힘"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def release_probe(self) -> None:
+        with self._lock:
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+class Provider:
+    """OHLCV 히스토리 제공자. fetch는 블로킹 호출이며 upstream 스레드 풀에서 실행됨
+
+    반환 형식은 시장 규칙을 따름: KR은 한글 컬럼과 날짜 인덱스, US는 영문 컬럼과 거래소 시간대 인덱스
+    """
+    name = ""
+    markets: Sequence[str] = ()
+    intervals: Sequence[str] = ()
+    timeout = 10.0
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+
+    def supports(self, market: str, interval: str) -> bool:
+        return market in self.markets and interval in self.intervals
+
+    def fetch(self, market: str, ticker: str, interval: str, start: datetime, end: date) -> pd.DataFrame:
+        raise NotImplementedError
+
+def _timeout(name: str, default: float) -> float:
+    return float(os.getenv(f"{name.upper()}_TIMEOUT_SECONDS", str(default)))
+
+class PykrxProvider(Provider):
+    name = "pykrx"
+    markets = ("KR",)
+    intervals = ("1d",)
+    timeout = _timeout("pykrx", 10)
+
+    def fetch(self, market, ticker, interval, start, end):
+        return stock.get_market_ohlcv_by_date(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), ticker)
+
+_yf_session = None
+_yf_session_lock = threading.Lock()
+
+def _shared_yf_session():
+    """모든 yfinance 호출이 재사용하는 연결 풀 세션"""
+    global _yf_session
+    with _yf_session_lock:
+        if _yf_session is None:
+            try:
+                from curl_cffi import requests as curl_requests
+                # 워커 스레드마다 curl 핸들을 만들어 재사용하므로 스레드별로 연결이 유지됨
+                _yf_session = curl_requests.Session(impersonate="chrome")
+            except ImportError:
+                import requests
+                _yf_session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=4, pool_maxsize=upstream.UPSTREAM_MAX_WORKERS
+                )
+                _yf_session.mount("https://", adapter)
+        return _yf_session
+
+class YfinanceProvider(Provider):
+    name = "yfinance"
+    markets = ("KR", "US")
+    intervals = ("1m", "5m", "15m", "30m", "60m", "1d")
+    timeout = _timeout("yfinance", 10)
+
+    def _symbol(self, market: str, ticker: str) -> str:
+        if market != "KR":
+            return ticker
+        # 야후 파이낸스 한국 종목 코드: KOSPI는 .KS, KOSDAQ은 .KQ
+        exchange = ticker_index.exchange_of(ticker)
+        return f"{ticker}.KQ" if exchange == "KOSDAQ" else f"{ticker}.KS"
+
+    def fetch(self, market, ticker, interval, start, end):
+        df = yf.Ticker(self._symbol(market, ticker), session=_shared_yf_session()).history(
+            start=start.strftime("%Y-%m-%d"),
+            end=(end + timedelta(days=1)).strftime("%Y-%m-%d"),
+            interval=interval,
+            # 한국 종목은 pykrx와 같은 수정 전 가격 사용
+            auto_adjust=market != "KR"
+        )
+        if market != "KR" or df.empty:
+            return df
+        # pykrx와 같은 형식(한글 컬럼, 날짜 인덱스)으로 맞춰 같은 저장소에 병합 가능하게 함
+        df = df[list(KR_COLUMNS)].rename(columns=KR_COLUMNS)
+        if interval == "1d":
+            df.index = df.index.tz_localize(None).normalize()
+            df.index.name = "날짜"
+        return df
+
+class LocalProvider(Provider):
+    """CSV 파일로 저장된 시세를 제공 (오프라인 개발, 재현 가능한 측정용)"""
+    name = "local"
+    markets = ("KR", "US")
+    intervals = ("1m", "5m", "15m", "30m", "60m", "1d")
+    timeout = _timeout("local", 5)
+
+    def __init__(self, data_dir: str = LOCAL_DATA_DIR):
+        super().__init__()
+        self.data_dir = data_dir
+
+    def fetch(self, market, ticker, interval, start, end):
+        path = os.path.join(self.data_dir, market, f"{ticker}_{interval}.csv")
+        if not os.path.exists(path):
+            raise ValueError(f"No local data for {market} {ticker} {interval}")
+        df = pd.read_csv(path, index_col=0)
+        index = pd.to_datetime(df.index, utc=market == "US")
+        if market == "US":
+            index = index.tz_convert("America/New_York")
+        df.index = index
+        start_at = pd.Timestamp(start)
+        end_at = pd.Timestamp(end) + pd.Timedelta(days=1)
+        if index.tz is not None:
+            start_at, end_at = start_at.tz_localize(index.tz), end_at.tz_localize(index.tz)
+        return df[(df.index >= start_at) & (df.index < end_at)]
+
+_registry: Dict[str, Provider] = {}
+
+def register(provider: Provider) -> None:
+    _registry[provider.name] = provider
+
+def get(name: str) -> Provider:
+    return _registry[name]
+
+def set_order(market: str, names: List[str]) -> None:
+    PROVIDER_ORDER[market.upper()] = list(names)
+
+def chain(market: str, interval: str) -> List[Provider]:
+    return [
+        _registry[name] for name in PROVIDER_ORDER.get(market, [])
+        if name in _registry and _registry[name].supports(market, interval)
+    ]
+
+for _provider in (PykrxProvider(), YfinanceProvider(), LocalProvider()):
+    register(_provider)
+
+def normalize_ticker(market: str, ticker: str) -> str:
+    return ticker.zfill(6) if market == "KR" else ticker.upper()
+
+def breaker_states() -> Dict[str, str]:
+    return {name: provider.breaker.state for name, provider in _registry.items()}
+
+metrics.register_gauge(
+    "stock_provider_circuit_open", "1 if the provider circuit breaker is open or half-open", "provider",
+    lambda: {name: float(state != "closed") for name, state in breaker_states().items()}
+)
+
+async def _call(provider: Provider, market: str, ticker: str, interval: str,
+                start: datetime, end: date) -> pd.DataFrame:
+    try:
+        # 제공자 슬롯을 기다린 시간은 제외하고 실제 호출에만 시간 제한을 둠 (대기열 적체를 제공자 장애로 보지 않음)
+        df = await upstream.run_with_timeout(
+            provider.name, provider.timeout, provider.fetch, market, ticker, interval, start, end
+        )
+    except asyncio.TimeoutError:
+        provider.breaker.record_failure()
+        metrics.PROVIDER_REQUESTS.inc(provider.name, "timeout")
+        raise TimeoutError(f"{provider.name} timed out after {provider.timeout}s")
+    except asyncio.CancelledError:
+        # 헤지 요청에서 진 쪽은 실패로 보지 않음
+        provider.breaker.release_probe()
+        raise
+    except Exception:
+        provider.breaker.record_failure()
+        metrics.PROVIDER_REQUESTS.inc(provider.name, "error")
+        raise
+    provider.breaker.record_success()
+    metrics.PROVIDER_REQUESTS.inc(provider.name, "ok")
+    return df
+
+async def fetch_history(market: str, ticker: str, interval: str, start: datetime, end: date) -> pd.DataFrame:
+    """우선순위대로 제공자를 시도. 회로가 열린 제공자는 건너뛰고, 실패하면 다음 제공자로 넘어감
+
+    HEDGE_AFTER_SECONDS가 설정되면 기본 제공자가 늦을 때 다음 제공자에도 요청해 먼저 온 결과를 사용
+    """
+    market = market.upper()
+    if start.date() > end:
+        return pd.DataFrame()
+
+    candidates = chain(market, interval)
+    if not candidates:
+        raise ProviderUnavailable(f"No data provider for {market} {interval}")
+
+    errors = []
+    pending: Dict[asyncio.Task, Provider] = {}
+    remaining = list(candidates)
+
+    def launch_next() -> Optional[Provider]:
+        while remaining:
+            provider = remaining.pop(0)
+            if provider.breaker.allow():
+                task = asyncio.ensure_future(_call(provider, market, ticker, interval, start, end))
+                pending[task] = provider
+                return provider
+            metrics.PROVIDER_REQUESTS.inc(provider.name, "short_circuit")
+            errors.append(f"{provider.name}: circuit open")
+        return None
+
+    try:
+        launch_next()
+        while pending:
+            hedge = HEDGE_AFTER_SECONDS > 0 and len(pending) == 1 and bool(remaining)
+            done, _ = await asyncio.wait(
+                pending, timeout=HEDGE_AFTER_SECONDS if hedge else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                # 지연: 기존 요청은 유지한 채 다음 제공자에 같은 요청을 보냄
+                hedged = launch_next()
+                if hedged is not None:
+                    metrics.PROVIDER_REQUESTS.inc(hedged.name, "hedged")
+                continue
+            for task in done:
+                provider = pending.pop(task)
+                if task.exception() is None:
+                    return task.result()
+                errors.append(f"{provider.name}: {task.exception()}")
+                logger.warning(f"{provider.name} failed for {market} {ticker} {interval}: {task.exception()}")
+                if not pending and remaining:
+                    metrics.UPSTREAM_RETRIES.inc(provider.name)
+                    launch_next()
+        raise ProviderUnavailable("; ".join(errors) or f"No data provider available for {market} {interval}")
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,91 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import trading_calendar
+
+# 시장별 컬럼명 (yfinance: 영문, pykrx: 한글)
+OHLCV_COLUMNS = {
+    "open": ("Open", "시가"),
+    "high": ("High", "고가"),
+    "low": ("Low", "저가"),
+    "close": ("Close", "종가"),
+    "volume": ("Volume", "거래량"),
+}
+
+# 기준 시계열에서 파생되는 시간대: 분 단위 묶음 또는 주/월 단위
+RESAMPLE_RULES = {
+    '3m': 3,
+    '10m': 10,
+    '120m': 120,
+    '240m': 240,
+    'weekly': 'week',
+    'monthly': 'month',
+}
+
+def ohlcv_columns(df: pd.DataFrame) -> Dict[str, str]:
+    columns = {}
+    for role, candidates in OHLCV_COLUMNS.items():
+        for name in candidates:
+            if name in df.columns:
+                columns[role] = name
+                break
+        else:
+            raise ValueError(f"Missing {role} column for resampling")
+    return columns
+
+def _local_index(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    # 시간대가 있으면 인덱스 자체의 시간대(거래소 현지 시각)로 묶음
+    # 다른 시장 경로로 받은 시계열(US 경로의 KOSPI 지수 등)도 자기 거래소의 주/월 경계를 따름
+    if index.tz is None:
+        return index
+    return index.tz_localize(None)
+
+def _bucket_keys(index: pd.DatetimeIndex, rule, market: str) -> np.ndarray:
+    local = _local_index(index)
+    days = local.normalize()
+    if rule == 'week':
+        # 월요일 시작 주 단위
+        return (days - pd.to_timedelta(days.weekday, unit="D")).asi8
+    if rule == 'month':
+        return (local.year * 12 + local.month).to_numpy(dtype=np.int64)
+
+    # 분 단위: 정규장 시작 시각 기준으로 N분씩 묶어 세션 경계를 넘지 않도록 함
+    session_open = trading_calendar.SESSIONS[market.upper()].open
+    open_offset = pd.Timedelta(hours=session_open.hour, minutes=session_open.minute)
+    minutes = ((local - days - open_offset).total_seconds() // 60).to_numpy(dtype=np.int64)
+    buckets = np.floor_divide(minutes, int(rule))
+    return days.asi8 + buckets * 60_000_000_000 * int(rule)
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str, market: str) -> pd.DataFrame:
+    """기준 봉을 상위 시간대 봉으로 집계 (시가: 첫 값, 고가: 최대, 저가: 최소, 종가: 마지막 값, 거래량: 합)
+
+    각 봉의 시각은 묶음에 속한 첫 기준 봉의 시각을 사용함
+    """
+    rule: Optional[object] = RESAMPLE_RULES.get(timeframe)
+    if rule is None:
+        raise ValueError(f"No resampling rule for timeframe {timeframe}")
+
+    columns = ohlcv_columns(df)
+    df = df[list(columns.values())].dropna()
+    if df.empty:
+        return df
+
+    keys = _bucket_keys(df.index, rule, market)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+
+    open_ = df[columns["open"]].to_numpy()
+    high = df[columns["high"]].to_numpy()
+    low = df[columns["low"]].to_numpy()
+    close = df[columns["close"]].to_numpy()
+    volume = df[columns["volume"]].to_numpy()
+
+    return pd.DataFrame({
+        columns["open"]: open_[starts],
+        columns["high"]: np.maximum.reduceat(high, starts),
+        columns["low"]: np.minimum.reduceat(low, starts),
+        columns["close"]: close[ends],
+        columns["volume"]: np.add.reduceat(volume, starts),
+    }, index=df.index[starts])
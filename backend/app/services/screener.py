@@ -0,0 +1,357 @@
+import asyncio
+import json
+import os
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import file_lock, ticker_index, trading_calendar, upstream
+from .indicators import compute_indicators
+from .lazy import LazyModule
+from .signals import LABEL_VALUES, RECOMMENDATION_LABELS, recommendation_votes
+
+logger = logging.getLogger(__name__)
+
+stock = LazyModule("pykrx.stock")
+
+# 전종목 일별 스냅샷 패널 저장 경로와 보관 거래일 수 (SMA200 계산에 필요한 구간 + 여유)
+PANEL_DIR = os.getenv(
+    "MARKET_PANEL_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "market_panel")
+)
+PANEL_DAYS = int(os.getenv("MARKET_PANEL_DAYS", "300"))
+PANEL_EXCHANGES = ("KOSPI", "KOSDAQ")
+# 다른 워커가 패널을 갱신하는 동안 기다리는 최대 시간(초)
+PANEL_LOCK_TIMEOUT = 300.0
+# 패널 구축/갱신 시 동시에 보내는 전종목 조회 수. 실시간 요청이 쓸 pykrx 한도를 남겨 두도록 작게 유지
+PANEL_FETCH_CONCURRENCY = int(os.getenv("MARKET_PANEL_FETCH_CONCURRENCY", "1"))
+# 패널 갱신 확인 주기(초), 패널이 아직 없을 때(최초 구축 실패) 재시도 간격(초)
+PANEL_REFRESH_SECONDS = 3600
+PANEL_RETRY_SECONDS = 300
+# 조회 결과가 비어 있던 날짜를 다시 조회하기까지의 간격(초). 휴장일이 아니라 업스트림 반영 지연일 수 있음
+EMPTY_DATE_RETRY_SECONDS = int(os.getenv("MARKET_PANEL_EMPTY_RETRY_SECONDS", "21600"))
+
+class PanelWarming(Exception):
+    """패널을 아직 구축 중 (요청 경로에서는 구축하지 않음)"""
+
+class MarketPanel(NamedTuple):
+    dates: pd.DatetimeIndex
+    tickers: np.ndarray
+    exchanges: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+class PanelSnapshot(NamedTuple):
+    """패널 마지막 거래일 기준 종목별 지표 (패널이 바뀔 때만 다시 계산)"""
+    as_of: date
+    close: np.ndarray
+    change_percent: np.ndarray
+    volume: np.ndarray
+    rsi: np.ndarray
+    macd: np.ndarray
+    signal: np.ndarray
+    histogram: np.ndarray
+    sma_50: np.ndarray
+    sma_200: np.ndarray
+    macd_crossed_up: np.ndarray
+    golden_cross: np.ndarray
+    recommendation: np.ndarray
+    listed: np.ndarray
+
+_panel: Optional[MarketPanel] = None
+_snapshot: Optional[PanelSnapshot] = None
+# 조회 결과가 비어 있던 날짜 -> 기록 시각(monotonic). EMPTY_DATE_RETRY_SECONDS 동안만 다시 조회하지 않음
+_empty_dates: Dict[date, float] = {}
+# 마지막으로 읽거나 쓴 meta.json의 (inode, mtime). 다른 워커가 저장하면 달라짐
+_panel_version: Optional[Tuple[int, int]] = None
+
+def _meta_version() -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(os.path.join(PANEL_DIR, "meta.json"))
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns)
+
+def _save_panel(panel: MarketPanel) -> None:
+    global _panel_version
+    os.makedirs(PANEL_DIR, exist_ok=True)
+    for name in ("close", "volume"):
+        path = os.path.join(PANEL_DIR, f"{name}.npy")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, getattr(panel, name))
+        os.replace(tmp_path, path)
+    meta = {
+        "dates": [d.strftime("%Y%m%d") for d in panel.dates],
+        "tickers": panel.tickers.tolist(),
+        "exchanges": panel.exchanges.tolist(),
+    }
+    path = os.path.join(PANEL_DIR, "meta.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path)
+    _panel_version = _meta_version()
+
+def ready() -> bool:
+    """스크리너가 바로 응답할 수 있는 패널이 있으면 True (스냅샷을 읽었거나 백그라운드 구축이 끝난 뒤)"""
+    return _panel is not None and len(_panel.dates) >= 2
+
+def load_snapshot() -> bool:
+    """디스크에 저장된 패널을 memory-map으로 읽음 (워커들이 같은 페이지를 공유)"""
+    global _panel, _snapshot, _panel_version
+    try:
+        version = _meta_version()
+        with open(os.path.join(PANEL_DIR, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        close = np.load(os.path.join(PANEL_DIR, "close.npy"), mmap_mode="r")
+        volume = np.load(os.path.join(PANEL_DIR, "volume.npy"), mmap_mode="r")
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable market panel: {str(e)}")
+        return False
+    if close.shape != (len(meta["dates"]), len(meta["tickers"])) or volume.shape != close.shape:
+        logger.warning("Market panel shape mismatch, ignoring")
+        return False
+    _panel = MarketPanel(
+        dates=pd.to_datetime(meta["dates"], format="%Y%m%d"),
+        tickers=np.array(meta["tickers"], dtype=object),
+        exchanges=np.array(meta["exchanges"], dtype=object),
+        close=close,
+        volume=volume,
+    )
+    _snapshot = None
+    _panel_version = version
+    logger.info(f"Loaded market panel: {len(_panel.dates)} days x {len(_panel.tickers)} tickers")
+    return True
+
+def _fetch_day(day: date) -> pd.DataFrame:
+    frames = []
+    for exchange in PANEL_EXCHANGES:
+        df = stock.get_market_ohlcv_by_ticker(day.strftime("%Y%m%d"), market=exchange)
+        if not df.empty:
+            frames.append(df[['종가', '거래량']].assign(exchange=exchange))
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+def _latest_complete_day() -> date:
+    # 장중 스냅샷은 확정값이 아니므로 마지막으로 마감된 거래일까지만 패널에 반영
+    return trading_calendar.last_close("KR").date()
+
+def _missing_days(panel: Optional[MarketPanel], until: date) -> List[date]:
+    # 기록한 지 오래된 빈 날짜는 잊고 다시 조회
+    now = time.monotonic()
+    for day in [d for d, recorded in _empty_dates.items() if now - recorded >= EMPTY_DATE_RETRY_SECONDS]:
+        del _empty_dates[day]
+    if panel is not None and len(panel.dates):
+        start = panel.dates[-1].date() + timedelta(days=1)
+    else:
+        # 휴장일을 감안해 영업일 기준으로 넉넉하게 거슬러 올라감
+        start = (pd.Timestamp(until) - pd.offsets.BDay(int(PANEL_DAYS * 1.1))).date()
+    return [
+        d.date() for d in pd.bdate_range(start, until)
+        if trading_calendar.is_trading_day("KR", d.date()) and d.date() not in _empty_dates
+    ]
+
+def _append_days(panel: Optional[MarketPanel], snapshots: Dict[date, pd.DataFrame]) -> Optional[MarketPanel]:
+    if not snapshots:
+        return panel
+    days = sorted(snapshots)
+    index = pd.to_datetime(days)
+    close = pd.DataFrame([snapshots[d]['종가'] for d in days], index=index)
+    volume = pd.DataFrame([snapshots[d]['거래량'] for d in days], index=index)
+    exchanges = {}
+    for d in days:
+        exchanges.update(snapshots[d]['exchange'].to_dict())
+
+    # 기존 패널에 날짜 행을 덧붙이고, 새로 상장된 종목은 열로 추가
+    if panel is not None:
+        close = pd.concat([pd.DataFrame(panel.close, index=panel.dates, columns=panel.tickers), close])
+        volume = pd.concat([pd.DataFrame(panel.volume, index=panel.dates, columns=panel.tickers), volume])
+        exchanges = {**dict(zip(panel.tickers, panel.exchanges)), **exchanges}
+
+    close = close.iloc[-PANEL_DAYS:].astype(np.float64)
+    volume = volume.iloc[-PANEL_DAYS:].astype(np.float64)
+    # 보관 구간에서 한 번도 거래되지 않은 종목(상장폐지 등)은 제외
+    keep = close.notna().any(axis=0).to_numpy()
+    tickers = close.columns.to_numpy(dtype=object)[keep]
+    return MarketPanel(
+        dates=pd.DatetimeIndex(close.index),
+        tickers=tickers,
+        exchanges=np.array([exchanges.get(t, "") for t in tickers], dtype=object),
+        close=close.to_numpy()[:, keep],
+        volume=volume.to_numpy()[:, keep],
+    )
+
+async def _refresh() -> None:
+    global _panel, _snapshot
+    # 여러 워커 중 하나만 업스트림에서 받음. 기다린 사이 다른 워커가 저장했으면 그 패널부터 이어서 갱신
+    async with file_lock.locked(os.path.join(PANEL_DIR, ".lock"), PANEL_LOCK_TIMEOUT):
+        if _meta_version() not in (None, _panel_version):
+            load_snapshot()
+        days = _missing_days(_panel, _latest_complete_day())
+        if not days:
+            return
+        logger.info(f"Fetching {len(days)} market-wide daily snapshots for the screener panel")
+        slots = asyncio.Semaphore(PANEL_FETCH_CONCURRENCY)
+
+        async def fetch(day: date) -> pd.DataFrame:
+            async with slots:
+                return await upstream.run("pykrx", _fetch_day, day)
+
+        results = await asyncio.gather(*[fetch(d) for d in days], return_exceptions=True)
+        snapshots = {}
+        for day, result in zip(days, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to fetch market snapshot for {day}: {str(result)}")
+            elif result.empty:
+                _empty_dates[day] = time.monotonic()
+            else:
+                snapshots[day] = result
+        panel = _append_days(_panel, snapshots)
+        if panel is not _panel:
+            _panel = panel
+            _snapshot = None
+            _save_panel(panel)
+
+async def refresh() -> None:
+    await upstream.coalesce(("market_panel",), _refresh)
+
+async def refresh_periodically() -> None:
+    # 스냅샷이 없으면 바로 최초 구축, 이후 마감된 거래일이 패널에 없으면 갱신 (시간마다 확인)
+    while True:
+        try:
+            # 전종목 조회는 실시간 요청보다 낮은 우선순위로 실행
+            with upstream.background():
+                await refresh()
+        except Exception as e:
+            logger.error(f"Failed to refresh market panel: {str(e)}")
+        await asyncio.sleep(PANEL_REFRESH_SECONDS if _panel is not None else PANEL_RETRY_SECONDS)
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    rows = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = values[rows, np.arange(values.shape[1])]
+    # 첫 거래 이전 구간은 NaN 유지
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+def _compute_snapshot(panel: MarketPanel) -> PanelSnapshot:
+    # 종가가 없는(0) 날은 결측으로 보고 직전 종가로 채움
+    raw = np.where(panel.close > 0, panel.close, np.nan)
+    close = _forward_fill(raw)
+    series = compute_indicators(close)
+
+    last = close[-1]
+    previous = close[-2] if len(close) > 1 else np.full_like(last, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_percent = (last - previous) / previous * 100
+        macd_crossed_up = (series.macd[-1] > series.signal[-1]) & (series.macd[-2] <= series.signal[-2])
+        golden_cross = (series.sma_50[-1] > series.sma_200[-1]) & (series.sma_50[-2] <= series.sma_200[-2])
+
+    return PanelSnapshot(
+        as_of=panel.dates[-1].date(),
+        close=last,
+        change_percent=change_percent,
+        volume=panel.volume[-1],
+        rsi=series.rsi[-1],
+        macd=series.macd[-1],
+        signal=series.signal[-1],
+        histogram=series.histogram[-1],
+        sma_50=series.sma_50[-1],
+        sma_200=series.sma_200[-1],
+        macd_crossed_up=macd_crossed_up,
+        golden_cross=golden_cross,
+        recommendation=recommendation_votes(
+            series.rsi[-1], series.macd[-1], series.histogram[-1], series.sma_50[-1], series.sma_200[-1]
+        ),
+        # 마지막 거래일에 시세가 있는 종목만 대상
+        listed=~np.isnan(raw[-1]),
+    )
+
+def _optional(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+SORT_FIELDS = ("rsi", "change_percent", "volume", "close")
+
+async def screen(exchange: Optional[str] = None, rsi_below: Optional[float] = None,
+                 rsi_above: Optional[float] = None, macd_above_signal: Optional[bool] = None,
+                 macd_cross: bool = False, above_sma_50: Optional[bool] = None,
+                 above_sma_200: Optional[bool] = None, sma_trend: Optional[str] = None,
+                 golden_cross: bool = False, recommendation: Optional[str] = None,
+                 min_volume: Optional[float] = None, sort_by: str = "rsi",
+                 descending: bool = False, limit: int = 50) -> Dict:
+    """전종목 패널에서 조건에 맞는 종목을 벡터 연산으로 선별"""
+    global _snapshot
+    # 최초 구축은 수백 번의 전종목 조회라 백그라운드 작업(refresh_periodically)에 맡김
+    if _panel is None or len(_panel.dates) < 2:
+        raise PanelWarming("Market panel is still being built. Retry later")
+    if _snapshot is None:
+        # 전종목 지표 계산은 수백 ms가 걸리므로 이벤트 루프 밖에서 수행
+        _snapshot = await asyncio.to_thread(_compute_snapshot, _panel)
+    snap = _snapshot
+
+    with np.errstate(invalid="ignore"):
+        mask = snap.listed.copy()
+        if exchange:
+            mask &= _panel.exchanges == exchange.upper()
+        if rsi_below is not None:
+            mask &= snap.rsi < rsi_below
+        if rsi_above is not None:
+            mask &= snap.rsi > rsi_above
+        if macd_above_signal is not None:
+            mask &= (snap.macd > snap.signal) == macd_above_signal
+        if macd_cross:
+            mask &= snap.macd_crossed_up
+        if above_sma_50 is not None:
+            mask &= ~np.isnan(snap.sma_50) & ((snap.close > snap.sma_50) == above_sma_50)
+        if above_sma_200 is not None:
+            mask &= ~np.isnan(snap.sma_200) & ((snap.close > snap.sma_200) == above_sma_200)
+        if sma_trend is not None:
+            if sma_trend not in ("up", "down"):
+                raise ValueError("Invalid sma_trend. Must be one of: up, down")
+            trend_up = snap.sma_50 > snap.sma_200
+            mask &= ~np.isnan(snap.sma_50) & ~np.isnan(snap.sma_200) & (trend_up == (sma_trend == "up"))
+        if golden_cross:
+            mask &= snap.golden_cross
+        if recommendation is not None:
+            if recommendation not in LABEL_VALUES:
+                raise ValueError(f"Invalid recommendation. Must be one of: {', '.join(LABEL_VALUES)}")
+            mask &= snap.recommendation == LABEL_VALUES[recommendation]
+        if min_volume is not None:
+            mask &= snap.volume >= min_volume
+
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f"Invalid sort_by. Must be one of: {', '.join(SORT_FIELDS)}")
+    matched = np.flatnonzero(mask)
+    keys = getattr(snap, sort_by)[matched]
+    # NaN은 정렬 방향과 관계없이 뒤로 보냄
+    keys = np.where(np.isnan(keys), np.inf, -keys if descending else keys)
+    matched = matched[np.argsort(keys, kind="stable")][:limit]
+
+    return {
+        "as_of": snap.as_of.isoformat(),
+        "count": int(mask.sum()),
+        "results": [
+            {
+                "ticker": _panel.tickers[i],
+                "name": ticker_index.name_of(_panel.tickers[i]),
+                "exchange": _panel.exchanges[i],
+                "close": float(snap.close[i]),
+                "change_percent": _optional(snap.change_percent[i]),
+                "volume": int(snap.volume[i]) if np.isfinite(snap.volume[i]) else 0,
+                "rsi": _optional(snap.rsi[i]),
+                "macd": _optional(snap.macd[i]),
+                "signal": _optional(snap.signal[i]),
+                "sma_50": _optional(snap.sma_50[i]),
+                "sma_200": _optional(snap.sma_200[i]),
+                "recommendation": RECOMMENDATION_LABELS[int(snap.recommendation[i])],
+            }
+            for i in matched
+        ],
+    }
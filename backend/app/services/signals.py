@@ -0,0 +1,27 @@
+import numpy as np
+
+# stock_service._get_recommendation 과 같은 RSI/MACD/SMA 투표 규칙을 배열 전체에 적용
+BUY = 1
+HOLD = 0
+SELL = -1
+
+RECOMMENDATION_LABELS = {BUY: "매수", SELL: "매도", HOLD: "관망"}
+LABEL_VALUES = {label: value for value, label in RECOMMENDATION_LABELS.items()}
+
+def recommendation_votes(rsi: np.ndarray, macd: np.ndarray, histogram: np.ndarray,
+                         sma_fast: np.ndarray, sma_slow: np.ndarray,
+                         rsi_low: float = 30, rsi_high: float = 70) -> np.ndarray:
+    """매수(1) / 매도(-1) / 관망(0) 판정. NaN인 지표는 해당 신호에서 제외"""
+    with np.errstate(invalid="ignore"):
+        buy = (rsi < rsi_low).astype(np.int8)
+        sell = (rsi > rsi_high).astype(np.int8)
+
+        buy += (macd > 0) & (histogram > 0)
+        sell += (macd < 0) & (histogram < 0)
+
+        sma_available = ~np.isnan(sma_fast) & ~np.isnan(sma_slow)
+        fast_above = sma_fast > sma_slow
+        buy += sma_available & fast_above
+        sell += sma_available & ~fast_above
+
+    return np.sign(buy - sell).astype(np.int8)
@@ -1,200 +1,565 @@
-import yfinance as yf
-from pykrx import stock
 import pandas as pd
 import numpy as np
-from typing import List
-from ..models import StockAnalysis, TechnicalIndicators, ChartData
-from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from ..models import (
+    StockAnalysis, TechnicalIndicators, ChartData, BatchAnalysisItem, CorrelationResponse, RelativeStrengthItem
+)
+from . import backtest, correlation, history_store, metrics, process_pool, providers, trading_calendar, upstream
+from .indicators import IndicatorSeries, compute_indicators
+from .resample import RESAMPLE_RULES, resample_ohlcv
+from datetime import date, datetime, timedelta
+import asyncio
+import itertools
 import logging
+import math
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
-async def analyze_stock(ticker: str, market: str, timeframe: str = 'daily') -> StockAnalysis:
+# 로컬 히스토리가 이 시간(초) 안에 갱신되었으면 업스트림을 다시 호출하지 않음
+HISTORY_REFRESH_SECONDS = float(os.getenv("STOCK_HISTORY_REFRESH_SECONDS", "60"))
+# 구간 조회 시 지표 계산에 포함하는 앞쪽 준비 봉 수 (가장 긴 창인 SMA200 기준)
+INDICATOR_WARMUP_BARS = 200
+# 구간 조회 한 번에 반환하는 최대 봉 수
+RANGE_MAX_BARS = int(os.getenv("RANGE_MAX_BARS", "5000"))
+# 봉 하나가 차지하는 달력 일수 (휴장일 여유 포함). 구간 조회 시 받아 둘 기간 추정에 사용
+CALENDAR_DAYS_PER_BAR = {'daily': 1.5, 'weekly': 7.5, 'monthly': 31.0}
+# 폐장 후 종가가 확정될 때까지 기다리는 시간(초). 이후 저장된 히스토리는 다음 개장 전까지 그대로 사용
+HISTORY_SETTLE_SECONDS = float(os.getenv("STOCK_HISTORY_SETTLE_SECONDS", "1800"))
+# offload=True여도 이 봉 수 미만이면 바로 계산 (일봉 수천 개는 1~3ms라 프로세스 간 전달 비용이 더 큼)
+INDICATOR_OFFLOAD_MIN_BARS = int(os.getenv("INDICATOR_OFFLOAD_MIN_BARS", "5000"))
+
+def _close_prices(data: pd.DataFrame) -> np.ndarray:
+    return data['Close'].values if 'Close' in data.columns else data['종가'].values
+
+def _build_analysis(ticker: str, market: str, timeframe: str, data: pd.DataFrame,
+                    series: IndicatorSeries) -> StockAnalysis:
+    close_prices = _close_prices(data)
+    volume = data['Volume'].values if 'Volume' in data.columns else data['거래량'].values
+    
+    current_price = close_prices[-1]
+    prev_price = close_prices[-2]
+    change_percent = ((current_price - prev_price) / prev_price) * 100
+
+    indicators = _to_technical_indicators(series)
+    rsi_values = _rsi_chart_values(series.rsi)
+    
+    # 차트 데이터 준비
+    dates = data.index.strftime('%Y-%m-%d').tolist()
+    prices = close_prices.astype(float).tolist()
+    volumes = volume.astype(np.int64).tolist()
+    
+    chart_data = ChartData(
+        dates=dates,
+        prices=prices,
+        volumes=volumes,
+        rsi=rsi_values,
+        timeframe=timeframe
+    )
+    # 압축 응답용 epoch 초 단위 시각 (JSON 응답에는 포함되지 않음)
+    chart_data._timestamps = history_store.epoch_seconds(data.index).astype(np.int64)
+    
+    return StockAnalysis(
+        ticker=ticker,
+        market=market,
+        current_price=float(current_price),
+        change_percent=float(change_percent),
+        volume=int(volume[-1]),
+        indicators=indicators,
+        recommendation=_get_recommendation(indicators),
+        analysis_summary=_generate_analysis_summary(indicators, change_percent),
+        timestamp=datetime.now().isoformat(),
+        chart_data=chart_data
+    )
+
+async def analyze_stock(ticker: str, market: str, timeframe: str = 'daily', start: Optional[date] = None,
+                        end: Optional[date] = None, limit: Optional[int] = None,
+                        offload: bool = False) -> StockAnalysis:
+    """start/end/limit 중 하나라도 주면 해당 구간만 반환 (차트 페이지 조회)
+
+    offload=True면 INDICATOR_OFFLOAD_MIN_BARS 이상일 때 지표 계산을 프로세스 풀에서 실행
+    (백그라운드 작업이 요청 처리 루프를 오래 점유하지 않도록)
+    """
     try:
-        # 시장에 따라 적절한 데이터 소스 선택
-        if market.lower() == "kr":
-            data = await _get_korean_stock_data(ticker, timeframe)
-        else:
-            data = await _get_us_stock_data(ticker, timeframe)
+        ranged = start is not None or end is not None or limit is not None
+        if ranged and start is None and limit is None:
+            # end만 주면 timeframe 기본 조회 기간만큼 end 이전 구간
+            start = (end or date.today()) - timedelta(days=_default_days(market, timeframe))
+        lookback_days = _range_lookback_days(market, timeframe, start, end, limit) if ranged else None
+        data = await _get_stock_data(ticker, market, timeframe, lookback_days)
         
         if data.empty:
             raise ValueError(f"No data found for ticker {ticker}")
 
-        # 기술적 분석 수행
-        close_prices = data['Close'].values if 'Close' in data.columns else data['종가'].values
-        volume = data['Volume'].values if 'Volume' in data.columns else data['거래량'].values
-        
-        current_price = close_prices[-1]
-        prev_price = close_prices[-2]
-        change_percent = ((current_price - prev_price) / prev_price) * 100
+        if ranged:
+            return _analyze_range(ticker, market, timeframe, data, start, end, limit)
 
-        indicators = await _calculate_technical_indicators(data)
-        rsi_values = await _calculate_rsi_series(data)
-        
-        # 차트 데이터 준비
-        dates = data.index.strftime('%Y-%m-%d').tolist()
-        prices = [float(x) for x in close_prices]
-        volumes = [int(x) for x in volume]
-        
-        chart_data = ChartData(
-            dates=dates,
-            prices=prices,
-            volumes=volumes,
-            rsi=rsi_values,
-            timeframe=timeframe
-        )
-        
-        analysis = StockAnalysis(
-            ticker=ticker,
-            market=market,
-            current_price=float(current_price),
-            change_percent=float(change_percent),
-            volume=int(volume[-1]),
-            indicators=indicators,
-            recommendation=_get_recommendation(indicators),
-            analysis_summary=_generate_analysis_summary(indicators, change_percent),
-            timestamp=datetime.now().isoformat(),
-            chart_data=chart_data
-        )
-        return analysis
+        # 기술적 분석 수행 - 모든 지표를 종가 배열 한 번으로 계산
+        with metrics.stage("indicators"):
+            if offload and len(data) >= INDICATOR_OFFLOAD_MIN_BARS:
+                series = await process_pool.run(compute_indicators, np.asarray(_close_prices(data), dtype=np.float64))
+            else:
+                series = compute_indicators(_close_prices(data))
+        with metrics.stage("summary"):
+            return _build_analysis(ticker, market, timeframe, data, series)
     except Exception as e:
         logger.error(f"Error analyzing stock {ticker}: {str(e)}")
         raise
 
-async def _get_korean_stock_data(ticker: str, timeframe: str = 'daily') -> pd.DataFrame:
-    try:
-        end_date = datetime.now()
-        ticker = ticker.zfill(6)
-        
-        # timeframe에 따라 시작 날짜와 간격 조정
-        timeframe_settings = {
-            '1m': (1, 'min'),
-            '3m': (1, 'min'), 
-            '5m': (1, 'min'),
-            '10m': (1, 'min'),
-            '15m': (1, 'min'),
-            '30m': (1, 'min'),
-            '60m': (1, 'min'),
-            '120m': (1, 'min'),
-            '240m': (1, 'min'),
-            'daily': (365, 'day'),
-            'weekly': (365 * 3, 'week'),  # 더 많은 데이터를 가져와서 주봉 생성
-            'monthly': (365 * 5, 'month')  # 더 많은 데이터를 가져와서 월봉 생성
-        }
-        
-        days, interval = timeframe_settings.get(timeframe, (365, 'day'))
-        start_date = end_date - timedelta(days=days)
-        
-        # 분 단위 데이터 요청인 경우
-        if interval == 'min':
-            # Note: pykrx는 분 단위 데이터를 제공하지 않으므로 다른 데이터 소스 사용 필요
-            raise NotImplementedError("Korean stock minute data not yet implemented")
-
-        # 주간/월간 데이터 처리 - pykrx는 간격 파라미터를 지원하지 않으므로 일간 데이터를 가져와서 리샘플링
-        if interval in ['week', 'month']:
-            # 일간 데이터를 먼저 가져옴
+def _range_lookback_days(market: str, timeframe: str, start: Optional[date], end: Optional[date],
+                         limit: Optional[int]) -> Optional[int]:
+    """구간과 지표 준비 봉까지 덮도록 조회할 기간(일). 분봉은 보관 기간 전체를 사용"""
+    per_bar = CALENDAR_DAYS_PER_BAR.get(timeframe)
+    if per_bar is None:
+        return None
+    if start is not None:
+        first = start
+    else:
+        first = (end or date.today()) - timedelta(days=math.ceil(limit * per_bar))
+    first -= timedelta(days=math.ceil(INDICATOR_WARMUP_BARS * per_bar))
+    return max((date.today() - first).days + 1, _default_days(market, timeframe))
+
+def _default_days(market: str, timeframe: str) -> int:
+    return TIMEFRAMES.get(market.upper(), {}).get(timeframe, (None, 0))[1]
+
+def _analyze_range(ticker: str, market: str, timeframe: str, data: pd.DataFrame, start: Optional[date],
+                   end: Optional[date], limit: Optional[int]) -> StockAnalysis:
+    # start가 있으면 start부터 limit개, 없으면 end(기본: 마지막 봉)까지 limit개
+    first, last = history_store.range_positions(data.index, start, end)
+    limit = min(limit or RANGE_MAX_BARS, RANGE_MAX_BARS)
+    if start is not None:
+        last = min(last, first + limit)
+    else:
+        first = max(first, last - limit)
+    if last - first < 2:
+        raise ValueError(f"Not enough data for {ticker} in the requested range (need at least 2 bars)")
+
+    # 지표는 구간 앞쪽 준비 봉까지만 포함해 계산하고 구간 부분만 사용
+    warm = max(first - INDICATOR_WARMUP_BARS, 0)
+    with metrics.stage("indicators"):
+        series = compute_indicators(_close_prices(data)[warm:last])
+        series = IndicatorSeries(*(values[first - warm:] for values in series))
+    with metrics.stage("summary"):
+        analysis = _build_analysis(ticker, market, timeframe, data.iloc[first:last], series)
+    analysis.chart_data.has_more_before = first > 0
+    analysis.chart_data.has_more_after = last < len(data)
+    return analysis
+
+async def analyze_batch(tickers: List[Tuple[str, str]], timeframe: str = 'daily') -> List[BatchAnalysisItem]:
+    """여러 종목을 동시에 조회하고, 시장별 날짜 x 종목 종가 행렬로 지표를 한 번에 계산"""
+    fetched = await asyncio.gather(
+        *[_get_stock_data(ticker, market, timeframe) for ticker, market in tickers],
+        return_exceptions=True
+    )
+
+    items: List[Optional[BatchAnalysisItem]] = [None] * len(tickers)
+    groups: Dict[str, List[int]] = {}
+    for i, ((ticker, market), data) in enumerate(zip(tickers, fetched)):
+        if isinstance(data, Exception):
+            items[i] = BatchAnalysisItem(ticker=ticker, market=market, status="error", error=str(data))
+        elif data.empty or len(data) < 2:
+            items[i] = BatchAnalysisItem(
+                ticker=ticker, market=market, status="error", error=f"No data found for ticker {ticker}"
+            )
+        else:
+            groups.setdefault(market.upper(), []).append(i)
+
+    # 같은 시장의 종목은 거래일이 같으므로 날짜 합집합으로 정렬
+    # 중간 결측(거래정지 등)은 직전 종가로 채우고, 상장 전 구간은 NaN으로 둠
+    for members in groups.values():
+        closes = pd.concat(
+            [pd.Series(_close_prices(fetched[i]), index=fetched[i].index) for i in members],
+            axis=1, keys=range(len(members))
+        ).sort_index()
+        panel = closes.ffill().to_numpy(dtype=np.float64)
+        with metrics.stage("indicators"):
+            series = compute_indicators(panel)
+
+        for column, i in enumerate(members):
+            ticker, market = tickers[i]
+            data = fetched[i]
             try:
-                logger.info(f"Fetching daily data for resampling to {interval} for ticker {ticker}")
-                df = stock.get_market_ohlcv_by_date(
-                    start_date.strftime("%Y%m%d"),
-                    end_date.strftime("%Y%m%d"),
-                    ticker
+                rows = closes.index.get_indexer(data.index)
+                ticker_series = IndicatorSeries(*(values[rows, column] for values in series))
+                items[i] = BatchAnalysisItem(
+                    ticker=ticker, market=market, status="ok",
+                    analysis=_build_analysis(ticker, market, timeframe, data, ticker_series)
                 )
-                
-                if df.empty:
-                    logger.warning(f"No daily data available for ticker {ticker}")
-                    raise ValueError("No daily data available for resampling")
-                
-                logger.info(f"Successfully fetched {len(df)} daily records, resampling to {interval}")
-                
-                # 주간/월간으로 리샘플링
-                if interval == 'week':
-                    df = df.resample('W').agg({
-                        '시가': 'first',
-                        '고가': 'max', 
-                        '저가': 'min',
-                        '종가': 'last',
-                        '거래량': 'sum'
-                    }).dropna()
-                elif interval == 'month':
-                    df = df.resample('M').agg({
-                        '시가': 'first',
-                        '고가': 'max',
-                        '저가': 'min', 
-                        '종가': 'last',
-                        '거래량': 'sum'
-                    }).dropna()
-                
-                logger.info(f"Resampled to {len(df)} {interval} records")
-                
-                if not df.empty:
-                    return df
-                else:
-                    logger.warning(f"Resampled data is empty for {interval}")
-                    
             except Exception as e:
-                logger.error(f"Failed to fetch and resample {interval} data: {str(e)}", exc_info=True)
-        else:  # 일간 데이터 처리
-            for i in range(5):
-                try_date = end_date - timedelta(days=i)
-                try:
-                    df = stock.get_market_ohlcv_by_date(
-                        start_date.strftime("%Y%m%d"),
-                        try_date.strftime("%Y%m%d"),
-                        ticker
-                    )
-                    if not df.empty:
-                        return df
-                except Exception as e:
-                    logger.warning(f"Failed to fetch data for date {try_date.strftime('%Y%m%d')}: {str(e)}")
-        
-        raise ValueError(f"No data found for Korean stock {ticker}")
-    except Exception as e:
-        logger.error(f"Error fetching Korean stock data: {str(e)}")
-        raise ValueError(f"Failed to fetch data for Korean stock {ticker}")
+                logger.error(f"Error building batch analysis for {ticker}: {str(e)}")
+                items[i] = BatchAnalysisItem(ticker=ticker, market=market, status="error", error=str(e))
+    return items
+
+# 프로세스 하나에 넘기는 파라미터 조합 수와, 프로세스 풀 없이 바로 계산할 작업량(조합 수 x 종목 수) 기준
+BACKTEST_CHUNK_SIZE = int(os.getenv("BACKTEST_CHUNK_SIZE", "128"))
+BACKTEST_INLINE_WORK = int(os.getenv("BACKTEST_INLINE_WORK", "64"))
+
+async def backtest_stocks(tickers: List[Tuple[str, str]], timeframe: str, years: int,
+                          grid: List[backtest.BacktestParams], cost_bps: float = 0.0,
+                          allow_short: bool = False
+                          ) -> Dict[Tuple[str, str], Union[List[Tuple[backtest.BacktestParams, backtest.BacktestMetrics]], Exception]]:
+    """종목별로 (파라미터, 성과) 목록 또는 실패 사유(Exception)를 반환
+
+    조합 격자를 청크로 나눠 종목 x 청크 단위로 프로세스 풀에 분배
+    """
+    fetched = await asyncio.gather(
+        *[_get_stock_data(ticker, market, timeframe, lookback_days=365 * years) for ticker, market in tickers],
+        return_exceptions=True
+    )
+    periods = backtest.PERIODS_PER_YEAR[timeframe]
+    chunks = [grid[i:i + BACKTEST_CHUNK_SIZE] for i in range(0, len(grid), BACKTEST_CHUNK_SIZE)]
+    inline = len(grid) * len(tickers) <= BACKTEST_INLINE_WORK
+
+    async def run_chunk(close: np.ndarray, chunk: List[backtest.BacktestParams]):
+        if inline:
+            return await asyncio.to_thread(backtest.backtest_grid, close, chunk, periods, cost_bps, allow_short)
+        return await process_pool.run(backtest.backtest_grid, close, chunk, periods, cost_bps, allow_short)
+
+    jobs = []
+    for key, data in zip(tickers, fetched):
+        if isinstance(data, Exception) or data.empty:
+            continue
+        close = np.ascontiguousarray(_close_prices(data), dtype=np.float64)
+        jobs.append((key, asyncio.gather(*[run_chunk(close, chunk) for chunk in chunks])))
+
+    results = {}
+    for key, data in zip(tickers, fetched):
+        if isinstance(data, Exception):
+            results[key] = data
+        elif data.empty:
+            results[key] = ValueError(f"No data found for ticker {key[0]}")
+    with metrics.stage("backtest"):
+        outcomes = await asyncio.gather(*[job for _, job in jobs], return_exceptions=True)
+    for (key, _), outcome in zip(jobs, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error running backtest for {key[0]}: {str(outcome)}")
+            results[key] = outcome
+        else:
+            results[key] = list(zip(grid, itertools.chain.from_iterable(outcome)))
+    return results
+
+async def correlate_stocks(tickers: List[Tuple[str, str]], timeframe: str, years: int, lookbacks: List[int],
+                           min_periods: int = 20, include_covariance: bool = False) -> CorrelationResponse:
+    """종목들의 수익률 상관/공분산 행렬, 기준 지수 대비 베타와 상대강도 순위
+
+    KR/US 종목이 섞이면 모든 시장이 거래한 날만 행으로 남겨, 한쪽 휴장일의 움직임은 다음 공통 거래일 수익률에 포함
+    """
+    markets = list(dict.fromkeys(market.upper() for _, market in tickers))
+    benchmarks = [(correlation.BENCHMARKS[market], market) for market in markets]
+    # 상대강도의 가장 긴 기간까지 받아 두고, 상관계수는 최근 years년만 사용
+    lookback_days = max(365 * years, math.ceil(max(lookbacks, default=0) * CALENDAR_DAYS_PER_BAR[timeframe]) + 14)
+    # 기준 지수는 yfinance에서만 제공되므로 US 경로로 조회
+    fetched = await asyncio.gather(
+        *[_get_stock_data(ticker, market, timeframe, lookback_days=lookback_days) for ticker, market in tickers],
+        *[_get_stock_data(symbol, 'US', timeframe, lookback_days=lookback_days) for symbol, _ in benchmarks],
+        return_exceptions=True
+    )
+
+    errors: Dict[str, str] = {}
+    columns: List[Tuple[int, str]] = []
+    for i, ((ticker, market), data) in enumerate(zip(tickers + benchmarks, fetched)):
+        if isinstance(data, Exception):
+            errors[ticker] = str(data)
+        elif data.empty:
+            errors[ticker] = f"No data found for ticker {ticker}"
+        else:
+            columns.append((i, market.upper()))
+    if not any(i < len(tickers) for i, _ in columns):
+        raise ValueError("No price data found for any of the requested tickers")
+
+    with metrics.stage("correlation"):
+        return await asyncio.to_thread(
+            _correlation_response, tickers, benchmarks, fetched, columns, timeframe, years, lookbacks,
+            min_periods, include_covariance, errors
+        )
+
+def _calendar_keys(index: pd.DatetimeIndex, timeframe: str) -> pd.DatetimeIndex:
+    # 시간대가 있는 인덱스(US)는 현지 날짜로 바꿔 KR과 같은 날짜를 같은 행으로 맞춤
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    # normalize()는 빈도 추론 비용이 커서 날짜 단위로 바로 자름
+    index = pd.DatetimeIndex(index.values.astype('datetime64[D]'))
+    if timeframe == 'weekly':
+        return index.to_period('W').start_time
+    if timeframe == 'monthly':
+        return index.to_period('M').start_time
+    return index
+
+def _correlation_response(tickers: List[Tuple[str, str]], benchmarks: List[Tuple[str, str]],
+                          fetched: List, columns: List[Tuple[int, str]], timeframe: str, years: int,
+                          lookbacks: List[int], min_periods: int, include_covariance: bool,
+                          errors: Dict[str, str]) -> CorrelationResponse:
+    closes = []
+    for i, _ in columns:
+        data = fetched[i]
+        series = pd.Series(_close_prices(data), index=_calendar_keys(data.index, timeframe))
+        if series.index.has_duplicates:
+            series = series[~series.index.duplicated(keep='last')]
+        closes.append(series)
+    panel = pd.concat(closes, axis=1, keys=range(len(columns))).sort_index() if closes else pd.DataFrame()
+
+    # 시장별 거래일(그 시장 종목 중 하나라도 값이 있는 날)의 교집합만 사용
+    # 중간 결측(거래정지 등)은 직전 종가로 채우고, 상장 전 구간은 NaN으로 둠
+    traded = panel.notna().to_numpy()
+    common = np.ones(len(panel), dtype=bool)
+    for market in dict.fromkeys(market for _, market in columns):
+        common &= traded[:, [c for c, (_, m) in enumerate(columns) if m == market]].any(axis=1)
+    dates = panel.index[common]
+    close = panel.ffill().to_numpy(dtype=np.float64)[common]
 
-async def _get_us_stock_data(ticker: str, timeframe: str = 'daily') -> pd.DataFrame:
+    returns = correlation.simple_returns(close)
+    window_start = pd.Timestamp(date.today() - timedelta(days=365 * years))
+    window = returns[dates[1:] >= window_start] if len(dates) > 1 else returns
+    stats = correlation.pairwise_stats(window, min_periods)
+    volatility = correlation.annualized_volatility(window, backtest.PERIODS_PER_YEAR[timeframe])
+
+    column_of = {i: c for c, (i, _) in enumerate(columns)}
+    benchmark_column = {
+        market: column_of.get(len(tickers) + k) for k, (_, market) in enumerate(benchmarks)
+    }
+    members = [(i, column_of[i]) for i in range(len(tickers)) if i in column_of]
+    cols = [c for _, c in members]
+    bench_cols = [benchmark_column[tickers[i][1].upper()] for i, _ in members]
+
+    missing = np.full(len(close), np.nan)
+    benchmark_close = np.column_stack(
+        [close[:, b] if b is not None else missing for b in bench_cols]
+    ) if members else np.empty((len(close), 0))
+    strength = correlation.relative_strength(close[:, cols], benchmark_close, lookbacks)
+
+    labels = [str(lookback) for lookback in lookbacks]
+    items = []
+    for k, (i, c) in enumerate(members):
+        ticker, market = tickers[i]
+        b = bench_cols[k]
+        items.append(RelativeStrengthItem(
+            ticker=ticker,
+            market=market,
+            benchmark=correlation.BENCHMARKS[market.upper()],
+            rank=int(strength.rank[k]) or None,
+            score=_clean_float_value(strength.score[k]),
+            returns=dict(zip(labels, correlation.to_rows(strength.returns[:, k]))),
+            relative_returns=dict(zip(labels, correlation.to_rows(strength.relative[:, k]))),
+            beta=_clean_float_value(stats.beta[c, b]) if b is not None else None,
+            volatility=_clean_float_value(volatility[c])
+        ))
+    items.sort(key=lambda item: (item.rank is None, item.rank or 0))
+
+    window_dates = dates[-len(window) - 1:] if len(window) else dates[:0]
+    grid = np.ix_(cols, cols)
+    return CorrelationResponse(
+        timeframe=timeframe,
+        start=window_dates[0].date().isoformat() if len(window_dates) else None,
+        end=window_dates[-1].date().isoformat() if len(window_dates) else None,
+        observations=len(window),
+        tickers=[tickers[i][0] for i, _ in members],
+        correlation=correlation.to_rows(stats.correlation[grid]),
+        covariance=correlation.to_rows(stats.covariance[grid], 10) if include_covariance else None,
+        relative_strength=items,
+        errors=errors
+    )
+
+async def _load_history(market: str, ticker: str, interval: str, start_date: datetime,
+                        fetch: Callable[[datetime, Optional[date]], Awaitable[pd.DataFrame]],
+                        refresh_seconds: float = HISTORY_REFRESH_SECONDS,
+                        retention: Optional[timedelta] = None) -> pd.DataFrame:
+    """로컬 히스토리를 먼저 읽고, 저장되지 않은 구간만 업스트림에서 받아 합침
+
+    fetch(start, end)는 [start, end] 구간을 받음 (end가 None이면 최신 봉까지)
+    """
+    # 파일 읽기와 역직렬화는 이벤트 루프 밖에서 실행
+    with metrics.stage("store_load"):
+        stored = await asyncio.to_thread(history_store.load, market, ticker, interval)
+    if _servable(market, stored, start_date, refresh_seconds):
+        metrics.HISTORY_STORE_REQUESTS.inc(market, "hit")
+        logger.info(f"Serving {market} {ticker} {interval} history from local store")
+        return history_store.slice_from(stored.frame, start_date)
+
+    # 여러 워커가 같은 종목을 동시에 받지 않도록 잠그고, 기다린 사이 다른 워커가 저장했으면 그대로 사용
+    async with history_store.fetch_lock(market, ticker, interval):
+        with metrics.stage("store_load"):
+            stored = await asyncio.to_thread(history_store.load, market, ticker, interval)
+        if _servable(market, stored, start_date, refresh_seconds):
+            metrics.HISTORY_STORE_REQUESTS.inc(market, "shared")
+            logger.info(f"Serving {market} {ticker} {interval} history stored by another worker")
+            return history_store.slice_from(stored.frame, start_date)
+        return await _refresh_history(market, ticker, interval, start_date, stored, fetch, refresh_seconds, retention)
+
+def _servable(market: str, stored: Optional[history_store.StoredHistory], start_date: datetime,
+              refresh_seconds: float) -> bool:
+    return _covers(stored, start_date) and _fresh(market, stored, refresh_seconds)
+
+def _covers(stored: Optional[history_store.StoredHistory], start_date: datetime) -> bool:
+    return stored is not None and not stored.frame.empty and stored.coverage_start <= start_date
+
+def _fresh(market: str, stored: history_store.StoredHistory, refresh_seconds: float) -> bool:
+    return time.time() - stored.updated_at < refresh_seconds or _is_current(market, stored)
+
+async def _refresh_history(market: str, ticker: str, interval: str, start_date: datetime,
+                           stored: Optional[history_store.StoredHistory],
+                           fetch: Callable[[datetime, Optional[date]], Awaitable[pd.DataFrame]],
+                           refresh_seconds: float, retention: Optional[timedelta]) -> pd.DataFrame:
+    # 분봉처럼 보관 기간이 정해진 시계열은 보관 기간보다 오래된 구간을 받지도 저장하지도 않음
+    cutoff = _day_start(datetime.now() - retention) if retention is not None else None
+    if stored is None or stored.frame.empty:
+        metrics.HISTORY_STORE_REQUESTS.inc(market, "miss")
+        frame = history_store.merge(None, await fetch(start_date, None))
+        coverage_start = start_date
+        stale = False
+    else:
+        metrics.HISTORY_STORE_REQUESTS.inc(market, "partial")
+        head_start = max(start_date, cutoff) if cutoff is not None else start_date
+        fetches = {}
+        if head_start < stored.coverage_start:
+            # 저장 구간보다 앞선 구간만 받음 (구간 페이지를 과거로 넘겨도 저장된 구간은 다시 받지 않음)
+            fetches["head"] = fetch(head_start, stored.coverage_start.date())
+        if not _fresh(market, stored, refresh_seconds):
+            # 마지막 저장 봉은 장중에 저장된 값일 수 있으므로 그 봉부터 다시 받음
+            fetches["tail"] = fetch(stored.frame.index[-1].to_pydatetime().replace(tzinfo=None), None)
+        results = dict(zip(fetches, await asyncio.gather(*fetches.values(), return_exceptions=True)))
+
+        head = results.get("head")
+        if isinstance(head, Exception):
+            raise head
+        tail = results.get("tail")
+        stale = isinstance(tail, Exception)
+        if stale:
+            metrics.HISTORY_STORE_REQUESTS.inc(market, "stale")
+            logger.warning(f"Failed to refresh {market} {ticker} {interval} history, serving stored bars: {str(tail)}")
+            tail = None
+        if head is None and tail is None:
+            return history_store.slice_from(stored.frame, start_date)
+
+        frame = stored.frame
+        if head is not None:
+            # 겹치는 날은 저장된 봉을 유지하고 그 앞에 붙임
+            frame = history_store.merge(head, frame)
+            coverage_start = min(head_start, stored.coverage_start)
+        else:
+            coverage_start = stored.coverage_start
+        if tail is not None:
+            frame = history_store.merge(frame, tail)
+
+    if cutoff is not None:
+        frame = history_store.slice_from(frame, cutoff)
+        coverage_start = max(coverage_start, cutoff)
+    # 최신 구간 갱신에 실패했으면 저장하지 않아 다음 요청에서 다시 시도 (저장 시각이 갱신되어 최신으로 보이지 않도록)
+    if not frame.empty and not stale:
+        with metrics.stage("store_save"):
+            await asyncio.to_thread(history_store.save, market, ticker, interval, frame, coverage_start)
+    return history_store.slice_from(frame, start_date)
+
+def _is_current(market: str, stored: history_store.StoredHistory) -> bool:
+    """마지막 거래일 봉까지 있고 폐장 후 정산 시간이 지나 저장됐으면 다음 개장 전까지 새 데이터가 없음"""
+    if trading_calendar.is_open(market):
+        return False
+    closed_at = trading_calendar.last_close(market)
+    last_bar = stored.frame.index[-1]
+    if last_bar.tzinfo is not None:
+        last_bar = last_bar.tz_convert(closed_at.tzinfo)
+    return (last_bar.date() >= closed_at.date()
+            and stored.updated_at >= closed_at.timestamp() + HISTORY_SETTLE_SECONDS)
+
+def _day_start(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+# timeframe별 (기준 시계열 간격, 조회 기간(일))
+# 상위 시간대는 기준 시계열을 리샘플링해서 만들므로 업스트림 추가 호출이 없음
+KR_TIMEFRAMES = {
+    'daily': ('1d', 365),
+    'weekly': ('1d', 365 * 3),
+    'monthly': ('1d', 365 * 5),
+}
+US_TIMEFRAMES = {
+    '1m': ('1m', 1),
+    '3m': ('1m', 5),
+    '5m': ('5m', 5),
+    '10m': ('1m', 7),
+    '15m': ('15m', 5),
+    '30m': ('30m', 5),
+    '60m': ('60m', 7),
+    '120m': ('60m', 30),
+    '240m': ('60m', 60),
+    'daily': ('1d', 365),
+    'weekly': ('1d', 365 * 2),
+    'monthly': ('1d', 365 * 5),
+}
+TIMEFRAMES = {'KR': KR_TIMEFRAMES, 'US': US_TIMEFRAMES}
+
+# 분봉 기준 시계열 보관 기간 (yfinance 제공 한도)
+INTRADAY_RETENTION = {
+    '1m': timedelta(days=7),
+    '5m': timedelta(days=60),
+    '15m': timedelta(days=60),
+    '30m': timedelta(days=60),
+    '60m': timedelta(days=365),
+}
+
+# 분봉 기준 시계열의 갱신 주기(초)
+INTRADAY_REFRESH_SECONDS = float(os.getenv("STOCK_INTRADAY_REFRESH_SECONDS", "15"))
+
+def _derive_timeframe(df: pd.DataFrame, base_interval: str, timeframe: str, market: str) -> pd.DataFrame:
+    if timeframe not in RESAMPLE_RULES:
+        return df
+    logger.info(f"Resampling {len(df)} {base_interval} records to {timeframe}")
+    with metrics.stage("resample"):
+        resampled = resample_ohlcv(df, timeframe, market)
+    logger.info(f"Resampled to {len(resampled)} {timeframe} records")
+    return resampled
+
+async def _get_stock_data(ticker: str, market: str, timeframe: str,
+                          lookback_days: Optional[int] = None) -> pd.DataFrame:
+    # 같은 종목/시간대의 동시 요청은 하나의 업스트림 조회로 합침
+    # lookback_days를 주면 timeframe 기본 조회 기간 대신 사용 (백테스트 등)
+    market = market.upper()
+    ticker = providers.normalize_ticker(market, ticker)
+    return await upstream.coalesce(
+        (market, ticker, timeframe, lookback_days),
+        lambda: _get_market_data(market, ticker, timeframe, lookback_days)
+    )
+
+async def _get_market_data(market: str, ticker: str, timeframe: str,
+                           lookback_days: Optional[int] = None) -> pd.DataFrame:
     try:
-        stock_data = yf.Ticker(ticker)
-        
-        # timeframe에 따라 적절한 기간과 간격 설정
-        # yfinance 지원 간격만 사용: 1m, 5m, 15m, 30m, 60m, 1d, 1wk, 1mo
-        period_map = {
-            '1m': ("1d", "1m"),      # 1분봉: 최대 1일
-            '5m': ("5d", "5m"),      # 5분봉: 최대 5일
-            '15m': ("5d", "15m"),    # 15분봉: 최대 5일
-            '30m': ("5d", "30m"),    # 30분봉: 최대 5일
-            '60m': ("7d", "60m"),    # 60분봉: 최대 7일
-            'daily': ("1y", "1d"),   # 일봉
-            'weekly': ("2y", "1wk"), # 주봉
-            'monthly': ("5y", "1mo"), # 월봉
-        }
-        
-        period, interval = period_map.get(timeframe, ("1y", "1d"))
-        
-        try:
-            logger.info(f"Fetching US stock {ticker} data with period={period}, interval={interval} for timeframe={timeframe}")
-            df = stock_data.history(period=period, interval=interval)
-            
-            if df.empty:
-                raise ValueError(f"No data found for US stock {ticker} with timeframe {timeframe}")
-                    
-        except Exception as e:
-            logger.error(f"Error fetching US stock data for {ticker} with timeframe {timeframe}: {str(e)}")
-            raise ValueError(f"Failed to fetch data for US stock {ticker}: {str(e)}")
-            
-        logger.info(f"Successfully fetched {len(df)} records for US stock {ticker}")
+        timeframes = TIMEFRAMES.get(market, {})
+        if timeframe not in timeframes:
+            raise ValueError(f"Timeframe {timeframe} is not available for {market} stocks")
+
+        # 제공자가 지원하는 간격만 기준 시계열로 받고, 상위 시간대는 리샘플링
+        base_interval, days = timeframes[timeframe]
+        start_date = _day_start(datetime.now() - timedelta(days=lookback_days or days))
+        # 거래일 달력으로 구한 마지막 거래일까지만 요청 (주말/휴장일에 빈 응답을 받고 재시도하지 않음)
+        last_day = trading_calendar.last_trading_day(market)
+        intraday = base_interval in INTRADAY_RETENTION
+
+        logger.info(f"Fetching {market} stock {ticker} data with interval={base_interval} since {start_date.date()} for timeframe={timeframe}")
+        df = await _load_history(
+            market, ticker, base_interval, start_date,
+            lambda fetch_start, fetch_end: providers.fetch_history(
+                market, ticker, base_interval, fetch_start, min(fetch_end, last_day) if fetch_end else last_day
+            ),
+            refresh_seconds=INTRADAY_REFRESH_SECONDS if intraday else HISTORY_REFRESH_SECONDS,
+            retention=INTRADAY_RETENTION.get(base_interval)
+        )
+        if not df.empty:
+            df = _derive_timeframe(df, base_interval, timeframe, market)
+        if df.empty:
+            raise ValueError(f"No data found for {market} stock {ticker} with timeframe {timeframe}")
+
+        logger.info(f"Successfully fetched {len(df)} records for {market} stock {ticker}")
         return df
+    except providers.ProviderUnavailable as e:
+        # 잘못된 요청이 아니라 제공자 장애이므로 ValueError(400)로 바꾸지 않음
+        logger.error(f"Error fetching {market} stock data for {ticker} with timeframe {timeframe}: {str(e)}")
+        raise providers.ProviderUnavailable(f"Failed to fetch data for {market} stock {ticker}: {str(e)}") from e
     except Exception as e:
-        logger.error(f"Error fetching US stock data: {str(e)}")
-        raise ValueError(f"Failed to fetch data for US stock {ticker}")
+        logger.error(f"Error fetching {market} stock data for {ticker} with timeframe {timeframe}: {str(e)}")
+        raise ValueError(f"Failed to fetch data for {market} stock {ticker}: {str(e)}")
 
 async def get_technical_indicators(ticker: str, market: str, timeframe: str = 'daily') -> TechnicalIndicators:
     try:
-        if market.lower() == "kr":
-            data = await _get_korean_stock_data(ticker, timeframe)
-        else:
-            data = await _get_us_stock_data(ticker, timeframe)
+        data = await _get_stock_data(ticker, market, timeframe)
         
         if data.empty:
             raise ValueError(f"No data found for ticker {ticker}")
@@ -204,23 +569,9 @@ async def get_technical_indicators(ticker: str, market: str, timeframe: str = 'd
         logger.error(f"Error getting technical indicators for {ticker}: {str(e)}")
         raise
 
-async def _calculate_rsi_series(data: pd.DataFrame, period: int = 14) -> List[float]:
-    try:
-        close_prices = data['Close'].values if 'Close' in data.columns else data['종가'].values
-        delta = pd.Series(close_prices).diff()
-        gains = delta.where(delta > 0, 0)
-        losses = -delta.where(delta < 0, 0)
-        
-        avg_gains = gains.rolling(window=period).mean()
-        avg_losses = losses.rolling(window=period).mean()
-        
-        rs = avg_gains / avg_losses
-        rsi = 100 - (100 / (1 + rs))
-        
-        return [float(x) if not pd.isna(x) else 50.0 for x in rsi]
-    except Exception as e:
-        logger.error(f"Error calculating RSI series: {str(e)}")
-        raise
+def _rsi_chart_values(rsi: np.ndarray) -> List[float]:
+    # 계산 구간 이전(NaN)은 중립값 50으로 표시
+    return np.where(np.isnan(rsi), 50.0, rsi).astype(float).tolist()
 
 def _clean_float_value(value):
     """Handle NaN and Infinity values for JSON serialization"""
@@ -228,49 +579,31 @@ def _clean_float_value(value):
         return None
     return float(value)
 
+def _clean_float_list(values: np.ndarray) -> List[Optional[float]]:
+    return [x if np.isfinite(x) else None for x in values.astype(float).tolist()]
+
+def _to_technical_indicators(series: IndicatorSeries) -> TechnicalIndicators:
+    return TechnicalIndicators(
+        sma_50=_clean_float_value(series.sma_50[-1]),
+        sma_200=_clean_float_value(series.sma_200[-1]),
+        rsi=_clean_float_value(series.rsi[-1]),
+        macd={
+            "macd": _clean_float_value(series.macd[-1]),
+            "signal": _clean_float_value(series.signal[-1]),
+            "histogram": _clean_float_value(series.histogram[-1])
+        },
+        bollinger_bands={
+            "upper": _clean_float_list(series.bb_upper[-20:]),
+            "middle": _clean_float_list(series.bb_middle[-20:]),
+            "lower": _clean_float_list(series.bb_lower[-20:])
+        }
+    )
+
 async def _calculate_technical_indicators(data: pd.DataFrame) -> TechnicalIndicators:
     try:
         close_prices = data['Close'].values if 'Close' in data.columns else data['종가'].values
-        
-        # Calculate SMA
-        sma_50 = pd.Series(close_prices).rolling(window=50).mean().iloc[-1]
-        sma_200 = pd.Series(close_prices).rolling(window=200).mean().iloc[-1]
-
-        # Calculate RSI
-        delta = pd.Series(close_prices).diff()
-        gains = delta.where(delta > 0, 0).rolling(window=14).mean()
-        losses = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gains / losses
-        rsi = 100 - (100 / (1 + rs.iloc[-1]))
-
-        # Calculate MACD
-        exp1 = pd.Series(close_prices).ewm(span=12, adjust=False).mean()
-        exp2 = pd.Series(close_prices).ewm(span=26, adjust=False).mean()
-        macd_line = exp1 - exp2
-        signal_line = macd_line.ewm(span=9, adjust=False).mean()
-        macd_hist = macd_line - signal_line
-
-        # Calculate Bollinger Bands
-        middle_band = pd.Series(close_prices).rolling(window=20).mean()
-        std_dev = pd.Series(close_prices).rolling(window=20).std()
-        upper_band = middle_band + (std_dev * 2)
-        lower_band = middle_band - (std_dev * 2)
-
-        return TechnicalIndicators(
-            sma_50=_clean_float_value(sma_50),
-            sma_200=_clean_float_value(sma_200),
-            rsi=_clean_float_value(rsi),
-            macd={
-                "macd": _clean_float_value(macd_line.iloc[-1]),
-                "signal": _clean_float_value(signal_line.iloc[-1]),
-                "histogram": _clean_float_value(macd_hist.iloc[-1])
-            },
-            bollinger_bands={
-                "upper": [_clean_float_value(x) for x in upper_band.tail(20).tolist()],
-                "middle": [_clean_float_value(x) for x in middle_band.tail(20).tolist()],
-                "lower": [_clean_float_value(x) for x in lower_band.tail(20).tolist()]
-            }
-        )
+        with metrics.stage("indicators"):
+            return _to_technical_indicators(compute_indicators(close_prices))
     except Exception as e:
         logger.error(f"Error calculating technical indicators: {str(e)}")
         raise
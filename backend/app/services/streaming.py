@@ -0,0 +1,230 @@
+import asyncio
+import math
+import os
+import logging
+from collections import deque
+from typing import Dict, Optional, Set, Tuple
+
+from . import stock_service, trading_calendar
+
+logger = logging.getLogger(__name__)
+
+# 분봉 스트림 업스트림 폴링 주기(초)와 구독자별 대기열 크기
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "15"))
+STREAM_QUEUE_SIZE = 100
+
+# 누적 합의 부동소수점 오차가 쌓이지 않도록 주기적으로 다시 합산
+_RESUM_INTERVAL = 1000
+
+class RollingSMA:
+    """새 값 하나당 O(1)로 갱신되는 단순 이동평균"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, value: float) -> Optional[float]:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        self.updates += 1
+        if self.updates % _RESUM_INTERVAL == 0:
+            self.total = math.fsum(self.values)
+        return self.total / self.window if len(self.values) == self.window else None
+
+class EMA:
+    """pandas ewm(span, adjust=False)와 같은 지수이동평균"""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+class MACD:
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        macd_line = self.fast.update(value) - self.slow.update(value)
+        signal_line = self.signal.update(macd_line)
+        return macd_line, signal_line, macd_line - signal_line
+
+class RSI:
+    """분석 API와 같은 정의(상승/하락폭의 단순 이동평균)의 RSI"""
+
+    def __init__(self, period: int = 14):
+        self.gains = RollingSMA(period)
+        self.losses = RollingSMA(period)
+        self.previous: Optional[float] = None
+
+    def update(self, value: float) -> Optional[float]:
+        delta = 0.0 if self.previous is None else value - self.previous
+        self.previous = value
+        avg_gain = self.gains.update(max(delta, 0.0))
+        avg_loss = self.losses.update(max(-delta, 0.0))
+        if avg_gain is None or avg_loss is None:
+            return None
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else None
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+class Bollinger:
+    """윈도 합과 제곱합을 유지하는 볼린저 밴드 (첫 값 기준으로 중심화해 자릿수 손실을 줄임)"""
+
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        self.window = window
+        self.num_std = num_std
+        self.values = deque(maxlen=window)
+        self.reference: Optional[float] = None
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.updates = 0
+
+    def update(self, value: float) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        if self.reference is None:
+            self.reference = value
+        centered = value - self.reference
+        if len(self.values) == self.window:
+            oldest = self.values[0]
+            self.total -= oldest
+            self.total_squares -= oldest * oldest
+        self.values.append(centered)
+        self.total += centered
+        self.total_squares += centered * centered
+        self.updates += 1
+        if self.updates % _RESUM_INTERVAL == 0:
+            self.total = math.fsum(self.values)
+            self.total_squares = math.fsum(v * v for v in self.values)
+
+        if len(self.values) < self.window:
+            return None, None, None
+        mean = self.total / self.window
+        variance = max(self.total_squares - self.total * mean, 0.0) / (self.window - 1)
+        band = self.num_std * math.sqrt(variance)
+        middle = mean + self.reference
+        return middle + band, middle, middle - band
+
+class IndicatorState:
+    def __init__(self):
+        self.sma_50 = RollingSMA(50)
+        self.sma_200 = RollingSMA(200)
+        self.rsi = RSI(14)
+        self.macd = MACD()
+        self.bollinger = Bollinger()
+
+    def update(self, close: float) -> Dict[str, Optional[float]]:
+        macd_line, signal_line, histogram = self.macd.update(close)
+        upper, middle, lower = self.bollinger.update(close)
+        return {
+            "sma_50": self.sma_50.update(close),
+            "sma_200": self.sma_200.update(close),
+            "rsi": self.rsi.update(close),
+            "macd": macd_line,
+            "signal": signal_line,
+            "histogram": histogram,
+            "bb_upper": upper,
+            "bb_middle": middle,
+            "bb_lower": lower,
+        }
+
+def _bar_message(kind: str, ticker: str, timeframe: str, timestamp, row, indicators: Dict) -> Dict:
+    return {
+        "type": kind,
+        "ticker": ticker,
+        "timeframe": timeframe,
+        "bar": {
+            "date": timestamp.isoformat(),
+            "open": float(row["Open"]),
+            "high": float(row["High"]),
+            "low": float(row["Low"]),
+            "close": float(row["Close"]),
+            "volume": int(row["Volume"]),
+        },
+        "indicators": indicators,
+    }
+
+def _session_ended(data) -> bool:
+    """마지막 봉이 이미 끝난 장에서 시작했으면 True (장 마감 시각이 지나 더 갱신되지 않는 봉)"""
+    if data.empty:
+        return False
+    return data.index[-1] < trading_calendar.last_close("US")
+
+class _Feed:
+    def __init__(self, ticker: str, timeframe: str):
+        self.ticker = ticker
+        self.timeframe = timeframe
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[Dict] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, message: Dict) -> None:
+        self.latest = message
+        for queue in self.subscribers:
+            if queue.full():
+                # 느린 구독자는 오래된 메시지부터 버림
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def run(self) -> None:
+        state = IndicatorState()
+        last_timestamp = None
+        while True:
+            try:
+                data = await stock_service._get_stock_data(self.ticker, "US", self.timeframe)
+                # 마지막 봉은 아직 진행 중이므로 완성된 봉만 반영. 장 마감 후에는 마지막 봉도 확정
+                closed = data if _session_ended(data) else data.iloc[:-1]
+                if last_timestamp is not None:
+                    closed = closed[closed.index > last_timestamp]
+                for timestamp, row in closed.iterrows():
+                    indicators = state.update(float(row["Close"]))
+                    if last_timestamp is not None:
+                        self.publish(_bar_message("bar", self.ticker, self.timeframe, timestamp, row, indicators))
+                if last_timestamp is None and not closed.empty:
+                    self.publish(_bar_message(
+                        "snapshot", self.ticker, self.timeframe, closed.index[-1], closed.iloc[-1], indicators
+                    ))
+                if not closed.empty:
+                    last_timestamp = closed.index[-1]
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Stream poll failed for {self.ticker} {self.timeframe}: {str(e)}")
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+
+class StreamHub:
+    """종목/시간대별로 업스트림 폴러 하나를 두고 모든 구독자에게 새 봉을 전달"""
+
+    def __init__(self):
+        self.feeds: Dict[Tuple[str, str], _Feed] = {}
+
+    def subscribe(self, ticker: str, timeframe: str) -> asyncio.Queue:
+        key = (ticker.upper(), timeframe)
+        feed = self.feeds.get(key)
+        if feed is None:
+            feed = self.feeds[key] = _Feed(*key)
+            feed.task = asyncio.create_task(feed.run())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        if feed.latest is not None:
+            queue.put_nowait(dict(feed.latest, type="snapshot"))
+        feed.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, ticker: str, timeframe: str, queue: asyncio.Queue) -> None:
+        key = (ticker.upper(), timeframe)
+        feed = self.feeds.get(key)
+        if feed is None:
+            return
+        feed.subscribers.discard(queue)
+        if not feed.subscribers:
+            feed.task.cancel()
+            del self.feeds[key]
+
+hub = StreamHub()
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import os
+import time
+import logging
+from typing import Dict, List, NamedTuple, Optional
+
+from . import file_lock, upstream
+from .lazy import LazyModule
+
+logger = logging.getLogger(__name__)
+
+kr_stock = LazyModule("pykrx.stock")
+
+# 종목 검색 인덱스 스냅샷 경로와 갱신 주기
+TICKER_INDEX_PATH = os.getenv(
+    "TICKER_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "ticker_index.json")
+)
+TICKER_INDEX_REFRESH_SECONDS = float(os.getenv("TICKER_INDEX_REFRESH_HOURS", "24")) * 3600
+# 다른 워커가 인덱스를 만드는 동안 기다리는 최대 시간(초)
+TICKER_INDEX_LOCK_TIMEOUT = 120.0
+
+KOREAN_EXCHANGES = ("KOSPI", "KOSDAQ")
+
+# 한글 초성 (유니코드 음절 순서)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_HANGUL_START = 0xAC00
+_HANGUL_END = 0xD7A3
+_JAMO_START = 0x3131
+_JAMO_END = 0x314E
+
+class _Entry(NamedTuple):
+    ticker: str
+    name: str
+    exchange: str
+    name_lower: str
+    choseong: str
+
+_entries: List[_Entry] = []
+_by_ticker: Dict[str, _Entry] = {}
+_built_at: float = 0.0
+
+def _to_choseong(text: str) -> str:
+    chars = []
+    for ch in text.lower():
+        code = ord(ch)
+        if _HANGUL_START <= code <= _HANGUL_END:
+            chars.append(_CHOSEONG[(code - _HANGUL_START) // 588])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+def _has_jamo(text: str) -> bool:
+    return any(_JAMO_START <= ord(ch) <= _JAMO_END for ch in text)
+
+def _make_entry(ticker: str, name: str, exchange: str) -> _Entry:
+    return _Entry(ticker, name, exchange, name.lower(), _to_choseong(name))
+
+def _set_entries(records: List[Dict], built_at: float) -> None:
+    global _entries, _by_ticker, _built_at
+    _entries = [_make_entry(r["ticker"], r["name"], r["exchange"]) for r in records]
+    _by_ticker = {e.ticker: e for e in _entries}
+    _built_at = built_at
+
+def _fetch_listings() -> List[Dict]:
+    records = []
+    for exchange in KOREAN_EXCHANGES:
+        for ticker in kr_stock.get_market_ticker_list(market=exchange):
+            records.append({
+                "ticker": ticker,
+                "name": kr_stock.get_market_ticker_name(ticker),
+                "exchange": exchange
+            })
+    return records
+
+def _write_snapshot(records: List[Dict], built_at: float) -> None:
+    os.makedirs(os.path.dirname(TICKER_INDEX_PATH), exist_ok=True)
+    tmp_path = f"{TICKER_INDEX_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"built_at": built_at, "entries": records}, f, ensure_ascii=False)
+    os.replace(tmp_path, TICKER_INDEX_PATH)
+
+def ready() -> bool:
+    """검색할 인덱스가 메모리에 있으면 True (스냅샷을 읽었거나 업스트림에서 만든 뒤)"""
+    return bool(_entries)
+
+def load_snapshot() -> bool:
+    """디스크 스냅샷에서 인덱스를 읽음. 재시작한 워커가 업스트림 없이 바로 검색 가능"""
+    try:
+        with open(TICKER_INDEX_PATH, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        _set_entries(snapshot["entries"], snapshot["built_at"])
+        logger.info(f"Loaded {len(_entries)} tickers from index snapshot")
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable ticker index snapshot: {str(e)}")
+        return False
+
+async def _build() -> None:
+    # 여러 워커 중 하나만 업스트림에서 받고, 나머지는 기다렸다가 그 스냅샷을 읽음
+    async with file_lock.locked(f"{TICKER_INDEX_PATH}.lock", TICKER_INDEX_LOCK_TIMEOUT):
+        if load_snapshot() and not is_stale():
+            return
+        records = await upstream.run("pykrx", _fetch_listings)
+        if not records:
+            raise ValueError("No Korean listings returned from pykrx")
+        built_at = time.time()
+        _set_entries(records, built_at)
+        _write_snapshot(records, built_at)
+        logger.info(f"Built ticker index with {len(records)} tickers")
+
+async def refresh() -> None:
+    await upstream.coalesce(("ticker_index",), _build)
+
+def is_stale() -> bool:
+    return not _entries or time.time() - _built_at >= TICKER_INDEX_REFRESH_SECONDS
+
+async def refresh_periodically() -> None:
+    while True:
+        if is_stale():
+            try:
+                await refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh ticker index: {str(e)}")
+        await asyncio.sleep(min(TICKER_INDEX_REFRESH_SECONDS, 3600))
+
+def name_of(ticker: str) -> Optional[str]:
+    entry = _by_ticker.get(ticker)
+    return entry.name if entry is not None else None
+
+def exchange_of(ticker: str) -> Optional[str]:
+    entry = _by_ticker.get(ticker)
+    return entry.exchange if entry is not None else None
+
+def _rank(entry: _Entry, query: str, query_lower: str, query_choseong: Optional[str]) -> Optional[int]:
+    if entry.ticker == query:
+        return 0
+    if entry.name_lower == query_lower:
+        return 1
+    if entry.ticker.startswith(query):
+        return 2
+    if entry.name_lower.startswith(query_lower):
+        return 3
+    if query_choseong is not None and entry.choseong.startswith(query_choseong):
+        return 4
+    # 코드 중간 일치 ("593" -> 005930)
+    if query in entry.ticker:
+        return 5
+    if query_lower in entry.name_lower:
+        return 6
+    if query_choseong is not None and query_choseong in entry.choseong:
+        return 7
+    return None
+
+async def search(query: str, limit: int = 20) -> List[Dict]:
+    query = query.strip()
+    if not query:
+        return []
+    if not _entries:
+        await refresh()
+
+    query_lower = query.lower()
+    # 종목 코드는 대문자로 비교 (영문이 섞인 신규 코드)
+    query = query.upper()
+    query_choseong = _to_choseong(query) if _has_jamo(query) else None
+    matches = []
+    for entry in _entries:
+        rank = _rank(entry, query, query_lower, query_choseong)
+        if rank is not None:
+            matches.append((rank, len(entry.name), entry.ticker, entry))
+    matches.sort()
+    return [
+        {"ticker": e.ticker, "name": e.name, "market": "KR", "exchange": e.exchange}
+        for *_, e in matches[:limit]
+    ]
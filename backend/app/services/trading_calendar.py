@@ -0,0 +1,297 @@
+import os
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+class Session(NamedTuple):
+    timezone: ZoneInfo
+    open: time
+    close: time
+
+# 정규장 시간 (현지 시각)
+SESSIONS: Dict[str, Session] = {
+    "KR": Session(ZoneInfo("Asia/Seoul"), time(9, 0), time(15, 30)),
+    "US": Session(ZoneInfo("America/New_York"), time(9, 30), time(16, 0)),
+}
+
+# KRX 휴장일 중 음력 명절, 대체공휴일, 선거일, 임시공휴일처럼 규칙으로 계산할 수 없는 날
+# (양력 고정 휴장일은 _krx_fixed_holidays에서 계산). 표에 없는 연도는 양력 고정 휴장일만 적용됨
+KRX_HOLIDAYS: Dict[str, str] = {
+    "2020-01-24": "설날", "2020-01-27": "설날 대체공휴일", "2020-04-15": "국회의원 선거",
+    "2020-04-30": "부처님오신날", "2020-08-17": "임시공휴일", "2020-09-30": "추석",
+    "2020-10-01": "추석", "2020-10-02": "추석",
+    "2021-02-11": "설날", "2021-02-12": "설날", "2021-05-19": "부처님오신날",
+    "2021-08-16": "광복절 대체공휴일", "2021-09-20": "추석", "2021-09-21": "추석", "2021-09-22": "추석",
+    "2021-10-04": "개천절 대체공휴일", "2021-10-11": "한글날 대체공휴일",
+    "2022-01-31": "설날", "2022-02-01": "설날", "2022-02-02": "설날", "2022-03-09": "대통령 선거",
+    "2022-06-01": "지방선거", "2022-09-09": "추석", "2022-09-12": "추석 대체공휴일",
+    "2022-10-10": "한글날 대체공휴일",
+    "2023-01-23": "설날", "2023-01-24": "설날 대체공휴일", "2023-05-29": "부처님오신날 대체공휴일",
+    "2023-09-28": "추석", "2023-09-29": "추석", "2023-10-02": "임시공휴일",
+    "2024-02-09": "설날", "2024-02-12": "설날 대체공휴일", "2024-04-10": "국회의원 선거",
+    "2024-05-06": "어린이날 대체공휴일", "2024-05-15": "부처님오신날", "2024-09-16": "추석",
+    "2024-09-17": "추석", "2024-09-18": "추석", "2024-10-01": "국군의날 임시공휴일",
+    "2025-01-27": "임시공휴일", "2025-01-28": "설날", "2025-01-29": "설날", "2025-01-30": "설날",
+    "2025-03-03": "삼일절 대체공휴일", "2025-05-06": "부처님오신날 대체공휴일", "2025-06-03": "대통령 선거",
+    "2025-10-06": "추석", "2025-10-07": "추석", "2025-10-08": "추석 대체공휴일",
+    "2026-02-16": "설날", "2026-02-17": "설날", "2026-02-18": "설날", "2026-03-02": "삼일절 대체공휴일",
+    "2026-05-25": "부처님오신날 대체공휴일", "2026-06-03": "지방선거", "2026-08-17": "광복절 대체공휴일",
+    "2026-09-24": "추석", "2026-09-25": "추석", "2026-09-28": "추석 대체공휴일",
+    "2026-10-05": "개천절 대체공휴일",
+    "2027-02-08": "설날", "2027-02-09": "설날 대체공휴일", "2027-05-13": "부처님오신날",
+    "2027-08-16": "광복절 대체공휴일", "2027-09-14": "추석", "2027-09-15": "추석", "2027-09-16": "추석",
+    "2027-10-04": "개천절 대체공휴일", "2027-10-11": "한글날 대체공휴일", "2027-12-27": "성탄절 대체공휴일",
+}
+
+# 대학수학능력시험일: 개장/폐장 1시간씩 늦춤
+KRX_CSAT_DAYS = ("2020-12-03", "2021-11-18", "2022-11-17", "2023-11-16", "2024-11-14", "2025-11-13", "2026-11-19")
+
+# NYSE 임시 휴장일 (국장 등). 정기 휴장일은 _nyse_holidays에서 규칙으로 계산
+NYSE_SPECIAL_CLOSURES: Dict[str, str] = {
+    "2018-12-05": "National Day of Mourning (George H.W. Bush)",
+    "2025-01-09": "National Day of Mourning (Jimmy Carter)",
+}
+
+# 표에 아직 반영되지 않은 임시 휴장일: "KR:2025-01-27,US:2025-01-09" 형식
+EXTRA_HOLIDAYS = os.getenv("TRADING_CALENDAR_EXTRA_HOLIDAYS", "")
+
+class Day(NamedTuple):
+    """특정 일자의 거래 여부와 (개장일이면) 정규장 시각"""
+    trading: bool
+    open: Optional[time] = None
+    close: Optional[time] = None
+    holiday: Optional[str] = None
+
+def _session(market: str) -> Session:
+    return SESSIONS[market.upper()]
+
+def _observed(day: date) -> date:
+    # 토요일 휴일은 전 금요일, 일요일 휴일은 다음 월요일에 휴장
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _easter(year: int) -> date:
+    # 그레고리력 부활절 (Anonymous Gregorian algorithm)
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    return date(year, month, (h + l - 7 * m + 114) % 31 + 1)
+
+def _nyse_holidays(year: int) -> Dict[date, str]:
+    holidays = {
+        _nth_weekday(year, 1, 0, 3): "Martin Luther King Jr. Day",
+        _nth_weekday(year, 2, 0, 3): "Washington's Birthday",
+        _easter(year) - timedelta(days=2): "Good Friday",
+        _last_weekday(year, 5, 0): "Memorial Day",
+        _observed(date(year, 7, 4)): "Independence Day",
+        _nth_weekday(year, 9, 0, 1): "Labor Day",
+        _nth_weekday(year, 11, 3, 4): "Thanksgiving Day",
+        _observed(date(year, 12, 25)): "Christmas Day",
+    }
+    # 1월 1일이 토요일이면 전년도 12월 31일에 휴장하지 않음
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays[_observed(new_year)] = "New Year's Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = "Juneteenth"
+    return holidays
+
+def _nyse_early_closes(year: int, holidays: Dict[date, str]) -> List[date]:
+    # 독립기념일 전날, 추수감사절 다음 날, 성탄절 전날은 13:00 조기 폐장 (해당일이 평일 개장일인 경우)
+    candidates = [date(year, 7, 3), _nth_weekday(year, 11, 3, 4) + timedelta(days=1), date(year, 12, 24)]
+    return [d for d in candidates if d.weekday() < 5 and d not in holidays]
+
+def _krx_fixed_holidays(year: int) -> Dict[date, str]:
+    holidays = {
+        date(year, 1, 1): "신정",
+        date(year, 3, 1): "삼일절",
+        date(year, 5, 1): "근로자의 날",
+        date(year, 5, 5): "어린이날",
+        date(year, 6, 6): "현충일",
+        date(year, 8, 15): "광복절",
+        date(year, 10, 3): "개천절",
+        date(year, 10, 9): "한글날",
+        date(year, 12, 25): "성탄절",
+    }
+    # 연말 휴장일: 12월 31일, 주말이면 직전 평일
+    year_end = date(year, 12, 31)
+    while year_end.weekday() >= 5:
+        year_end -= timedelta(days=1)
+    holidays[year_end] = "연말 휴장일"
+    return holidays
+
+def _extra_holidays(market: str, year: int) -> Dict[date, str]:
+    holidays = {}
+    for item in filter(None, (part.strip() for part in EXTRA_HOLIDAYS.split(","))):
+        item_market, _, value = item.partition(":")
+        day = date.fromisoformat(value)
+        if item_market.upper() == market and day.year == year:
+            holidays[day] = "임시 휴장일"
+    return holidays
+
+@lru_cache(maxsize=None)
+def _year_calendar(market: str, year: int) -> Tuple[Dict[date, str], Dict[date, Tuple[time, time]]]:
+    """연도별 (휴장일 -> 사유, 정규장 시간이 다른 날 -> (개장, 폐장)) 표"""
+    session = SESSIONS[market]
+    special: Dict[date, Tuple[time, time]] = {}
+    if market == "KR":
+        holidays = _krx_fixed_holidays(year)
+        holidays.update({
+            date.fromisoformat(d): name for d, name in KRX_HOLIDAYS.items() if d.startswith(f"{year}-")
+        })
+        for d in KRX_CSAT_DAYS:
+            if d.startswith(f"{year}-"):
+                special[date.fromisoformat(d)] = (time(10, 0), time(16, 30))
+        # 연초 첫 거래일은 10시 개장
+        first = date(year, 1, 2)
+        while first.weekday() >= 5 or first in holidays:
+            first += timedelta(days=1)
+        special[first] = (time(10, 0), session.close)
+    else:
+        holidays = _nyse_holidays(year)
+        holidays.update({
+            date.fromisoformat(d): name for d, name in NYSE_SPECIAL_CLOSURES.items() if d.startswith(f"{year}-")
+        })
+        for d in _nyse_early_closes(year, holidays):
+            special[d] = (session.open, time(13, 0))
+    holidays.update(_extra_holidays(market, year))
+    return holidays, special
+
+def trading_day(market: str, day: date) -> Day:
+    market = market.upper()
+    if day.weekday() >= 5:
+        return Day(False)
+    holidays, special = _year_calendar(market, day.year)
+    if day in holidays:
+        return Day(False, holiday=holidays[day])
+    session = SESSIONS[market]
+    open_at, close_at = special.get(day, (session.open, session.close))
+    return Day(True, open_at, close_at)
+
+def now_in(market: str) -> datetime:
+    return datetime.now(_session(market).timezone)
+
+def is_trading_day(market: str, day: date) -> bool:
+    return trading_day(market, day).trading
+
+def session_bounds(market: str, day: date) -> Tuple[datetime, datetime]:
+    session = _session(market)
+    info = trading_day(market, day)
+    open_at = info.open or session.open
+    close_at = info.close or session.close
+    return (
+        datetime.combine(day, open_at, tzinfo=session.timezone),
+        datetime.combine(day, close_at, tzinfo=session.timezone),
+    )
+
+def is_open(market: str, now: Optional[datetime] = None) -> bool:
+    now = now or now_in(market)
+    local = now.astimezone(_session(market).timezone)
+    if not is_trading_day(market, local.date()):
+        return False
+    open_at, close_at = session_bounds(market, local.date())
+    return open_at <= local < close_at
+
+def next_open(market: str, now: Optional[datetime] = None) -> datetime:
+    now = now or now_in(market)
+    day = now.astimezone(_session(market).timezone).date()
+    while True:
+        if is_trading_day(market, day):
+            open_at, _ = session_bounds(market, day)
+            if open_at > now:
+                return open_at
+        day += timedelta(days=1)
+
+def last_close(market: str, now: Optional[datetime] = None) -> datetime:
+    now = now or now_in(market)
+    day = now.astimezone(_session(market).timezone).date()
+    while True:
+        if is_trading_day(market, day):
+            _, close_at = session_bounds(market, day)
+            if close_at <= now:
+                return close_at
+        day -= timedelta(days=1)
+
+def next_close(market: str, now: Optional[datetime] = None) -> datetime:
+    now = now or now_in(market)
+    day = now.astimezone(_session(market).timezone).date()
+    while True:
+        if is_trading_day(market, day):
+            _, close_at = session_bounds(market, day)
+            if close_at > now:
+                return close_at
+        day += timedelta(days=1)
+
+def last_trading_day(market: str, now: Optional[datetime] = None) -> date:
+    """시세가 존재하는 가장 최근 거래일. 오늘이 거래일이고 개장했으면 오늘(장중 값), 아니면 직전 거래일"""
+    now = now or now_in(market)
+    day = now.astimezone(_session(market).timezone).date()
+    if is_trading_day(market, day) and session_bounds(market, day)[0] <= now:
+        return day
+    return last_close(market, now).date()
+
+def trading_days(market: str, start: date, end: date) -> List[date]:
+    days = []
+    day = start
+    while day <= end:
+        if is_trading_day(market, day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def status(market: str, now: Optional[datetime] = None) -> Dict:
+    """장 운영 상태: open / pre_open / closed 와 오늘 세션, 다음 개장, 직전 폐장 시각"""
+    market = market.upper()
+    now = now or now_in(market)
+    local = now.astimezone(_session(market).timezone)
+    today = trading_day(market, local.date())
+
+    if not today.trading:
+        state, reason = "closed", "holiday" if today.holiday else "weekend"
+    else:
+        open_at, close_at = session_bounds(market, local.date())
+        if local < open_at:
+            state, reason = "pre_open", None
+        elif local < close_at:
+            state, reason = "open", None
+        else:
+            state, reason = "closed", "after_close"
+
+    session = SESSIONS[market]
+    result = {
+        "market": market,
+        "status": state,
+        "reason": reason,
+        "holiday": today.holiday,
+        "is_trading_day": today.trading,
+        "session_open": None,
+        "session_close": None,
+        "early_close": False,
+        "next_open": next_open(market, now).isoformat(),
+        "last_close": last_close(market, now).isoformat(),
+        "timestamp": local.isoformat(),
+    }
+    if today.trading:
+        open_at, close_at = session_bounds(market, local.date())
+        result["session_open"] = open_at.isoformat()
+        result["session_close"] = close_at.isoformat()
+        result["early_close"] = today.close < session.close
+    return result
@@ -0,0 +1,220 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import os
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 동기식 업스트림 호출(pykrx, yfinance)을 실행하는 스레드 풀 크기
+UPSTREAM_MAX_WORKERS = int(os.getenv("UPSTREAM_MAX_WORKERS", "16"))
+
+# 데이터 제공자별 동시 호출 수 제한
+PROVIDER_CONCURRENCY = {
+    "pykrx": int(os.getenv("PYKRX_MAX_CONCURRENCY", "4")),
+    "yfinance": int(os.getenv("YFINANCE_MAX_CONCURRENCY", "8")),
+}
+DEFAULT_CONCURRENCY = 4
+# 백그라운드 작업(예열, 작업 API, 스크리너 패널)이 제공자별로 동시에 쓸 수 있는 최대 호출 수
+# 기본값은 제공자 한도의 절반으로, 나머지는 항상 실시간 요청 몫으로 남김
+BACKGROUND_CONCURRENCY = {
+    provider: int(os.getenv(f"{provider.upper()}_BACKGROUND_CONCURRENCY", str(max(limit // 2, 1))))
+    for provider, limit in PROVIDER_CONCURRENCY.items()
+}
+# 실시간 요청이 슬롯을 기다리는 동안 백그라운드 호출이 다시 확인하기까지 대기 시간(초)
+BACKGROUND_POLL_SECONDS = 0.05
+
+_executor = ThreadPoolExecutor(max_workers=UPSTREAM_MAX_WORKERS, thread_name_prefix="upstream")
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_background_semaphores: Dict[str, asyncio.Semaphore] = {}
+_inflight: Dict[Hashable, asyncio.Future] = {}
+# 백그라운드 호출자가 시작한 진행 중 요청의 우선순위. 실시간 호출자가 합류하면 승격함
+_inflight_priority: Dict[Hashable, "_Priority"] = {}
+# 제공자별 실시간 호출 수 (슬롯 대기 중 + 실행 중)와 그중 슬롯을 기다리는 수
+_live_calls: Counter = Counter()
+_live_waiting: Counter = Counter()
+
+class _Priority:
+    """백그라운드 우선순위. promote()되거나 상위(이 요청을 시작한 작업)가 승격되면 실시간으로 취급"""
+
+    def __init__(self, parent: Optional["_Priority"] = None):
+        self.parent = parent
+        self._background = True
+
+    @property
+    def background(self) -> bool:
+        return self._background and (self.parent is None or self.parent.background)
+
+    def promote(self) -> None:
+        self._background = False
+
+# 백그라운드 작업에서 시작한 호출이면 그 우선순위 (실시간이면 None). 태스크를 만들 때 컨텍스트가 복사되므로 하위 태스크에도 전달됨
+_priority: contextvars.ContextVar[Optional[_Priority]] = contextvars.ContextVar("upstream_priority", default=None)
+
+def _current_background() -> Optional[_Priority]:
+    priority = _priority.get()
+    return priority if priority is not None and priority.background else None
+
+def _semaphore(provider: str) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        semaphore = _semaphores[provider] = asyncio.Semaphore(
+            PROVIDER_CONCURRENCY.get(provider, DEFAULT_CONCURRENCY)
+        )
+    return semaphore
+
+def _background_semaphore(provider: str) -> asyncio.Semaphore:
+    semaphore = _background_semaphores.get(provider)
+    if semaphore is None:
+        limit = PROVIDER_CONCURRENCY.get(provider, DEFAULT_CONCURRENCY)
+        semaphore = _background_semaphores[provider] = asyncio.Semaphore(
+            BACKGROUND_CONCURRENCY.get(provider, max(limit // 2, 1))
+        )
+    return semaphore
+
+@contextlib.contextmanager
+def background() -> Iterator[None]:
+    """이 블록과 여기서 만든 태스크의 업스트림 호출을 백그라운드 우선순위로 실행"""
+    token = _priority.set(_Priority())
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+async def _acquire_background(provider: str, priority: _Priority) -> Optional[asyncio.Semaphore]:
+    # 백그라운드 몫을 먼저 얻고, 실시간 요청이 슬롯을 기다리지 않고 빈 슬롯이 있을 때만 가져감
+    # 기다리는 동안 실시간으로 승격되면 None (호출자가 실시간 순서로 다시 기다림)
+    limit = _background_semaphore(provider)
+    while limit.locked():
+        if not priority.background:
+            return None
+        await asyncio.sleep(BACKGROUND_POLL_SECONDS)
+    await limit.acquire()
+    semaphore = _semaphore(provider)
+    try:
+        while _live_waiting[provider] or semaphore.locked():
+            if not priority.background:
+                limit.release()
+                return None
+            await asyncio.sleep(BACKGROUND_POLL_SECONDS)
+        await semaphore.acquire()
+    except BaseException:
+        limit.release()
+        raise
+    return limit
+
+async def run(provider: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """블로킹 업스트림 호출을 이벤트 루프 밖의 스레드 풀에서 실행
+
+    호출자가 취소되거나 시간 초과로 먼저 빠져도 스레드의 호출은 계속되므로,
+    동시 호출 한도는 스레드가 실제로 끝날 때 반납함
+    """
+    return await _run(provider, None, fn, args, kwargs)
+
+async def run_with_timeout(provider: str, timeout: float, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """run과 같지만 슬롯을 얻은 뒤 실제 호출에만 timeout(초)을 적용 (대기열에서 기다린 시간은 제외)
+
+    시간 초과 시 asyncio.TimeoutError
+    """
+    return await _run(provider, timeout, fn, args, kwargs)
+
+async def _run(provider: str, timeout: Optional[float], fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+    semaphore = _semaphore(provider)
+    priority = _current_background()
+    background_limit = None
+    live = False
+    try:
+        with metrics.stage("queue", provider):
+            if priority is not None:
+                background_limit = await _acquire_background(provider, priority)
+            if background_limit is None:
+                # 실시간 호출이거나, 기다리는 중 실시간 호출자가 합류해 승격된 호출
+                live = True
+                _live_calls[provider] += 1
+                _live_waiting[provider] += 1
+                try:
+                    await semaphore.acquire()
+                finally:
+                    _live_waiting[provider] -= 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = _executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            _release(semaphore, background_limit)
+            raise
+        future.add_done_callback(functools.partial(_release_from_thread, loop, semaphore, background_limit))
+        with metrics.stage("fetch", provider):
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except Exception:
+        metrics.UPSTREAM_ERRORS.inc(provider)
+        raise
+    finally:
+        if live:
+            _live_calls[provider] -= 1
+
+def _release(semaphore: asyncio.Semaphore, background_limit: Optional[asyncio.Semaphore]) -> None:
+    semaphore.release()
+    if background_limit is not None:
+        background_limit.release()
+
+def _release_from_thread(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore,
+                         background_limit: Optional[asyncio.Semaphore], _future) -> None:
+    try:
+        loop.call_soon_threadsafe(_release, semaphore, background_limit)
+    except RuntimeError:
+        # 종료 중 이벤트 루프가 이미 닫힌 경우
+        pass
+
+def saturated() -> bool:
+    """실시간 요청만으로 어느 제공자든 동시 호출 한도를 다 쓰고 있으면 True (백그라운드 작업이 양보할 때 사용)
+
+    백그라운드 호출은 세지 않으므로 작업 자신의 부하 때문에 멈추지는 않음
+    """
+    return any(
+        _live_calls[provider] >= PROVIDER_CONCURRENCY.get(provider, DEFAULT_CONCURRENCY)
+        for provider in _semaphores
+    )
+
+def _finish(key: Hashable, future: asyncio.Future) -> None:
+    if _inflight.get(key) is future:
+        del _inflight[key]
+        _inflight_priority.pop(key, None)
+    # 모든 대기자가 취소된 경우에도 예외가 경고 없이 정리되도록 함
+    if not future.cancelled():
+        future.exception()
+
+async def coalesce(key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+    """같은 key의 요청이 이미 진행 중이면 새로 호출하지 않고 그 결과를 공유
+
+    백그라운드 호출자가 시작한 요청에 실시간 호출자가 합류하면 남은 업스트림 호출을 실시간 우선순위로 올림
+    """
+    future = _inflight.get(key)
+    caller = _current_background()
+    if future is None:
+        if caller is not None:
+            # 이 요청만의 우선순위를 두어 승격이 호출자의 다른 백그라운드 작업에 번지지 않게 함
+            priority = _inflight_priority[key] = _Priority(parent=caller)
+            future = asyncio.ensure_future(_with_priority(priority, factory))
+        else:
+            future = asyncio.ensure_future(factory())
+        _inflight[key] = future
+        future.add_done_callback(functools.partial(_finish, key))
+    else:
+        logger.debug(f"Joining in-flight upstream request {key}")
+        if caller is None and key in _inflight_priority:
+            _inflight_priority[key].promote()
+    # 한 대기자가 취소되어도 공유 중인 요청은 계속 진행
+    return await asyncio.shield(future)
+
+async def _with_priority(priority: _Priority, factory: Callable[[], Awaitable[T]]) -> T:
+    # 태스크마다 컨텍스트가 복사되므로 여기서 설정한 값은 이 요청과 그 하위 태스크에만 적용됨
+    _priority.set(priority)
+    return await factory()
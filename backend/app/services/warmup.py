@@ -0,0 +1,188 @@
+import asyncio
+import os
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from . import analysis_cache, stock_service, trading_calendar, upstream
+
+logger = logging.getLogger(__name__)
+
+MARKETS = ("KR", "US")
+
+def _parse_watchlist(value: str) -> List[Tuple[str, str]]:
+    # "KR:005930,US:AAPL" 형식. 시장을 생략하면 숫자 코드는 KR, 그 외는 US
+    items = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        market, _, ticker = item.rpartition(":")
+        market = market.upper() or ("KR" if ticker.isdigit() else "US")
+        items.append((market, ticker.upper()))
+    return list(dict.fromkeys(items))
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1").lower() not in ("0", "false", "no")
+# 항상 예열할 종목과, 요청 횟수 상위 종목 수(시장별)
+WARMUP_WATCHLIST = _parse_watchlist(os.getenv("WARMUP_WATCHLIST", ""))
+WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", "20"))
+WARMUP_TIMEFRAMES = [tf.strip() for tf in os.getenv("WARMUP_TIMEFRAMES", "daily").split(",") if tf.strip()]
+# 장 마감 후 이 시간(분)이 지나면 실행. 종가 확정 대기(HISTORY_SETTLE_SECONDS)보다 길어야
+# 저장소가 최신으로 인정되고 캐시도 다음 개장까지 유지됨
+WARMUP_AFTER_CLOSE_MINUTES = float(os.getenv("WARMUP_AFTER_CLOSE_MINUTES", "40"))
+# 업스트림 속도 제한: 초당 시작하는 작업 수, 동시에 진행하는 작업 수
+WARMUP_RATE_PER_SECOND = float(os.getenv("WARMUP_RATE_PER_SECOND", "2"))
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "2"))
+# 실시간 요청이 업스트림 한도를 다 쓰고 있을 때 다시 확인하기까지 대기 시간(초)
+WARMUP_BACKOFF_SECONDS = 1.0
+WARMUP_CHECK_SECONDS = 300
+# 요청 횟수를 기록하는 최대 종목 수 (넘으면 적게 요청된 절반을 정리)
+REQUEST_TRACKING_LIMIT = 5000
+# 상태 조회에 남기는 실패 메시지 수
+MAX_REPORTED_ERRORS = 20
+
+_requests: Counter = Counter()
+# 시장별 마지막 실행 결과와, 이미 예열한 마감 시각
+_last_runs: Dict[str, Dict] = {}
+_warmed_close: Dict[str, datetime] = {}
+
+def record_request(ticker: str, market: str) -> None:
+    _requests[(market.upper(), ticker.upper())] += 1
+    if len(_requests) > REQUEST_TRACKING_LIMIT:
+        keep = _requests.most_common(REQUEST_TRACKING_LIMIT // 2)
+        _requests.clear()
+        _requests.update(dict(keep))
+
+def popular(market: str, limit: int = WARMUP_TOP_N) -> List[str]:
+    return [ticker for (m, ticker), _ in _requests.most_common() if m == market][:limit]
+
+def targets(market: str) -> List[str]:
+    watchlist = [ticker for m, ticker in WARMUP_WATCHLIST if m == market]
+    return list(dict.fromkeys(watchlist + popular(market)))
+
+def due(market: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """예열 시각이 지났고 아직 예열하지 않은 마감이 있으면 그 마감 시각"""
+    now = now or trading_calendar.now_in(market)
+    if trading_calendar.is_open(market, now):
+        return None
+    closed_at = trading_calendar.last_close(market, now)
+    if now < closed_at + timedelta(minutes=WARMUP_AFTER_CLOSE_MINUTES):
+        return None
+    if _warmed_close.get(market) == closed_at:
+        return None
+    return closed_at
+
+def next_run(market: str, now: Optional[datetime] = None) -> datetime:
+    now = now or trading_calendar.now_in(market)
+    offset = timedelta(minutes=WARMUP_AFTER_CLOSE_MINUTES)
+    closed_at = trading_calendar.last_close(market, now)
+    if not trading_calendar.is_open(market, now) and _warmed_close.get(market) != closed_at:
+        return max(closed_at + offset, now)
+    return trading_calendar.next_close(market, now) + offset
+
+async def warm(market: str, closed_at: Optional[datetime] = None) -> Dict:
+    """대상 종목의 분석 결과를 캐시에 미리 채움. 실시간 요청과 같은 캐시 키와 업스트림 한도를 공유"""
+    market = market.upper()
+    tickers = targets(market)
+    timeframes = [tf for tf in WARMUP_TIMEFRAMES if tf in stock_service.TIMEFRAMES.get(market, {})]
+    run = {
+        "market": market,
+        "state": "running",
+        "trigger_close": closed_at.isoformat() if closed_at else None,
+        "started_at": datetime.now().isoformat(),
+        "finished_at": None,
+        "duration_seconds": None,
+        "tickers": len(tickers),
+        "jobs": len(tickers) * len(timeframes),
+        "warmed": 0,
+        "cached": 0,
+        "failed": 0,
+        "errors": {},
+    }
+    _last_runs[market] = run
+    started = time.perf_counter()
+    slots = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    interval = 1 / WARMUP_RATE_PER_SECOND if WARMUP_RATE_PER_SECOND > 0 else 0
+
+    async def warm_one(ticker: str, timeframe: str) -> None:
+        try:
+            key = analysis_cache.analysis_key(ticker, market, timeframe)
+            if analysis_cache.peek(key) is not None:
+                run["cached"] += 1
+                return
+            await analysis_cache.get_or_compute(
+                key, market, timeframe, lambda: stock_service.analyze_stock(ticker, market, timeframe)
+            )
+            run["warmed"] += 1
+        except Exception as e:
+            run["failed"] += 1
+            if len(run["errors"]) < MAX_REPORTED_ERRORS:
+                run["errors"][f"{ticker}:{timeframe}"] = str(e)
+        finally:
+            slots.release()
+
+    tasks = []
+    try:
+        # 예열 태스크의 업스트림 호출은 백그라운드 몫으로 제한되고 실시간 요청에 슬롯을 양보함
+        with upstream.background():
+            for ticker in tickers:
+                for timeframe in timeframes:
+                    await slots.acquire()
+                    # 실시간 요청이 업스트림 동시 호출 한도를 다 쓰고 있으면 빌 때까지 양보
+                    while upstream.saturated():
+                        await asyncio.sleep(WARMUP_BACKOFF_SECONDS)
+                    tasks.append(asyncio.create_task(warm_one(ticker, timeframe)))
+                    if interval:
+                        await asyncio.sleep(interval)
+        await asyncio.gather(*tasks)
+        run["state"] = "finished"
+    except asyncio.CancelledError:
+        run["state"] = "cancelled"
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        run["finished_at"] = datetime.now().isoformat()
+        run["duration_seconds"] = round(time.perf_counter() - started, 3)
+
+    logger.info(
+        f"Warmed {market} analyses: {run['warmed']} computed, {run['cached']} already cached, "
+        f"{run['failed']} failed in {run['duration_seconds']}s"
+    )
+    return run
+
+async def run_periodically() -> None:
+    # 시장별로 마감 후 한 번씩 실행. 서버가 마감 후에 시작되면 첫 확인 때 바로 실행
+    if not WARMUP_ENABLED:
+        return
+    while True:
+        for market in MARKETS:
+            try:
+                closed_at = due(market)
+                if closed_at is not None:
+                    # 실패해도 같은 마감에 대해 반복 실행하지 않음
+                    _warmed_close[market] = closed_at
+                    await warm(market, closed_at)
+            except Exception as e:
+                logger.error(f"Failed to warm up {market} analyses: {str(e)}")
+        await asyncio.sleep(WARMUP_CHECK_SECONDS)
+
+def status() -> Dict:
+    return {
+        "enabled": WARMUP_ENABLED,
+        "watchlist": [f"{market}:{ticker}" for market, ticker in WARMUP_WATCHLIST],
+        "top_n": WARMUP_TOP_N,
+        "timeframes": WARMUP_TIMEFRAMES,
+        "tracked_tickers": len(_requests),
+        "markets": [
+            {
+                "market": market,
+                "next_run": next_run(market).isoformat() if WARMUP_ENABLED else None,
+                "popular": popular(market),
+                "last_run": _last_runs.get(market),
+            }
+            for market in MARKETS
+        ],
+    }
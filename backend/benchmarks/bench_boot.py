@@ -0,0 +1,105 @@
+"""워커 부팅 시간 측정: app.main import 시간, 요청 수신까지, /ready가 200이 될 때까지
+
+uvicorn 워커를 새 프로세스로 띄워 측정하므로 자동 확장 시 새 워커가 트래픽을 받기까지의 시간과 같다.
+스냅샷(검색 인덱스, 히스토리 저장소)이 있는 디렉터리에서 실행해야 웜 부팅을 측정한다.
+
+실행 (backend 디렉터리에서):
+    python -m benchmarks.bench_boot --target-ms 1500
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 새 워커가 준비(/ready 200)될 때까지의 목표 시간
+DEFAULT_TARGET_MS = 1500.0
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _status(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+def measure_import(env: Dict[str, str]) -> float:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+def measure_boot(env: Dict[str, str], timeout: float = 60.0) -> Dict[str, float]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {}
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            if "listen_ms" not in result and _status(f"{base}/") == 200:
+                result["listen_ms"] = (time.perf_counter() - started) * 1000
+            if "listen_ms" in result and _status(f"{base}/ready") == 200:
+                result["ready_ms"] = (time.perf_counter() - started) * 1000
+                return result
+            time.sleep(0.01)
+        raise TimeoutError(f"Worker was not ready within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def run(repeat: int = 5, target_ms: float = DEFAULT_TARGET_MS, env: Optional[Dict[str, str]] = None) -> Dict:
+    env = dict(env or os.environ)
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    # 측정 중 백그라운드 예열/업스트림 갱신이 끼어들지 않도록 함
+    env.setdefault("WARMUP_ENABLED", "0")
+
+    imports: List[float] = [measure_import(env) for _ in range(repeat)]
+    boots = [measure_boot(env) for _ in range(repeat)]
+    ready = float(np.median([b["ready_ms"] for b in boots]))
+    return {
+        "import_ms": float(np.median(imports)),
+        "listen_ms": float(np.median([b["listen_ms"] for b in boots])),
+        "ready_ms": ready,
+        "target_ready_ms": target_ms,
+        "target_met": ready <= target_ms,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    result = run(args.repeat, args.target_ms)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import {result['import_ms']:.0f}ms  listen {result['listen_ms']:.0f}ms  "
+              f"ready {result['ready_ms']:.0f}ms  (target {result['target_ready_ms']:.0f}ms: "
+              f"{'met' if result['target_met'] else 'MISSED'})")
+    sys.exit(0 if result["target_met"] else 1)
+
+if __name__ == "__main__":
+    main()
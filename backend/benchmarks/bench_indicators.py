@@ -0,0 +1,102 @@
+"""지표 계산 마이크로 벤치마크: 기존 pandas 구현 대비 통합 NumPy 엔진
+
+실행 (backend 디렉터리에서):
+    python -m benchmarks.bench_indicators
+"""
+import argparse
+import json
+import timeit
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.indicators import compute_indicators
+
+HISTORY_LENGTHS = [250, 750, 1250, 5000]
+
+def legacy_indicators(close_prices: np.ndarray) -> Dict:
+    """변경 전 _calculate_technical_indicators + _calculate_rsi_series 계산 경로"""
+    sma_50 = pd.Series(close_prices).rolling(window=50).mean().iloc[-1]
+    sma_200 = pd.Series(close_prices).rolling(window=200).mean().iloc[-1]
+
+    delta = pd.Series(close_prices).diff()
+    gains = delta.where(delta > 0, 0).rolling(window=14).mean()
+    losses = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gains / losses
+    rsi = 100 - (100 / (1 + rs.iloc[-1]))
+
+    exp1 = pd.Series(close_prices).ewm(span=12, adjust=False).mean()
+    exp2 = pd.Series(close_prices).ewm(span=26, adjust=False).mean()
+    macd_line = exp1 - exp2
+    signal_line = macd_line.ewm(span=9, adjust=False).mean()
+    macd_hist = macd_line - signal_line
+
+    middle_band = pd.Series(close_prices).rolling(window=20).mean()
+    std_dev = pd.Series(close_prices).rolling(window=20).std()
+    upper_band = middle_band + (std_dev * 2)
+    lower_band = middle_band - (std_dev * 2)
+
+    # RSI 시리즈는 별도로 한 번 더 계산됨
+    delta = pd.Series(close_prices).diff()
+    avg_gains = delta.where(delta > 0, 0).rolling(window=14).mean()
+    avg_losses = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rsi_series = 100 - (100 / (1 + avg_gains / avg_losses))
+
+    return {
+        "sma_50": sma_50,
+        "sma_200": sma_200,
+        "rsi": rsi,
+        "macd": macd_line.iloc[-1],
+        "signal": signal_line.iloc[-1],
+        "histogram": macd_hist.iloc[-1],
+        "upper": upper_band.tail(20).tolist(),
+        "lower": lower_band.tail(20).tolist(),
+        "rsi_series": [float(x) if not pd.isna(x) else 50.0 for x in rsi_series],
+    }
+
+def synthetic_close(length: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 50000 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+
+def _per_call_us(fn, repeat: int) -> float:
+    timings = timeit.repeat(fn, number=repeat, repeat=5)
+    return min(timings) / repeat * 1e6
+
+def run(lengths: List[int] = HISTORY_LENGTHS, repeat: int = 200) -> List[Dict]:
+    results = []
+    for length in lengths:
+        close = synthetic_close(length)
+        legacy = legacy_indicators(close)
+        fused = compute_indicators(close)
+        max_rel_error = max(
+            abs(float(getattr(fused, key)[-1]) - legacy[key]) / max(abs(legacy[key]), 1e-12)
+            for key in ("sma_50", "rsi", "macd", "signal")
+            if not pd.isna(legacy[key])
+        )
+        results.append({
+            "length": length,
+            "legacy_us": _per_call_us(lambda: legacy_indicators(close), repeat),
+            "fused_float64_us": _per_call_us(lambda: compute_indicators(close), repeat),
+            "fused_float32_us": _per_call_us(lambda: compute_indicators(close, np.float32), repeat),
+            "max_rel_error": max_rel_error,
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    results = run(repeat=args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'bars':>6} {'legacy(us)':>12} {'fused64(us)':>12} {'fused32(us)':>12} {'speedup':>8}")
+    for r in results:
+        print(f"{r['length']:>6} {r['legacy_us']:>12.1f} {r['fused_float64_us']:>12.1f} "
+              f"{r['fused_float32_us']:>12.1f} {r['legacy_us'] / r['fused_float64_us']:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
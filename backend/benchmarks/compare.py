@@ -0,0 +1,59 @@
+"""두 벤치마크 결과(JSON)의 시간 지표를 비교
+
+실행 (backend 디렉터리에서):
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+from typing import Dict
+
+# 값이 작을수록 좋은 지표의 접미사
+TIME_SUFFIXES = ("_ms", "_us")
+
+def _flatten(value, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    if isinstance(value, dict):
+        # 길이별 결과 목록은 length를 키에 포함
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            label = item.get("length", i) if isinstance(item, dict) else i
+            flat.update(_flatten(item, f"{prefix}[{label}]"))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        flat[prefix] = float(value)
+    return flat
+
+def compare(before: Dict, after: Dict, threshold: float) -> int:
+    old, new = _flatten(before), _flatten(after)
+    regressions = 0
+    print(f"{before['meta']['commit']} -> {after['meta']['commit']}")
+    for key in sorted(old.keys() & new.keys()):
+        if key.startswith("meta.") or not key.endswith(TIME_SUFFIXES) or old[key] <= 0:
+            continue
+        ratio = new[key] / old[key]
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  <-- slower"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            marker = "  faster"
+        print(f"  {key:<55} {old[key]:>11.3f} {new[key]:>11.3f} {ratio:>7.2f}x{marker}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.1, help="변화로 표시할 상대 비율")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+    regressions = compare(before, after, args.threshold)
+    raise SystemExit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
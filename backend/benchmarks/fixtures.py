@@ -0,0 +1,83 @@
+"""벤치마크용 OHLCV 픽스처
+
+benchmarks/fixtures/{market}/{ticker}_{interval}.csv 에 기록된 데이터를 사용하고
+(record_fixtures.py로 생성), 파일이 없으면 결정적인 합성 시계열을 대신 만든다.
+"""
+import os
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+KR_TICKERS = ["005930", "000660", "035420", "035720", "051910", "005380", "068270", "207940"]
+US_TICKERS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOG", "META", "TSLA", "JPM"]
+KR_NAMES = {
+    "005930": "삼성전자", "000660": "SK하이닉스", "035420": "NAVER", "035720": "카카오",
+    "051910": "LG화학", "005380": "현대차", "068270": "셀트리온", "207940": "삼성바이오로직스",
+}
+
+KR_COLUMNS = ["시가", "고가", "저가", "종가", "거래량"]
+US_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+US_TIMEZONE = "America/New_York"
+
+# 합성 픽스처 기간
+SYNTHETIC_DAILY_YEARS = 20
+SYNTHETIC_INTRADAY_DAYS = {"1m": 8, "5m": 60, "15m": 60, "30m": 60, "60m": 365}
+
+def fixture_path(market: str, ticker: str, interval: str) -> str:
+    return os.path.join(FIXTURE_DIR, market.upper(), f"{ticker.upper()}_{interval}.csv")
+
+def _synthetic_index(market: str, interval: str, end: pd.Timestamp) -> pd.DatetimeIndex:
+    if interval == "1d":
+        days = pd.bdate_range(end=end.normalize(), periods=SYNTHETIC_DAILY_YEARS * 252)
+        return days if market == "KR" else days.tz_localize(US_TIMEZONE)
+    step = int(interval[:-1])
+    days = pd.bdate_range(end=end.normalize(), periods=SYNTHETIC_INTRADAY_DAYS[interval])
+    bars = [
+        pd.date_range(day + pd.Timedelta("9h30min"), day + pd.Timedelta("15h59min"), freq=f"{step}min")
+        for day in days
+    ]
+    return pd.DatetimeIndex(np.concatenate([b.values for b in bars])).tz_localize(US_TIMEZONE)
+
+def synthesize(market: str, ticker: str, interval: str, end: pd.Timestamp = None) -> pd.DataFrame:
+    """종목 코드로 시드를 정한 기하 랜덤워크 OHLCV"""
+    end = end or pd.Timestamp.now()
+    index = _synthetic_index(market, interval, end)
+    rng = np.random.default_rng(zlib.crc32(f"{market}/{ticker}/{interval}".encode()))
+    n = len(index)
+    volatility = 0.02 if interval == "1d" else 0.002
+    start_price = rng.uniform(10_000, 300_000) if market == "KR" else rng.uniform(20, 800)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.r_[close[0], close[:-1]] * np.exp(rng.normal(0, volatility / 4, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 2, n)))
+    volume = rng.integers(10_000, 5_000_000, n)
+    if market == "KR":
+        values = [open_.round(), high.round(), low.round(), close.round(), volume]
+        frame = pd.DataFrame(dict(zip(KR_COLUMNS, values)), index=index)
+        frame.index.name = "날짜"
+    else:
+        frame = pd.DataFrame(dict(zip(US_COLUMNS, [open_, high, low, close, volume])), index=index)
+        frame.index.name = "Date" if interval == "1d" else "Datetime"
+    return frame
+
+@lru_cache(maxsize=None)
+def load_fixture(market: str, ticker: str, interval: str) -> pd.DataFrame:
+    path = fixture_path(market, ticker, interval)
+    if not os.path.exists(path):
+        return synthesize(market, ticker, interval)
+    frame = pd.read_csv(path, index_col=0)
+    index = pd.to_datetime(frame.index, utc=market.upper() == "US")
+    if market.upper() == "US":
+        index = index.tz_convert(US_TIMEZONE)
+    frame.index = index
+    return frame
+
+def save_fixture(market: str, ticker: str, interval: str, frame: pd.DataFrame) -> str:
+    path = fixture_path(market, ticker, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    frame.to_csv(path)
+    return path
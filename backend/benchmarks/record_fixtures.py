@@ -0,0 +1,47 @@
+"""실제 pykrx / yfinance 응답을 벤치마크 픽스처로 기록 (네트워크 필요, 1회성)
+
+실행 (backend 디렉터리에서):
+    python -m benchmarks.record_fixtures
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from .fixtures import KR_TICKERS, US_TICKERS, save_fixture
+
+# yfinance 간격별 최대 조회 기간(일)
+US_INTERVAL_DAYS = {"1d": 365 * 20, "60m": 729, "30m": 59, "15m": 59, "5m": 59, "1m": 7}
+
+def record_kr(tickers, years: int) -> None:
+    from pykrx import stock
+
+    end = datetime.now()
+    start = end - timedelta(days=365 * years)
+    for ticker in tickers:
+        df = stock.get_market_ohlcv_by_date(start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), ticker)
+        print(f"KR {ticker} 1d: {len(df)} rows -> {save_fixture('KR', ticker, '1d', df)}")
+
+def record_us(tickers, intervals) -> None:
+    import yfinance as yf
+
+    end = datetime.now() + timedelta(days=1)
+    for ticker in tickers:
+        for interval in intervals:
+            start = end - timedelta(days=US_INTERVAL_DAYS[interval])
+            df = yf.Ticker(ticker).history(
+                start=start.strftime("%Y-%m-%d"), end=end.strftime("%Y-%m-%d"), interval=interval
+            )
+            df = df[["Open", "High", "Low", "Close", "Volume"]]
+            print(f"US {ticker} {interval}: {len(df)} rows -> {save_fixture('US', ticker, interval, df)}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kr", nargs="*", default=KR_TICKERS)
+    parser.add_argument("--us", nargs="*", default=US_TICKERS)
+    parser.add_argument("--intervals", nargs="*", default=list(US_INTERVAL_DAYS))
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args()
+    record_kr(args.kr, args.years)
+    record_us(args.us, args.intervals)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""pykrx / yfinance 대체 프로바이더: 픽스처를 재생하고 업스트림 지연을 흉내냄
+
+install()은 제공자 계층과 서비스 모듈이 참조하는 stock / yf 객체를 교체하므로
+네트워크 없이 같은 코드 경로(저장소, 동시성 제한, 병합, 캐시)를 그대로 측정할 수 있다.
+"""
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .fixtures import KR_NAMES, KR_TICKERS, US_TICKERS, load_fixture
+
+# 검색 인덱스 크기를 실제 상장 종목 수(약 2,700개)와 비슷하게 맞추기 위한 합성 종목
+SYNTHETIC_LISTINGS = {"KOSPI": 950, "KOSDAQ": 1750}
+_SYLLABLES = "가나다라마바사아자차카타파하한국대동삼성전기화학제약바이오에너지테크솔루션"
+
+class ReplayStats:
+    def __init__(self):
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+stats = ReplayStats()
+
+def _simulate_latency(latency_ms: float) -> None:
+    if latency_ms > 0:
+        time.sleep(latency_ms / 1000)
+
+def _synthetic_name(ticker: str) -> str:
+    seed = zlib.crc32(ticker.encode())
+    length = 2 + seed % 4
+    return "".join(_SYLLABLES[(seed >> (3 * i)) % len(_SYLLABLES)] for i in range(length))
+
+def _listings() -> Dict[str, List[str]]:
+    kospi = list(KR_TICKERS)
+    listings = {"KOSPI": kospi, "KOSDAQ": []}
+    for exchange, count in SYNTHETIC_LISTINGS.items():
+        base = 100000 if exchange == "KOSPI" else 200000
+        listings[exchange] += [f"{base + i * 7:06d}" for i in range(count)]
+    return listings
+
+class ReplayKrx:
+    """pykrx.stock 중 서비스에서 사용하는 함수만 구현"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.listings = _listings()
+
+    def get_market_ohlcv_by_date(self, fromdate: str, todate: str, ticker: str) -> pd.DataFrame:
+        stats.record("pykrx.get_market_ohlcv_by_date")
+        _simulate_latency(self.latency_ms)
+        frame = load_fixture("KR", ticker, "1d")
+        return frame.loc[pd.Timestamp(fromdate):pd.Timestamp(todate)].copy()
+
+    def get_market_ticker_list(self, date: Optional[str] = None, market: str = "KOSPI") -> List[str]:
+        stats.record("pykrx.get_market_ticker_list")
+        _simulate_latency(self.latency_ms)
+        return list(self.listings.get(market, []))
+
+    def get_market_ticker_name(self, ticker: str) -> str:
+        return KR_NAMES.get(ticker) or _synthetic_name(ticker)
+
+    def get_market_ohlcv_by_ticker(self, date: str, market: str = "KOSPI") -> pd.DataFrame:
+        stats.record("pykrx.get_market_ohlcv_by_ticker")
+        _simulate_latency(self.latency_ms)
+        day = pd.Timestamp(date)
+        rows = {}
+        # 시세 픽스처가 있는 대표 종목만 포함 (합성 종목은 검색 인덱스 용도)
+        for ticker in (t for t in KR_TICKERS if t in self.listings.get(market, [])):
+            frame = load_fixture("KR", ticker, "1d")
+            if day in frame.index:
+                rows[ticker] = frame.loc[day]
+        frame = pd.DataFrame.from_dict(rows, orient="index")
+        frame.index.name = "티커"
+        return frame
+
+class _ReplayTicker:
+    def __init__(self, symbol: str, latency_ms: float):
+        self.symbol = symbol.upper()
+        self.latency_ms = latency_ms
+
+    def history(self, start=None, end=None, interval: str = "1d", period: Optional[str] = None,
+                **kwargs) -> pd.DataFrame:
+        stats.record(f"yfinance.history[{interval}]")
+        _simulate_latency(self.latency_ms)
+        frame = load_fixture("US", self.symbol, interval)
+        tz = frame.index.tz
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start).tz_localize(tz)]
+        if end is not None:
+            frame = frame[frame.index < pd.Timestamp(end).tz_localize(tz)]
+        return frame.copy()
+
+    @property
+    def info(self) -> Dict:
+        stats.record("yfinance.info")
+        _simulate_latency(self.latency_ms)
+        if self.symbol not in US_TICKERS:
+            return {}
+        return {"symbol": self.symbol, "longName": f"{self.symbol} Inc."}
+
+class ReplayYf:
+    """yfinance 모듈 중 Ticker만 구현"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+
+    def Ticker(self, symbol: str, session=None) -> _ReplayTicker:
+        return _ReplayTicker(symbol, self.latency_ms)
+
+def install(latency_ms: float = 0.0) -> None:
+    """서비스 모듈의 업스트림 클라이언트를 재생 프로바이더로 교체"""
+    from app.services import market_service, providers, screener, ticker_index
+
+    krx = ReplayKrx(latency_ms)
+    yf = ReplayYf(latency_ms)
+    # 시세는 제공자 계층(회로 차단기, 대체 제공자 포함)을 거쳐 재생 객체로 전달됨
+    providers.stock = krx
+    providers.yf = yf
+    screener.stock = krx
+    ticker_index.kr_stock = krx
+    market_service.yf = yf
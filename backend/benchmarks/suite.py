@@ -0,0 +1,252 @@
+"""오프라인 벤치마크 스위트: 기록된(또는 합성) 픽스처로 API 전 구간을 측정
+
+네트워크 없이 재생 프로바이더(replay.py)로 업스트림을 대체하고, 임시 디렉터리의
+히스토리 저장소/검색 인덱스를 사용한다. 결과는 커밋 간 비교를 위해 JSON으로 저장할 수 있다.
+
+실행 (backend 디렉터리에서, httpx 필요):
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+
+from . import bench_boot, bench_indicators, replay
+from .fixtures import KR_TICKERS, US_TICKERS, synthesize
+
+ANALYZE_CASES = (
+    [(ticker, "daily") for ticker in KR_TICKERS]
+    + [(ticker, "weekly") for ticker in KR_TICKERS[:4]]
+    + [(ticker, timeframe) for ticker in US_TICKERS for timeframe in ("daily", "monthly", "5m", "60m")]
+)
+SEARCH_QUERIES = ["삼성", "삼성전자", "ㅅㅅ", "005930", "0059", "카카", "NAVER", "하이닉스", "바이오", "ㅎㄷ"]
+SERIALIZATION_LENGTHS = [250, 1250, 5000]
+MAX_CHART_POINTS = 500
+
+def _prepare_environment(workdir: str) -> None:
+    # 서비스 모듈이 import 시점에 경로를 읽으므로 app import 전에 설정
+    os.environ["STOCK_HISTORY_DIR"] = os.path.join(workdir, "history")
+    os.environ["TICKER_INDEX_PATH"] = os.path.join(workdir, "ticker_index.json")
+    os.environ["MARKET_PANEL_DIR"] = os.path.join(workdir, "market_panel")
+    # 측정 중 백그라운드 예열이 캐시를 채우지 않도록 끔
+    os.environ["WARMUP_ENABLED"] = "0"
+
+def _summary(latencies_ms: List[float], elapsed: float) -> Dict:
+    values = np.asarray(latencies_ms)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "requests": len(values),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+        "throughput_rps": len(values) / elapsed if elapsed > 0 else None,
+    }
+
+async def _run_load(calls: List[Callable[[], Awaitable]], concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(call):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.request.url} -> {response.status_code}: {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(call) for call in calls))
+    return _summary(latencies, time.perf_counter() - started)
+
+def _analyze_call(client, ticker: str, timeframe: str, max_points=None):
+    params = {"timeframe": timeframe}
+    if max_points:
+        params["max_points"] = max_points
+    market = "KR" if ticker.isdigit() else "US"
+    return lambda: client.post("/api/analysis/analyze", params=params, json={"ticker": ticker, "market": market})
+
+async def bench_analyze(client, concurrency: int, rounds: int) -> Dict:
+    from app.services import analysis_cache
+
+    calls = [_analyze_call(client, t, tf) for t, tf in ANALYZE_CASES]
+    results = {}
+    # 빈 저장소: 업스트림 조회 + 저장 + 지표 계산
+    replay.stats.reset()
+    results["cold"] = await _run_load(calls, concurrency)
+    results["cold"]["upstream_calls"] = dict(replay.stats.calls)
+
+    # 저장소는 최신, 분석 캐시 없음: 저장소 읽기 + 지표 계산
+    replay.stats.reset()
+    runs = []
+    for _ in range(rounds):
+        analysis_cache._cache.clear()
+        runs.append(await _run_load(calls, concurrency))
+    results["store_warm"] = min(runs, key=lambda r: r["p50_ms"])
+    results["store_warm"]["upstream_calls"] = dict(replay.stats.calls)
+
+    # 분석 캐시 적중: 직렬화 비용만 남음
+    results["cached"] = await _run_load(calls * rounds, concurrency)
+    results["cached_downsampled"] = await _run_load(
+        [_analyze_call(client, t, tf, MAX_CHART_POINTS) for t, tf in ANALYZE_CASES] * rounds, concurrency
+    )
+    return results
+
+async def bench_search(client, concurrency: int, rounds: int) -> Dict:
+    started = time.perf_counter()
+    response = await client.get("/api/market/search", params={"query": "삼성", "market": "KR"})
+    response.raise_for_status()
+    index_build_ms = (time.perf_counter() - started) * 1000
+
+    calls = [
+        (lambda q=q: client.get("/api/market/search", params={"query": q, "market": "KR"}))
+        for q in SEARCH_QUERIES
+    ] * rounds
+    result = await _run_load(calls, concurrency)
+    result["index_build_ms"] = index_build_ms
+    return result
+
+def _per_call_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best * 1000
+
+def bench_serialization(repeat: int) -> List[Dict]:
+    from fastapi.encoders import jsonable_encoder
+    from app.services import chart_codec, stock_service
+    from app.services.indicators import compute_indicators
+
+    results = []
+    frame = synthesize("KR", KR_TICKERS[0], "1d")
+    for length in SERIALIZATION_LENGTHS:
+        data = frame.tail(length)
+        analysis = stock_service._build_analysis(
+            KR_TICKERS[0], "KR", "daily", data, compute_indicators(stock_service._close_prices(data))
+        )
+        # FastAPI 기본 응답 경로와 동일: jsonable_encoder 후 json.dumps
+        to_json = lambda a=analysis: json.dumps(jsonable_encoder(a)).encode()
+        result = {
+            "length": length,
+            "json_ms": _per_call_ms(to_json, repeat),
+            "json_bytes": len(to_json()),
+            "downsample_json_ms": _per_call_ms(
+                lambda: json.dumps(jsonable_encoder(chart_codec.downsample_analysis(analysis, MAX_CHART_POINTS))),
+                repeat
+            ),
+        }
+        if chart_codec.msgpack is not None:
+            result["msgpack_ms"] = _per_call_ms(lambda: chart_codec.encode_msgpack(analysis), repeat)
+            result["msgpack_bytes"] = len(chart_codec.encode_msgpack(analysis))
+        results.append(result)
+    return results
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+async def _bench_api(args) -> Dict:
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        return {
+            "analyze": await bench_analyze(client, args.concurrency, args.rounds),
+            "search": await bench_search(client, args.concurrency, args.rounds * 10),
+        }
+
+def run(args) -> Dict:
+    import pandas as pd
+
+    replay.install(args.latency_ms)
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "latency_ms": args.latency_ms,
+            "concurrency": args.concurrency,
+            "rounds": args.rounds,
+        },
+        "indicators": bench_indicators.run(repeat=args.repeat),
+        "serialization": bench_serialization(max(args.repeat // 10, 5)),
+    }
+    results.update(asyncio.run(_bench_api(args)))
+    # API 측정에서 만든 스냅샷(검색 인덱스, 히스토리)이 있는 상태로 새 워커 부팅 시간을 잰다
+    results["boot"] = bench_boot.run(repeat=max(args.rounds, 3), target_ms=args.boot_target_ms)
+    return results
+
+def _print_report(results: Dict) -> None:
+    print(f"commit {results['meta']['commit']}  upstream latency {results['meta']['latency_ms']}ms  "
+          f"concurrency {results['meta']['concurrency']}")
+    print("\n[indicators]")
+    for r in results["indicators"]:
+        print(f"  {r['length']:>6} bars  legacy {r['legacy_us']:>9.1f}us  fused {r['fused_float64_us']:>8.1f}us")
+    print("\n[serialization]")
+    for r in results["serialization"]:
+        line = f"  {r['length']:>6} bars  json {r['json_ms']:>7.2f}ms ({r['json_bytes']}B)"
+        if "msgpack_ms" in r:
+            line += f"  msgpack {r['msgpack_ms']:>7.2f}ms ({r['msgpack_bytes']}B)"
+        print(line + f"  downsampled json {r['downsample_json_ms']:>7.2f}ms")
+    print("\n[/api/analysis/analyze]")
+    for name, r in results["analyze"].items():
+        print(f"  {name:<20} p50 {r['p50_ms']:>8.2f}ms  p90 {r['p90_ms']:>8.2f}ms  "
+              f"p99 {r['p99_ms']:>8.2f}ms  {r['throughput_rps']:>8.1f} req/s")
+    r = results["search"]
+    print("\n[/api/market/search]")
+    print(f"  index build {r['index_build_ms']:.1f}ms  p50 {r['p50_ms']:.2f}ms  p99 {r['p99_ms']:.2f}ms")
+    r = results["boot"]
+    print("\n[boot]")
+    print(f"  import {r['import_ms']:.0f}ms  listen {r['listen_ms']:.0f}ms  ready {r['ready_ms']:.0f}ms  "
+          f"(target {r['target_ready_ms']:.0f}ms: {'met' if r['target_met'] else 'MISSED'})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="업스트림 호출당 흉내낼 지연")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--boot-target-ms", type=float, default=bench_boot.DEFAULT_TARGET_MS,
+                        help="새 워커가 /ready 200을 반환할 때까지의 목표 시간")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="stock-bench-") as workdir:
+        _prepare_environment(workdir)
+        results = run(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        _print_report(results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 저장소 경로는 서비스 모듈 import 시점에 읽으므로 먼저 임시 디렉터리로 지정
+_data_dir = tempfile.mkdtemp(prefix="stock-tests-")
+os.environ.setdefault("STOCK_HISTORY_DIR", os.path.join(_data_dir, "history"))
+os.environ.setdefault("TICKER_INDEX_PATH", os.path.join(_data_dir, "ticker_index.json"))
+os.environ.setdefault("MARKET_PANEL_DIR", os.path.join(_data_dir, "market_panel"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import upstream  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def fresh_upstream():
+    # asyncio.Semaphore는 처음 사용한 이벤트 루프에 묶이므로 테스트(asyncio.run)마다 새로 만듦
+    upstream._semaphores.clear()
+    upstream._background_semaphores.clear()
+    upstream._inflight.clear()
+    upstream._inflight_priority.clear()
+    upstream._live_calls.clear()
+    upstream._live_waiting.clear()
+    yield
@@ -0,0 +1,34 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import process_pool, stock_service
+
+def _daily(n: int) -> pd.DataFrame:
+    close = np.cumsum(np.random.default_rng(n).normal(size=n)) + 100
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(n, 1000)}, index=pd.bdate_range("2000-01-03", periods=n))
+
+@pytest.fixture
+def offloaded(monkeypatch):
+    calls = []
+
+    async def run(fn, *args, **kwargs):
+        calls.append(len(args[0]))
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(process_pool, "run", run)
+    monkeypatch.setattr(stock_service, "INDICATOR_OFFLOAD_MIN_BARS", 1000)
+    return calls
+
+@pytest.mark.parametrize("bars, expected", [(500, []), (1500, [1500])])
+def test_offload_only_above_threshold(monkeypatch, offloaded, bars, expected):
+    async def get_stock_data(ticker, market, timeframe, lookback_days=None):
+        return _daily(bars)
+
+    monkeypatch.setattr(stock_service, "_get_stock_data", get_stock_data)
+    analysis = asyncio.run(stock_service.analyze_stock("AAPL", "US", offload=True))
+    assert offloaded == expected
+    assert analysis.current_price == pytest.approx(_daily(bars)["Close"].iloc[-1])
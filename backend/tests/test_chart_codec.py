@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from app.services import chart_codec
+
+def _reference_lttb(values: np.ndarray, threshold: int) -> np.ndarray:
+    # 버킷마다 NumPy로 계산하는 교과서식 구현
+    n = len(values)
+    x = np.arange(n, dtype=np.float64)
+    edges = np.floor(np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = [0]
+    anchor = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), values[end:next_end].mean()
+        area = np.abs((x[anchor] - avg_x) * (values[start:end] - values[anchor])
+                      - (x[anchor] - x[start:end]) * (avg_y - values[anchor]))
+        anchor = start + int(np.argmax(area))
+        selected.append(anchor)
+    selected.append(n - 1)
+    return np.array(selected)
+
+@pytest.mark.parametrize("n, threshold", [(1250, 500), (10000, 500), (1250, 100), (50, 7), (5, 3), (501, 500)])
+def test_lttb_matches_reference(n, threshold):
+    values = np.cumsum(np.random.default_rng(n + threshold).normal(size=n)) + 100
+    keep = chart_codec.lttb_indices(values, threshold)
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+    np.testing.assert_array_equal(keep, _reference_lttb(values, threshold))
+
+def test_lttb_keeps_everything_below_threshold():
+    np.testing.assert_array_equal(chart_codec.lttb_indices(np.arange(10.0), 20), np.arange(10))
+
+def test_lttb_keeps_spikes():
+    values = np.zeros(1000)
+    values[[137, 612]] = [50.0, -40.0]
+    keep = chart_codec.lttb_indices(values, 50)
+    assert {137, 612} <= set(keep.tolist())
@@ -0,0 +1,71 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.services import history_store, stock_service
+
+DAYS = pd.bdate_range("2025-01-02", "2026-09-30")
+
+def _upstream(start: datetime, end: date) -> pd.DataFrame:
+    days = DAYS[(DAYS >= pd.Timestamp(start).normalize()) & (DAYS <= pd.Timestamp(end))]
+    # 같은 날짜는 어느 구간으로 받아도 같은 값
+    close = (days.year.to_numpy() - 2000) * 1000.0 + days.dayofyear.to_numpy()
+    frame = pd.DataFrame({"시가": close, "고가": close + 1, "저가": close - 1, "종가": close,
+                          "거래량": np.full(len(days), 100)}, index=days)
+    frame.index.name = "날짜"
+    return frame
+
+class RecordingFetch:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, start: datetime, end):
+        self.calls.append((start, end))
+        if self.fail:
+            raise ValueError("upstream down")
+        return _upstream(start, end or DAYS[-1].date())
+
+def _load(ticker: str, start: datetime, fetch: RecordingFetch, refresh_seconds: float = 3600) -> pd.DataFrame:
+    return asyncio.run(stock_service._load_history("KR", ticker, "1d", start, fetch, refresh_seconds=refresh_seconds))
+
+def test_paging_backwards_fetches_only_the_missing_head():
+    fetch = RecordingFetch()
+    recent = _load("900001", datetime(2026, 6, 1), fetch)
+    assert fetch.calls == [(datetime(2026, 6, 1), None)]
+    assert recent.index[0] == pd.Timestamp("2026-06-01")
+
+    fetch.calls.clear()
+    older = _load("900001", datetime(2026, 1, 5), fetch)
+    # 저장된 구간(6월 이후)은 다시 받지 않고, 아직 최신이므로 마지막 봉 이후도 받지 않음
+    assert fetch.calls == [(datetime(2026, 1, 5), date(2026, 6, 1))]
+    assert older.index[0] == pd.Timestamp("2026-01-05")
+    assert older.index[-1] == DAYS[-1]
+    assert older.index.is_unique and older.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(older, _upstream(datetime(2026, 1, 5), DAYS[-1].date()), check_freq=False)
+
+    stored = history_store.load("KR", "900001", "1d")
+    assert stored.coverage_start == datetime(2026, 1, 5)
+
+    fetch.calls.clear()
+    _load("900001", datetime(2026, 3, 2), fetch)
+    assert fetch.calls == []
+
+def test_stale_store_refreshes_only_the_tail():
+    fetch = RecordingFetch()
+    _load("900002", datetime(2026, 6, 1), fetch)
+    fetch.calls.clear()
+    _load("900002", datetime(2026, 1, 5), fetch, refresh_seconds=0)
+    last_bar = DAYS[-1].to_pydatetime()
+    assert sorted(fetch.calls, key=str) == sorted([(datetime(2026, 1, 5), date(2026, 6, 1)), (last_bar, None)], key=str)
+
+def test_failed_tail_refresh_serves_stored_bars_without_saving():
+    _load("900003", datetime(2026, 6, 1), RecordingFetch())
+    before = history_store.load("KR", "900003", "1d").updated_at
+    time.sleep(0.01)
+    frame = _load("900003", datetime(2026, 6, 1), RecordingFetch(fail=True), refresh_seconds=0)
+    assert frame.index[0] == pd.Timestamp("2026-06-01")
+    assert history_store.load("KR", "900003", "1d").updated_at == before
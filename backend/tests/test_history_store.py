@@ -0,0 +1,95 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import history_store
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, "HISTORY_DIR", str(tmp_path))
+    history_store._handles.clear()
+    yield tmp_path
+    history_store._handles.clear()
+
+def _kr_daily(start: str, periods: int) -> pd.DataFrame:
+    days = pd.bdate_range(start, periods=periods)
+    close = np.arange(periods, dtype=np.float64) + 100.5
+    frame = pd.DataFrame({"시가": close, "고가": close + 1, "저가": close - 1, "종가": close,
+                          "거래량": np.arange(periods, dtype=np.int64) * 10}, index=days)
+    frame.index.name = "날짜"
+    return frame
+
+def _us_intraday(periods: int) -> pd.DataFrame:
+    index = pd.date_range("2024-03-08 09:30", periods=periods, freq="30min", tz="America/New_York")
+    close = np.linspace(10, 20, periods)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": np.full(periods, 5, dtype=np.int64)}, index=index)
+
+def _key_dir(store, market, interval, ticker):
+    return store / market / interval / ticker
+
+def test_round_trip_keeps_values_dtypes_and_index(store):
+    frame = _kr_daily("2024-01-02", 30)
+    history_store.save("KR", "005930", "1d", frame, datetime(2024, 1, 1))
+    history_store._handles.clear()
+
+    stored = history_store.load("kr", "005930", "1d")
+    pd.testing.assert_frame_equal(stored.frame, frame, check_freq=False)
+    assert stored.coverage_start == datetime(2024, 1, 1)
+    assert stored.frame["거래량"].dtype == np.int64
+
+def test_round_trip_keeps_timezone(store):
+    frame = _us_intraday(40)
+    history_store.save("US", "aapl", "30m", frame, datetime(2024, 3, 8))
+    history_store._handles.clear()
+
+    stored = history_store.load("US", "AAPL", "30m")
+    assert str(stored.frame.index.tz) == "America/New_York"
+    pd.testing.assert_frame_equal(stored.frame, frame, check_freq=False)
+
+def test_missing_or_corrupt_history_loads_as_none(store):
+    assert history_store.load("KR", "000000", "1d") is None
+    history_store.save("KR", "000001", "1d", _kr_daily("2024-01-02", 5), datetime(2024, 1, 1))
+    meta = _key_dir(store, "KR", "1d", "000001") / "meta.json"
+    meta.write_text("{not json", encoding="utf-8")
+    history_store._handles.clear()
+    assert history_store.load("KR", "000001", "1d") is None
+
+def test_save_rotates_bars_files_and_readers_see_new_version(store):
+    first = _kr_daily("2024-01-02", 10)
+    history_store.save("KR", "005930", "1d", first, datetime(2024, 1, 1))
+    before = history_store.load("KR", "005930", "1d")
+
+    second = history_store.merge(first, _kr_daily("2024-01-15", 10))
+    history_store.save("KR", "005930", "1d", second, datetime(2024, 1, 1))
+
+    # 이전 bars 파일은 지워지고 새 파일 하나만 남음
+    bars = [name for name in os.listdir(_key_dir(store, "KR", "1d", "005930")) if name.endswith(".npy")]
+    assert len(bars) == 1
+    # 이미 memory-map으로 연 이전 버전은 계속 읽을 수 있음
+    pd.testing.assert_frame_equal(before.frame, first, check_freq=False)
+    # meta.json 교체를 감지해 새 버전을 읽음
+    after = history_store.load("KR", "005930", "1d")
+    assert after is not before
+    assert len(after.frame) == len(second)
+    assert after.updated_at >= before.updated_at
+
+def test_unchanged_history_reuses_cached_handle(store):
+    history_store.save("KR", "005930", "1d", _kr_daily("2024-01-02", 10), datetime(2024, 1, 1))
+    assert history_store.load("KR", "005930", "1d") is history_store.load("KR", "005930", "1d")
+
+def test_handle_cache_evicts_least_recently_used(store, monkeypatch):
+    monkeypatch.setattr(history_store, "HANDLE_CACHE_SIZE", 2)
+    for ticker in ("000001", "000002", "000003"):
+        history_store.save("KR", ticker, "1d", _kr_daily("2024-01-02", 5), datetime(2024, 1, 1))
+    first = history_store.load("KR", "000001", "1d")
+    history_store.load("KR", "000002", "1d")
+    history_store.load("KR", "000001", "1d")
+    history_store.load("KR", "000003", "1d")
+
+    cached = [os.path.basename(key) for key in history_store._handles]
+    assert cached == ["000001", "000003"]
+    assert history_store.load("KR", "000001", "1d") is first
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from app.services import providers, upstream
+
+class SlowProvider(providers.Provider):
+    name = "slow"
+    markets = ("US",)
+    intervals = ("1d",)
+
+    def __init__(self, latency: float, timeout: float):
+        super().__init__()
+        self.latency = latency
+        self.timeout = timeout
+
+    def fetch(self, market, ticker, interval, start, end):
+        time.sleep(self.latency)
+        return pd.DataFrame({"Close": [1.0]}, index=pd.DatetimeIndex([pd.Timestamp(start)]))
+
+@pytest.fixture
+def slow_provider(monkeypatch):
+    def install(latency: float, timeout: float, concurrency: int) -> SlowProvider:
+        provider = SlowProvider(latency, timeout)
+        monkeypatch.setitem(providers._registry, provider.name, provider)
+        monkeypatch.setitem(providers.PROVIDER_ORDER, "US", [provider.name])
+        monkeypatch.setitem(upstream.PROVIDER_CONCURRENCY, provider.name, concurrency)
+        return provider
+    return install
+
+def _fetch(ticker: str):
+    return providers.fetch_history("US", ticker, "1d", datetime(2024, 1, 2), date(2024, 1, 31))
+
+def test_queue_wait_does_not_count_toward_timeout(slow_provider):
+    # 슬롯 2개에 10건: 마지막 요청은 timeout보다 오래 기다리지만 호출 자체는 제한 시간 안에 끝남
+    provider = slow_provider(latency=0.1, timeout=0.3, concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*[_fetch(f"T{i}") for i in range(10)])
+
+    results = asyncio.run(main())
+    assert all(not df.empty for df in results)
+    assert provider.breaker.state == "closed"
+    assert provider.breaker.failures == 0
+
+def test_slow_call_times_out_and_counts_as_failure(slow_provider):
+    provider = slow_provider(latency=0.3, timeout=0.05, concurrency=2)
+
+    with pytest.raises(providers.ProviderUnavailable, match="timed out"):
+        asyncio.run(_fetch("T0"))
+    assert provider.breaker.failures == 1
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(providers.time, "monotonic", lambda: now[0])
+    return now
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = providers.CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    # 대기 시간이 지나면 시험 호출은 한 번만 허용
+    clock[0] += 30
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+def test_failed_probe_reopens_breaker(clock):
+    breaker = providers.CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+
+def test_cancelled_probe_lets_another_probe_through(clock):
+    breaker = providers.CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+class FlakyProvider(SlowProvider):
+    name = "flaky"
+
+    def __init__(self):
+        super().__init__(latency=0, timeout=1)
+        self.healthy = False
+        self.calls = 0
+
+    def fetch(self, market, ticker, interval, start, end):
+        self.calls += 1
+        if not self.healthy:
+            raise ConnectionError("upstream down")
+        return super().fetch(market, ticker, interval, start, end)
+
+def test_open_breaker_skips_provider_until_probe_succeeds(monkeypatch, clock):
+    provider = FlakyProvider()
+    provider.breaker = providers.CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    monkeypatch.setitem(providers._registry, provider.name, provider)
+    monkeypatch.setitem(providers.PROVIDER_ORDER, "US", [provider.name])
+
+    for _ in range(2):
+        with pytest.raises(providers.ProviderUnavailable):
+            asyncio.run(_fetch("T0"))
+    assert provider.breaker.state == "open"
+
+    # 회로가 열린 동안은 업스트림을 호출하지 않음
+    with pytest.raises(providers.ProviderUnavailable):
+        asyncio.run(_fetch("T0"))
+    assert provider.calls == 2
+
+    clock[0] += 30
+    provider.healthy = True
+    assert not asyncio.run(_fetch("T0")).empty
+    assert provider.calls == 3
+    assert provider.breaker.state == "closed"
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from app.services.resample import resample_ohlcv
+
+def _bars(index: pd.DatetimeIndex) -> pd.DataFrame:
+    n = len(index)
+    close = np.arange(1.0, n + 1)
+    return pd.DataFrame({
+        "Open": close - 0.5,
+        "High": close + 1,
+        "Low": close - 1,
+        "Close": close,
+        "Volume": np.full(n, 10),
+    }, index=index)
+
+def _kst_daily(start: str, end: str) -> pd.DataFrame:
+    # yfinance KOSPI 지수(^KS11) 일봉: 한국 시각 자정, 평일만
+    days = pd.bdate_range(start, end)
+    return _bars(pd.DatetimeIndex(days).tz_localize("Asia/Seoul"))
+
+def test_weekly_buckets_follow_kst_index_on_us_path():
+    df = _kst_daily("2026-08-31", "2026-09-18")
+    weekly = resample_ohlcv(df, "weekly", "US")
+    # 월요일 봉이 뉴욕 시각으로 전주 일요일이 되어 앞 주로 넘어가지 않아야 함
+    assert [ts.strftime("%Y-%m-%d %a") for ts in weekly.index] == [
+        "2026-08-31 Mon", "2026-09-07 Mon", "2026-09-14 Mon"
+    ]
+    assert weekly["Volume"].tolist() == [50, 50, 50]
+    assert weekly["Open"].tolist() == [0.5, 5.5, 10.5]
+    assert weekly["Close"].tolist() == [5.0, 10.0, 15.0]
+
+def test_monthly_buckets_follow_kst_index_on_us_path():
+    df = _kst_daily("2026-08-03", "2026-10-30")
+    monthly = resample_ohlcv(df, "monthly", "US")
+    assert [ts.strftime("%Y-%m-%d") for ts in monthly.index] == ["2026-08-03", "2026-09-01", "2026-10-01"]
+    counts = pd.Series(1, index=df.index.tz_localize(None)).groupby(lambda ts: ts.month).sum()
+    assert monthly["Volume"].tolist() == (counts * 10).tolist()
+
+def test_weekly_buckets_for_new_york_index():
+    days = pd.bdate_range("2026-09-07", "2026-09-18")
+    df = _bars(pd.DatetimeIndex(days).tz_localize("America/New_York"))
+    weekly = resample_ohlcv(df, "weekly", "US")
+    assert [ts.strftime("%Y-%m-%d") for ts in weekly.index] == ["2026-09-07", "2026-09-14"]
+    assert weekly["High"].tolist() == [6.0, 11.0]
+    assert weekly["Low"].tolist() == [0.0, 5.0]
+
+def test_weekly_buckets_for_naive_kr_index():
+    days = pd.bdate_range("2026-09-07", "2026-09-18")
+    df = _bars(pd.DatetimeIndex(days)).rename(columns={
+        "Open": "시가", "High": "고가", "Low": "저가", "Close": "종가", "Volume": "거래량"
+    })
+    weekly = resample_ohlcv(df, "weekly", "KR")
+    assert list(weekly.columns) == ["시가", "고가", "저가", "종가", "거래량"]
+    assert weekly["거래량"].tolist() == [50, 50]
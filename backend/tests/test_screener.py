@@ -0,0 +1,31 @@
+from datetime import date
+
+import pytest
+
+from app.services import screener
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(screener.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(screener.trading_calendar, "is_trading_day", lambda market, day: True)
+    monkeypatch.setattr(screener, "_empty_dates", {})
+    return now
+
+def test_empty_day_is_retried_after_ttl(clock):
+    day = date(2024, 5, 14)
+    screener._empty_dates[day] = clock[0]
+
+    clock[0] += screener.EMPTY_DATE_RETRY_SECONDS - 1
+    assert day not in screener._missing_days(None, day)
+
+    clock[0] += 1
+    assert day in screener._missing_days(None, day)
+    assert day not in screener._empty_dates
+
+def test_expired_empty_days_outside_window_are_dropped(clock):
+    old = date(2020, 1, 2)
+    screener._empty_dates[old] = clock[0]
+    clock[0] += screener.EMPTY_DATE_RETRY_SECONDS
+    screener._missing_days(None, date(2024, 5, 14))
+    assert screener._empty_dates == {}
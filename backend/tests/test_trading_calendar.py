@@ -0,0 +1,78 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from app.services import trading_calendar
+
+KST = trading_calendar.SESSIONS["KR"].timezone
+ET = trading_calendar.SESSIONS["US"].timezone
+
+@pytest.mark.parametrize("day, holiday", [
+    (date(2024, 1, 15), "Martin Luther King Jr. Day"),
+    (date(2024, 3, 29), "Good Friday"),
+    (date(2024, 6, 19), "Juneteenth"),
+    (date(2022, 6, 20), "Juneteenth"),          # 일요일 -> 월요일 대체
+    (date(2026, 7, 3), "Independence Day"),     # 토요일 -> 금요일 대체
+    (date(2024, 11, 28), "Thanksgiving Day"),
+    (date(2025, 1, 9), "National Day of Mourning (Jimmy Carter)"),
+])
+def test_nyse_holidays(day, holiday):
+    assert trading_calendar.trading_day("US", day) == trading_calendar.Day(False, holiday=holiday)
+
+def test_nyse_saturday_new_year_is_not_observed_on_friday():
+    assert trading_calendar.is_trading_day("US", date(2021, 12, 31))
+
+@pytest.mark.parametrize("day", [date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)])
+def test_nyse_early_closes(day):
+    assert trading_calendar.trading_day("US", day) == trading_calendar.Day(True, time(9, 30), time(13, 0))
+
+@pytest.mark.parametrize("day", [date(2022, 12, 23), date(2026, 7, 2), date(2026, 7, 6)])
+def test_no_early_close_when_eve_falls_on_weekend_or_holiday(day):
+    assert trading_calendar.trading_day("US", day).close == time(16, 0)
+
+@pytest.mark.parametrize("day, holiday", [
+    (date(2024, 2, 9), "설날"),
+    (date(2024, 4, 10), "국회의원 선거"),
+    (date(2024, 5, 6), "어린이날 대체공휴일"),
+    (date(2024, 5, 1), "근로자의 날"),
+    (date(2024, 12, 31), "연말 휴장일"),
+    (date(2023, 12, 29), "연말 휴장일"),          # 12월 31일이 일요일 -> 직전 금요일
+])
+def test_krx_holidays(day, holiday):
+    assert trading_calendar.trading_day("KR", day) == trading_calendar.Day(False, holiday=holiday)
+
+def test_krx_late_opens():
+    # 연초 첫 거래일 10시 개장, 수능일은 개장/폐장 1시간씩 늦춤
+    assert trading_calendar.trading_day("KR", date(2024, 1, 2)) == trading_calendar.Day(True, time(10, 0), time(15, 30))
+    assert trading_calendar.trading_day("KR", date(2024, 11, 14)) == trading_calendar.Day(True, time(10, 0), time(16, 30))
+    assert trading_calendar.trading_day("KR", date(2024, 11, 15)) == trading_calendar.Day(True, time(9, 0), time(15, 30))
+
+def test_status_reports_early_close():
+    status = trading_calendar.status("US", datetime(2024, 11, 29, 12, 0, tzinfo=ET))
+    assert status["status"] == "open"
+    assert status["early_close"] is True
+    assert status["session_close"] == "2024-11-29T13:00:00-05:00"
+
+    after = trading_calendar.status("US", datetime(2024, 11, 29, 14, 0, tzinfo=ET))
+    assert (after["status"], after["reason"]) == ("closed", "after_close")
+    assert after["last_close"] == "2024-11-29T13:00:00-05:00"
+
+def test_next_open_skips_holidays():
+    # 추석 연휴(9/16~18) 전 금요일 폐장 후
+    now = datetime(2024, 9, 13, 16, 0, tzinfo=KST)
+    assert trading_calendar.next_open("KR", now) == datetime(2024, 9, 19, 9, 0, tzinfo=KST)
+    assert trading_calendar.trading_days("KR", date(2024, 9, 13), date(2024, 9, 19)) == [
+        date(2024, 9, 13), date(2024, 9, 19)
+    ]
+    status = trading_calendar.status("KR", datetime(2024, 9, 16, 10, 0, tzinfo=KST))
+    assert (status["status"], status["reason"], status["holiday"]) == ("closed", "holiday", "추석")
+
+def test_extra_holidays(monkeypatch):
+    monkeypatch.setattr(trading_calendar, "EXTRA_HOLIDAYS", "KR:2024-03-04, US:2024-03-05")
+    trading_calendar._year_calendar.cache_clear()
+    try:
+        assert trading_calendar.trading_day("KR", date(2024, 3, 4)).holiday == "임시 휴장일"
+        assert trading_calendar.is_trading_day("KR", date(2024, 3, 5))
+        assert not trading_calendar.is_trading_day("US", date(2024, 3, 5))
+    finally:
+        trading_calendar._year_calendar.cache_clear()
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services import upstream
+
+@pytest.fixture
+def provider(monkeypatch):
+    # 전체 슬롯 2개 중 백그라운드 몫은 1개
+    monkeypatch.setitem(upstream.PROVIDER_CONCURRENCY, "test", 2)
+    monkeypatch.setitem(upstream.BACKGROUND_CONCURRENCY, "test", 1)
+    return "test"
+
+def test_live_caller_promotes_background_request(provider):
+    release = threading.Event()
+
+    async def main():
+        # 다른 백그라운드 호출이 백그라운드 몫을 차지하고 있어 새 백그라운드 요청은 기다려야 함
+        with upstream.background():
+            blocker = asyncio.ensure_future(upstream.run(provider, release.wait, 5))
+            await asyncio.sleep(0.01)
+            shared = asyncio.ensure_future(upstream.coalesce(("k",), lambda: upstream.run(provider, lambda: "done")))
+        await asyncio.sleep(0.1)
+        assert not shared.done()
+
+        # 실시간 호출자가 합류하면 남은 전체 슬롯으로 바로 실행됨
+        result = await asyncio.wait_for(upstream.coalesce(("k",), lambda: None), 1)
+        assert blocker.done() is False
+        release.set()
+        await blocker
+        return result, await shared
+
+    assert asyncio.run(main()) == ("done", "done")
+
+def test_promotion_does_not_leak_to_other_background_work(provider):
+    release = threading.Event()
+
+    async def main():
+        with upstream.background():
+            blocker = asyncio.ensure_future(upstream.run(provider, release.wait, 5))
+            await asyncio.sleep(0.01)
+            shared = asyncio.ensure_future(upstream.coalesce(("k",), lambda: upstream.run(provider, lambda: "shared")))
+            other = asyncio.ensure_future(upstream.run(provider, lambda: "other"))
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(upstream.coalesce(("k",), lambda: None), 1)
+        await asyncio.sleep(0.1)
+        # 합류 대상이 아닌 백그라운드 호출은 계속 백그라운드 몫을 기다림
+        assert not other.done()
+        release.set()
+        await blocker
+        return await shared, await other
+
+    assert asyncio.run(main()) == ("shared", "other")
@@ -9,6 +9,9 @@ import {
 import { StockAnalysis, TimeFrame } from '../types'
 import { AnalysisResult } from './AnalysisResult'
 
+// 차트에 그릴 최대 점 개수 (서버에서 다운샘플링)
+const MAX_CHART_POINTS = 500
+
 export const StockSearch: React.FC = () => {
   const [ticker, setTicker] = useState('')
   const [analysis, setAnalysis] = useState<StockAnalysis | null>(null)
@@ -41,7 +44,7 @@ export const StockSearch: React.FC = () => {
       throw new Error('한국 주식은 분 단위 데이터를 지원하지 않습니다. 일/주/월 단위를 선택해주세요.')
     }
 
-    const response = await fetch(`http://127.0.0.1:8000/api/analysis/analyze?timeframe=${selectedTimeframe}`, {
+    const response = await fetch(`http://127.0.0.1:8000/api/analysis/analyze?timeframe=${selectedTimeframe}&max_points=${MAX_CHART_POINTS}`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',